@@ -0,0 +1,244 @@
+"""
+Batch cutter of stroke clips with ffmpeg: stream copy where the cut points allow it.
+
+The cut list is a CSV (header: input,start,end,output[,mode]) or a JSON list of objects
+with the same keys; times in seconds. For every input the keyframes are read once with
+ffprobe (packet flags, no decoding) and each cut is planned with its mode:
+
+- copy:      stream copy from the keyframe at or before `start` (the clip may begin a bit
+             early), no re-encoding at all.
+- smart:     exact cut: only the video head from `start` to the next keyframe is re-encoded,
+             with the codec, profile, level, pixel format and timebase of the source, the
+             rest of the video is stream-copied. Both video parts go through MPEG-TS
+             (Annex-B) intermediates, so the decoder picks up the new parameter sets at the
+             join, and the audio of the whole clip is stream-copied from the source. If
+             `start` already falls on a keyframe it is a plain copy; sources whose codec has
+             no matching encoder are re-encoded whole.
+- reencode:  full libx264/aac re-encode (what cortar_video.py did).
+
+Cuts run concurrently (the work happens in the ffmpeg processes) and the tool reports the
+throughput in seconds of video per second of wall time.
+
+    python artificial-vision/cortar_lote.py cortes.csv --mode smart --jobs 4
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+MODES = ('copy', 'smart', 'reencode')
+ENCODE = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18']
+ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}     # códecs que smart sabe igualar
+STREAMS = ['-map', '0:v:0', '-map', '0:a?']
+TOLERANCE = 1e-3     # [s] distancia a la que un corte se considera sobre un keyframe
+
+
+def read_cut_list(path: str, default_mode: str = 'smart'):
+    """List of cuts {'input', 'start', 'end', 'output', 'mode'} from a CSV or JSON file."""
+    with open(path) as f:
+        rows = json.load(f) if path.endswith('.json') else list(csv.DictReader(f))
+    cuts = []
+    for row in rows:
+        mode = row.get('mode') or default_mode
+        if mode not in MODES:
+            raise ValueError(f"Modo no soportado: {mode}. Opciones: {MODES}")
+        start, end = float(row['start']), float(row['end'])
+        if end <= start:
+            raise ValueError(f"Corte vacío: {row}")
+        cuts.append({'input': row['input'], 'start': start, 'end': end, 'output': row['output'], 'mode': mode})
+    return cuts
+
+
+_keyframes = {}
+_keyframes_lock = threading.Lock()
+
+
+def _start_time(path: str):
+    """format=start_time of the input: offset of its timestamps from the start of the file."""
+    out = subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=start_time', '-of', 'csv=p=0', path],
+                         check=True, capture_output=True, text=True).stdout.strip()
+    return float(out) if out not in ('', 'N/A') else 0.0
+
+
+def keyframes(path: str):
+    """
+    Sorted keyframe times of the first video stream (read once per input), relative to the
+    start of the file like the -ss cut points: the packet pts are absolute stream timestamps,
+    so format=start_time is subtracted.
+    """
+    with _keyframes_lock:
+        if path in _keyframes:
+            return _keyframes[path]
+    out = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                          '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path],
+                         check=True, capture_output=True, text=True).stdout
+    times = []
+    for line in out.splitlines():
+        pts, _, flags = line.partition(',')
+        if 'K' in flags and pts not in ('', 'N/A'):
+            times.append(float(pts))
+    kf = np.unique(times) - _start_time(path)
+    with _keyframes_lock:
+        _keyframes[path] = kf
+    return kf
+
+
+_streams = {}
+
+
+def stream_info(path: str):
+    """codec_name, profile, level, pix_fmt and time_base of the first video stream (read once per input)."""
+    with _keyframes_lock:
+        if path in _streams:
+            return _streams[path]
+    out = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries',
+                          'stream=codec_name,profile,level,pix_fmt,time_base', '-of', 'json', path],
+                         check=True, capture_output=True, text=True).stdout
+    streams = json.loads(out).get('streams') or [{}]
+    with _keyframes_lock:
+        _streams[path] = streams[0]
+    return streams[0]
+
+
+def plan_cut(start: float, end: float, kf, mode: str):
+    """
+    Segments [(kind, t0, t1)] that make up the cut, kind being 'copy' or 'encode'.
+    copy snaps t0 to the previous keyframe; smart re-encodes only up to the next one.
+    """
+    if mode == 'reencode':
+        return [('encode', start, end)]
+    kf = np.asarray(kf)
+    before = kf[kf <= start + TOLERANCE]
+    snapped = float(before[-1]) if len(before) else 0.0
+    if mode == 'copy' or start - snapped <= TOLERANCE:
+        return [('copy', snapped, end)]
+    after = kf[kf > start + TOLERANCE]
+    if not len(after) or after[0] >= end:
+        return [('encode', start, end)]      # no hay keyframe dentro: se recodifica entero
+    return [('encode', start, float(after[0])), ('copy', float(after[0]), end)]
+
+
+def _ffmpeg(args):
+    subprocess.run(['ffmpeg', '-v', 'error', '-y'] + args, check=True, capture_output=True)
+
+
+def _segment(kind, src, t0, t1, dst):
+    # -ss antes de -i: búsqueda rápida (al keyframe en copia, exacta al recodificar)
+    if kind == 'copy':
+        _ffmpeg(['-ss', f'{t0:.6f}', '-i', src, '-t', f'{t1 - t0:.6f}'] + STREAMS +
+                ['-c', 'copy', '-avoid_negative_ts', 'make_zero', dst])
+    else:
+        _ffmpeg(['-ss', f'{t0:.6f}', '-i', src, '-t', f'{t1 - t0:.6f}'] + STREAMS + ENCODE +
+                ['-c:a', 'aac', dst])
+
+
+def _matching_encoder(info):
+    """Video encoder options that reproduce the source stream parameters (None if unsupported)."""
+    encoder = ENCODERS.get(info.get('codec_name'))
+    if encoder is None:
+        return None
+    args = ['-c:v', encoder, '-preset', 'veryfast', '-crf', '18']
+    profile = (info.get('profile') or '').lower().replace('constrained ', '').replace(' ', '').replace(':', '')
+    if profile and profile != 'unknown':
+        args += ['-profile:v', profile]
+    level = int(info.get('level') or 0)
+    if level > 0:
+        # h264 da el nivel x10 (40 -> 4.0), hevc x30 (120 -> 4.0)
+        if encoder == 'libx264':
+            args += ['-level', f'{level/10:.1f}']
+        else:
+            args += ['-x265-params', f'level-idc={level/30:.1f}']
+    if info.get('pix_fmt'):
+        args += ['-pix_fmt', info['pix_fmt']]
+    return args
+
+
+def _smart(job, plan, info, encoder, tmp):
+    """Exact cut: encoded head + copied video tail joined as MPEG-TS, audio copied whole."""
+    (_, t0, t1), (_, t2, t3) = plan
+    src = job['input']
+    head, tail = os.path.join(tmp, 'head.ts'), os.path.join(tmp, 'tail.ts')
+    _ffmpeg(['-ss', f'{t0:.6f}', '-i', src, '-t', f'{t1 - t0:.6f}', '-map', '0:v:0', '-an'] + encoder +
+            ['-f', 'mpegts', head])
+    _ffmpeg(['-ss', f'{t2:.6f}', '-i', src, '-t', f'{t3 - t2:.6f}', '-map', '0:v:0', '-an', '-c', 'copy',
+             '-f', 'mpegts', tail])
+    listing = os.path.join(tmp, 'concat.txt')
+    with open(listing, 'w') as f:
+        f.writelines(f"file '{p}'\n" for p in (head, tail))
+    # El demuxer concat encadena las marcas de tiempo de las dos partes; el audio sale del original
+    args = ['-f', 'concat', '-safe', '0', '-i', listing, '-ss', f'{t0:.6f}', '-i', src, '-t', f'{t3 - t0:.6f}',
+            '-map', '0:v:0', '-map', '1:a?', '-c', 'copy']
+    timescale = info.get('time_base', '').partition('/')[2]
+    if timescale and os.path.splitext(job['output'])[1].lower() in ('.mp4', '.mov', '.m4v'):
+        args += ['-video_track_timescale', timescale]
+    _ffmpeg(args + [job['output']])
+
+
+def cut(job):
+    """Runs one cut; returns the job with its plan, wall time and output size."""
+    t_start = time.perf_counter()
+    kf = keyframes(job['input']) if job['mode'] != 'reencode' else []
+    plan = plan_cut(job['start'], job['end'], kf, job['mode'])
+    os.makedirs(os.path.dirname(os.path.abspath(job['output'])), exist_ok=True)
+
+    if len(plan) == 2:
+        info = stream_info(job['input'])
+        encoder = _matching_encoder(info)
+        if encoder is None:
+            plan = [('encode', job['start'], job['end'])]    # sin codificador equivalente
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                _smart(job, plan, info, encoder, tmp)
+    if len(plan) == 1:
+        kind, t0, t1 = plan[0]
+        _segment(kind, job['input'], t0, t1, job['output'])
+
+    return {**job, 'plan': plan, 'duration': plan[-1][2] - plan[0][1],
+            'seconds': time.perf_counter() - t_start, 'bytes': os.path.getsize(job['output'])}
+
+
+def run(cuts, jobs: int = 4):
+    """Runs the cuts concurrently, printing each one as it finishes; returns the results."""
+    t0 = time.perf_counter()
+    results, errors = [], []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(cut, c): c for c in cuts}
+        for future in as_completed(futures):
+            c = futures[future]
+            try:
+                r = future.result()
+            except (subprocess.CalledProcessError, OSError) as exc:
+                stderr = getattr(exc, 'stderr', b'') or b''
+                errors.append(c)
+                print(f"✗ {c['output']}: {exc} {stderr.decode(errors='replace').strip()}")
+                continue
+            results.append(r)
+            kinds = '+'.join(kind for kind, *_ in r['plan'])
+            print(f"✓ {r['output']}  [{kinds}]  {r['duration']:.2f} s de vídeo en {r['seconds']:.2f} s")
+
+    wall = time.perf_counter() - t0
+    video = sum(r['duration'] for r in results)
+    size = sum(r['bytes'] for r in results)
+    print(f"{len(results)} cortes ({len(errors)} errores) en {wall:.2f} s: "
+          f"{video/wall:.1f} s de vídeo/s, {size/wall/1e6:.1f} MB/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('cut_list', help='CSV o JSON con input,start,end,output[,mode]')
+    parser.add_argument('--mode', choices=MODES, default='smart', help='modo si la lista no lo indica')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 4, help='cortes simultáneos')
+    args = parser.parse_args()
+    run(read_cut_list(args.cut_list, args.mode), args.jobs)
+
+
+if __name__ == '__main__':
+    main()
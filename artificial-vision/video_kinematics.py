@@ -0,0 +1,349 @@
+"""
+Rower kinematics from video: streaming tracking, recovery segmentation and polynomial fit.
+
+The frames are decoded one at a time at a reduced width (moviepy's target_resolution scales
+them while decoding) and converted to grayscale. Two templates, one on the rower (seat or
+hip) and one on the hull (a rigger, the bow ball...), are followed frame to frame by FFT
+cross-correlation inside a small search window. The rower position relative to the hull,
+in metres, is cut into recoveries at its turning points and every recovery is fitted to the
+constrained polynomial of RowEquation.set_rower_cinematic (fitting.KinematicFit), so the
+result can be fed straight back into the simulator.
+
+Only the current cycle is buffered, so memory stays bounded however long the session is.
+
+    python artificial-vision/video_kinematics.py videos/skiff.mp4 --rower 410 220 40 40 \\
+        --hull 600 260 30 20 --scale 0.004 --width 480 --degree 6 --out recoveries.jsonl
+
+    python artificial-vision/video_kinematics.py --demo      # vídeo sintético generado
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+
+import numpy as np
+from scipy.signal import fftconvolve
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fitting import KinematicFit, constrained_basis
+
+
+# --------------------------------------------------
+# Lectura de frames
+# --------------------------------------------------
+def to_gray(frame):
+    frame = np.asarray(frame, dtype=np.float32)
+    if frame.ndim == 3:
+        frame = frame[..., :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return frame
+
+
+def iter_frames(path: str, width: int = 480, fps: float = None, start: float = 0, end: float = None):
+    """
+    Yields (t, grayscale frame) decoded lazily at `width` pixels, together with the factor
+    from original to reduced pixel coordinates as the first item: (factor, generator).
+    """
+    from moviepy.video.io.VideoFileClip import VideoFileClip
+
+    with VideoFileClip(path, audio=False) as probe:
+        original_width = probe.size[0]
+    clip = VideoFileClip(path, audio=False, target_resolution=(width, None))   # (ancho, alto)
+    if start or end is not None:
+        clip = clip.subclipped(start, end)
+    factor = clip.size[0]/original_width
+    fps = fps or clip.fps
+
+    def frames():
+        try:
+            for k, frame in enumerate(clip.iter_frames(fps=fps, dtype='uint8')):
+                yield start + k/fps, to_gray(frame)
+        finally:
+            clip.close()
+
+    return factor, frames()
+
+
+def synthetic_frames(n_strokes: int = 5, fps: float = 30, period: float = 2.0, T: float = 1.2,
+                     L: float = -0.8, scale: float = 0.004, size=(120, 480), noise: float = 4.0, seed: int = 0):
+    """
+    Generated video of a rower (bright square) moving on a drifting hull (dark bar): the
+    recovery follows the cubic of set_rower_cinematic with duration T and length L, the
+    drive returns along a half cosine, so the seat stops at both turning points.
+    Yields (t, frame) like iter_frames().
+    """
+    rng = np.random.default_rng(seed)
+    h, w = size
+    yy, xx = np.mgrid[0:h, 0:w]
+    n_frames = int(n_strokes*period*fps)
+    for k in range(n_frames):
+        t = k/fps
+        tau = t % period
+        if tau < T:
+            x = 3*L*tau**2/T**2 - 2*L*tau**3/T**3
+        else:
+            x = 0.5*L*(1 + np.cos(np.pi*(tau - T)/(period - T)))
+        hull_px = 60 + 20*np.sin(2*np.pi*t/(3*period))          # el barco deriva en la imagen
+        rower_px = hull_px + 250 + x/scale
+        frame = 40 + noise*rng.standard_normal((h, w)).astype(np.float32)
+        frame += 180*((np.abs(xx - rower_px) < 8) & (np.abs(yy - 40) < 8))
+        frame -= 30*((np.abs(xx - hull_px) < 10) & (np.abs(yy - 90) < 5))
+        yield t, frame.astype(np.float32)
+
+
+# --------------------------------------------------
+# Seguimiento
+# --------------------------------------------------
+class TemplateTracker():
+    """
+    Follows one template by zero-mean normalized cross-correlation computed with FFTs in a
+    window `radius` pixels around the last position. Sub-pixel horizontal position by a
+    parabola through the correlation peak; the template adapts slowly (rate alpha).
+    """
+
+    def __init__(self, frame, box, radius: int = 24, alpha: float = 0.05):
+        x, y, w, h = (int(round(v)) for v in box)
+        self.w, self.h = w, h
+        self.x, self.y = float(x), float(y)
+        self.radius = radius
+        self.alpha = alpha
+        self.template = frame[y:y + h, x:x + w].astype(np.float32).copy()
+        self.score = 1.0
+
+    @property
+    def center(self):
+        return self.x + 0.5*self.w, self.y + 0.5*self.h
+
+    def update(self, frame):
+        H, W = frame.shape
+        x0 = int(max(round(self.x) - self.radius, 0))
+        y0 = int(max(round(self.y) - self.radius, 0))
+        x1 = int(min(round(self.x) + self.w + self.radius, W))
+        y1 = int(min(round(self.y) + self.h + self.radius, H))
+        window = frame[y0:y1, x0:x1]
+        if window.shape[0] < self.h or window.shape[1] < self.w:
+            return self.center
+
+        tpl = self.template - self.template.mean()
+        corr = fftconvolve(window, tpl[::-1, ::-1], mode='valid')
+        # Media y energía local de la ventana bajo la plantilla, para normalizar
+        ones = np.ones((self.h, self.w), dtype=np.float32)
+        s1 = fftconvolve(window, ones, mode='valid')
+        s2 = fftconvolve(window**2, ones, mode='valid')
+        var = np.maximum(s2 - s1**2/ones.size, 1e-6)
+        ncc = corr/np.sqrt(var*np.sum(tpl**2) + 1e-12)
+
+        iy, ix = np.unravel_index(np.argmax(ncc), ncc.shape)
+        dx = 0.0
+        if 0 < ix < ncc.shape[1] - 1:
+            l, c, r = ncc[iy, ix - 1], ncc[iy, ix], ncc[iy, ix + 1]
+            den = l - 2*c + r
+            dx = 0.5*(l - r)/den if den < 0 else 0.0
+        self.x, self.y = x0 + ix + dx, float(y0 + iy)
+        self.score = float(ncc[iy, ix])
+
+        yi, xi = int(self.y), int(round(self.x))
+        patch = frame[yi:yi + self.h, xi:xi + self.w]
+        if patch.shape == self.template.shape:
+            self.template += self.alpha*(patch - self.template)
+        return self.center
+
+
+# --------------------------------------------------
+# Segmentación de recuperaciones
+# --------------------------------------------------
+def refine_turning_point(t, x, j: int, sign: int, window: float):
+    """
+    Sub-sample turning point (t*, x*) around raw sample j (sign=+1: maximum, -1: minimum).
+    The samples within `window` of x[j] are fitted to x* - sign*c(t - t*)^2 with its own
+    curvature on each side (catch and finish are not symmetric); t* is searched on a fine
+    grid one sample around t[j], the rest is linear least squares.
+    """
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+    a, b = j, j
+    while a > 0 and sign*(x[j] - x[a - 1]) < window:
+        a -= 1
+    while b < len(x) - 1 and sign*(x[j] - x[b + 1]) < window:
+        b += 1
+    a, b = max(min(a, j - 2), 0), min(max(b, j + 2), len(x) - 1)
+    t, x = t[a:b + 1], x[a:b + 1]
+    j -= a
+    if j == 0 or j == len(t) - 1:
+        return float(t[j]), float(x[j])
+
+    best = (np.inf, t[j], x[j])
+    for ts in np.linspace(t[j - 1], t[j + 1], 41):
+        s = t - ts
+        A = np.column_stack([np.ones_like(s), np.where(s < 0, s*s, 0), np.where(s >= 0, s*s, 0)])
+        c = np.linalg.lstsq(A, x, rcond=None)[0]
+        r = float(np.sum((A @ c - x)**2))
+        if r < best[0]:
+            best = (r, ts, c[0])
+    return float(best[1]), float(best[2])
+
+
+class RecoverySegmenter():
+    """
+    Cuts the relative position x(t) at its turning points and returns the segments that
+    move in the recovery direction (recovery_sign=-1: x decreases, as with L < 0 in
+    RowEquation). Extrema are detected on a short moving average and confirmed once the
+    signal moves back more than min_amplitude; their time and position are then refined
+    to sub-sample precision on the raw samples (refine_turning_point), and the returned
+    segments start and end at the refined points. Only the samples since the last turning
+    point are buffered; if none appears for max_stroke seconds (static or noisy video that
+    never moves min_amplitude) the segmenter starts over from the latest sample.
+    """
+
+    def __init__(self, min_amplitude: float = 0.1, recovery_sign: int = -1, smoothing: int = 3,
+                 max_stroke: float = 10.0):
+        self.min_amplitude = min_amplitude
+        self.recovery_sign = recovery_sign
+        self.smoothing = max(int(smoothing), 1)
+        self.max_stroke = max_stroke
+        self._smooth = deque(maxlen=self.smoothing)
+        self.reset()
+
+    def reset(self):
+        """Forgets the buffered samples and the last turning point."""
+        self._buffer = []             # (t, x en bruto, x suavizada) desde el último punto de retorno
+        self._turn = None             # último punto de retorno refinado (t*, x*)
+        self._extreme = None          # índice en el buffer del extremo candidato
+        self._direction = 0
+        self._complete = False        # el primer tramo suele empezar a mitad de movimiento: se descarta
+
+    def _refine(self, k: int, sign: int):
+        t, x, _ = np.array(self._buffer).T
+        # La media móvil va (smoothing - 1)/2 muestras por detrás: se busca el extremo en bruto cerca
+        lag = (self.smoothing - 1)//2
+        lo, hi = max(k - lag - self.smoothing, 0), min(k - lag + self.smoothing + 1, len(x))
+        j = lo + int(np.argmax(sign*x[lo:hi]))
+        return j, refine_turning_point(t, x, j, sign, 0.4*self.min_amplitude)
+
+    def push(self, t: float, x: float):
+        """Adds one sample; returns (t, x) arrays of a finished recovery or None."""
+        self._smooth.append(x)
+        x_s = float(np.mean(self._smooth))
+        self._buffer.append((t, x, x_s))
+        if t - self._buffer[0][0] > self.max_stroke:
+            # Ningún punto de retorno en más de una palada plausible: se empieza de nuevo
+            self.reset()
+            self._buffer.append((t, x, x_s))
+        if self._extreme is None:
+            self._extreme = 0
+            return None
+
+        x_ext = self._buffer[self._extreme][2]
+        if self._direction >= 0 and x_s > x_ext or self._direction <= 0 and x_s < x_ext:
+            if self._direction == 0 and abs(x_s - self._buffer[0][2]) > self.min_amplitude:
+                self._direction = 1 if x_s > self._buffer[0][2] else -1
+            self._extreme = len(self._buffer) - 1
+            return None
+        if abs(x_s - x_ext) < self.min_amplitude or self._direction == 0:
+            return None
+
+        # Extremo confirmado: el tramo hasta él termina en un punto de retorno
+        moved = self._direction
+        j, turn = self._refine(self._extreme, moved)
+        segment = None
+        if moved == self.recovery_sign and self._complete and self._turn is not None:
+            inner = [(ti, xi) for ti, xi, _ in self._buffer if self._turn[0] < ti < turn[0]]
+            seg = np.array([self._turn] + inner + [turn])
+            segment = seg[:, 0], seg[:, 1]
+        self._complete = self._complete or self._turn is not None
+        self._turn = turn
+        self._buffer = self._buffer[max(j - 1, 0):]
+        self._extreme = len(self._buffer) - 1
+        self._direction = -moved
+        return segment
+
+
+def fit_recovery(t, x, degree: int = 6, ridge: float = 0.01):
+    """
+    Fits one recovery to the constrained polynomial; times and positions start at 0.
+    Over a single recovery the high-order terms are nearly collinear and poorly determined
+    by the tracking noise, so a4..an are pulled toward 0 (KinematicFit.regularize): ridge
+    weighs the rms displacement of each high-order term against the rms error of the fit
+    (0 disables it). rms is the error on x alone.
+    """
+    t = np.asarray(t) - t[0]
+    x = np.asarray(x) - x[0]
+    T, L = float(t[-1]), float(x[-1])
+    fit = KinematicFit(T, L, degree).add(t, x, order=0)
+    if ridge and degree > 3:
+        fit.regularize(ridge*np.sqrt(len(t)))
+    high_coeffs = fit.coeffs()
+    base, Phi = constrained_basis(t, T, L, degree, 0)
+    rms = np.sqrt(np.mean((base + Phi @ high_coeffs - x)**2))
+    return {'T': T, 'L': L, 'high_coeffs': high_coeffs.tolist(), 'rms': float(rms)}
+
+
+# --------------------------------------------------
+# Pipeline
+# --------------------------------------------------
+def video_kinematics(frames, rower_box, hull_box, scale: float, degree: int = 6,
+                     min_amplitude: float = 0.1, recovery_sign: int = -1, radius: int = 24):
+    """
+    Generator of fitted recoveries from an iterable of (t, grayscale frame). Boxes are
+    (x, y, w, h) in the pixel coordinates of the frames; scale is metres per pixel.
+    Every item has t0, T, L, high_coeffs (a4..an for set_rower_cinematic) and the rms error.
+    """
+    segmenter = RecoverySegmenter(min_amplitude, recovery_sign)
+    rower = hull = None
+    for t, frame in frames:
+        if rower is None:
+            rower = TemplateTracker(frame, rower_box, radius)
+            hull = TemplateTracker(frame, hull_box, radius)
+        x_rel = (rower.update(frame)[0] - hull.update(frame)[0])*scale
+        segment = segmenter.push(t, x_rel)
+        if segment is not None:
+            seg_t, seg_x = segment
+            yield {'t0': float(seg_t[0]), **fit_recovery(seg_t, seg_x, degree)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('video', nargs='?')
+    parser.add_argument('--rower', nargs=4, type=float, metavar=('X', 'Y', 'W', 'H'),
+                        help='caja del remero en píxeles del vídeo original')
+    parser.add_argument('--hull', nargs=4, type=float, metavar=('X', 'Y', 'W', 'H'),
+                        help='caja de la referencia del barco en píxeles del vídeo original')
+    parser.add_argument('--scale', type=float, help='metros por píxel del vídeo original')
+    parser.add_argument('--width', type=int, default=480, help='anchura a la que se decodifica')
+    parser.add_argument('--fps', type=float, default=None)
+    parser.add_argument('--start', type=float, default=0)
+    parser.add_argument('--end', type=float, default=None)
+    parser.add_argument('--degree', type=int, default=6)
+    parser.add_argument('--min-amplitude', type=float, default=0.1, help='[m]')
+    parser.add_argument('--out', default=None, help='fichero JSON lines con una recuperación por línea')
+    parser.add_argument('--demo', action='store_true', help='usa un vídeo sintético generado')
+    args = parser.parse_args()
+
+    if args.demo:
+        frames = synthetic_frames()
+        rower_box, hull_box, scale = (302, 32, 16, 16), (50, 85, 20, 10), 0.004
+    else:
+        if not (args.video and args.rower and args.hull and args.scale):
+            parser.error("video, --rower, --hull y --scale son obligatorios (o --demo)")
+        factor, frames = iter_frames(args.video, args.width, args.fps, args.start, args.end)
+        rower_box = [v*factor for v in args.rower]
+        hull_box = [v*factor for v in args.hull]
+        scale = args.scale/factor
+
+    out = open(args.out, 'w') if args.out else None
+    try:
+        for k, rec in enumerate(video_kinematics(frames, rower_box, hull_box, scale, args.degree,
+                                                 args.min_amplitude)):
+            print(f"recuperación {k}: t0 = {rec['t0']:.2f} s  T = {rec['T']:.3f} s  L = {rec['L']:.3f} m  "
+                  f"rms = {rec['rms']*1e3:.1f} mm  a4.. = {np.round(rec['high_coeffs'], 3).tolist()}")
+            if out:
+                out.write(json.dumps(rec) + '\n')
+                out.flush()
+    finally:
+        if out:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
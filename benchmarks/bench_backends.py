@@ -0,0 +1,57 @@
+"""
+Which integrator backend of RowEquation.solve_edo wins in which drag regime.
+
+For each regime (A = -0.5*S*rho*Cd/(M+m) grows from a racing shell to a very stiff
+drag term) every backend is timed and its v_f / dE_rower error is measured against a
+tight Radau reference.
+
+    python benchmarks/bench_backends.py --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from rowEquation import RowEquation
+
+REGIMES = {'racing shell (Cd=0.004)': dict(rho=1000, S=0.5, Cd=0.004),
+           'heavy drag (Cd=0.5)': dict(rho=1000, S=0.5, Cd=0.5),
+           'stiff (Cd=20)': dict(rho=1000, S=0.5, Cd=20),
+           'very stiff (Cd=500)': dict(rho=1000, S=0.5, Cd=500)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--n-t', type=int, default=500)
+    parser.add_argument('--rtol', type=float, default=1e-6)
+    parser.add_argument('--atol', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    for name, params in REGIMES.items():
+        eq = RowEquation(m=80, M=20, L=-1, T=1, **params)
+        eq.y0_dot = 5
+        eq.set_rower_cinematic([1, 2])
+        ref = eq.solve_edo(n_t_intervals=None, method='Radau', rtol=1e-12, atol=1e-12)['magnitudes']
+
+        print(f"\n{name}")
+        print(f"  {'method':8s} {'ms':>9s} {'nfev':>7s} {'njev':>5s} {'nsteps':>7s} {'|err v_f|':>10s} {'|err W|':>10s}  status")
+        for method in RowEquation.METHODS:
+            t0 = time.perf_counter()
+            try:
+                for _ in range(args.repeat):
+                    sol = eq.solve_edo(n_t_intervals=args.n_t, method=method, rtol=args.rtol, atol=args.atol)
+            except FloatingPointError:
+                print(f"  {method:8s} {'diverged':>9s}")
+                continue
+            ms = 1e3*(time.perf_counter() - t0)/args.repeat
+            st = sol['solver']
+            mag = sol['magnitudes']
+            print(f"  {method:8s} {ms:9.2f} {st['nfev']:7d} {st['njev']:5d} {st['nsteps']:7d} "
+                  f"{abs(mag['v_f'] - ref['v_f']):10.2e} {abs(mag['dE_rower'] - ref['dE_rower']):10.2e}  {st['status']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Throughput of RowEnsemble.solve() against a Python loop over RowEquation.solve_edo().
+
+    python benchmarks/bench_ensemble.py --cases 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from rowEquation import RowEquation
+from rowEnsemble import RowEnsemble
+
+
+def random_cases(n_cases, degree, seed=0):
+    rng = np.random.default_rng(seed)
+    return {'m': rng.uniform(60, 100, n_cases),
+            'M': rng.uniform(14, 30, n_cases),
+            'L': rng.uniform(-1.2, -0.6, n_cases),
+            'T': rng.uniform(0.6, 1.4, n_cases),
+            'rho': np.full(n_cases, 1000.0),
+            'S': rng.uniform(0.3, 0.7, n_cases),
+            'Cd': rng.uniform(0.002, 0.006, n_cases),
+            'y0_dot': rng.uniform(3, 6, n_cases),
+            'high_coeffs': rng.uniform(-3, 3, (n_cases, degree - 3))}
+
+
+def run_loop(cases, n_t_intervals):
+    v_f = []
+    for i in range(len(cases['m'])):
+        eq = RowEquation(cases['m'][i], cases['M'][i], cases['L'][i], cases['T'][i],
+                         cases['rho'][i], cases['S'][i], cases['Cd'][i])
+        eq.y0_dot = cases['y0_dot'][i]
+        eq.set_rower_cinematic(cases['high_coeffs'][i])
+        v_f.append(eq.solve_edo(n_t_intervals=n_t_intervals)['magnitudes']['v_f'])
+    return np.array(v_f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=2000)
+    parser.add_argument('--loop-cases', type=int, default=100, help='cases timed with the solve_edo loop')
+    parser.add_argument('--degree', type=int, default=6)
+    parser.add_argument('--n-t', type=int, default=500)
+    args = parser.parse_args()
+
+    cases = random_cases(args.cases, args.degree)
+
+    t0 = time.perf_counter()
+    ens = RowEnsemble(**cases)
+    sol = ens.solve(n_t_intervals=args.n_t)
+    t_ens = time.perf_counter() - t0
+
+    loop_cases = {k: v[:args.loop_cases] for k, v in cases.items()}
+    t0 = time.perf_counter()
+    v_loop = run_loop(loop_cases, args.n_t)
+    t_loop = time.perf_counter() - t0
+
+    err = np.max(np.abs(sol['magnitudes']['v_f'][:args.loop_cases] - v_loop))
+    rate_ens = args.cases/t_ens
+    rate_loop = args.loop_cases/t_loop
+    print(f"RowEnsemble : {args.cases:7d} cases in {t_ens:8.3f} s -> {rate_ens:10.1f} cases/s")
+    print(f"solve_edo   : {args.loop_cases:7d} cases in {t_loop:8.3f} s -> {rate_loop:10.1f} cases/s")
+    print(f"speed-up    : {rate_ens/rate_loop:.1f}x   max |v_f diff|: {err:.2e}")
+
+
+if __name__ == '__main__':
+    main()
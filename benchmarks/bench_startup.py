@@ -0,0 +1,64 @@
+"""
+Cold start cost of the numerical core: import time of rowEquation and latency of the first
+solve_edo, each measured in a fresh interpreter. Exits with an error if importing the core
+pulls in matplotlib or if the medians exceed the given limits.
+
+    python benchmarks/bench_startup.py --repeat 5 --max-import 1.0 --max-first-solve 2.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from rowEquation import RowEquation
+t1 = time.perf_counter()
+eq = RowEquation()
+eq.set_rower_cinematic([1])
+eq.solve_edo(n_t_intervals=5000)
+t2 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'first_solve': t2 - t1,
+                  'matplotlib': 'matplotlib' in sys.modules}))
+"""
+
+
+def probe():
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    out = subprocess.run([sys.executable, '-c', PROBE], env=env, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-import', type=float, default=None, help='limit of the median import time [s]')
+    parser.add_argument('--max-first-solve', type=float, default=None, help='limit of the median first solve [s]')
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.repeat)]
+    t_import = np.median([r['import'] for r in runs])
+    t_solve = np.median([r['first_solve'] for r in runs])
+    print(f"import rowEquation : {t_import*1e3:8.1f} ms (median of {args.repeat})")
+    print(f"first solve_edo    : {t_solve*1e3:8.1f} ms")
+
+    errors = []
+    if any(r['matplotlib'] for r in runs):
+        errors.append("importing rowEquation loaded matplotlib")
+    if args.max_import is not None and t_import > args.max_import:
+        errors.append(f"import time {t_import:.3f} s > {args.max_import} s")
+    if args.max_first_solve is not None and t_solve > args.max_first_solve:
+        errors.append(f"first solve {t_solve:.3f} s > {args.max_first_solve} s")
+    for e in errors:
+        print(f"REGRESSION: {e}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
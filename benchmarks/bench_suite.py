@@ -0,0 +1,248 @@
+"""
+Benchmark suite of the hot paths with stored baselines and regression thresholds.
+
+Cases are parametrized over the polynomial degree, n_t_intervals and the drag regime:
+
+    set_rower_cinematic[deg]          building the constrained polynomial and its kinematics
+    solve_edo[deg,n_t,regime]         RK45 solve sampled on n_t points
+    calculate_energy[deg,n_t]         rectangle-sum energy of a stored solution
+    fit[deg]                          fit_polynomial of the interactive plot with 30 points on x,
+                                      x' and x'': rebuild of the fit, re-solve and redraw (Agg)
+    render_matplotlib[n_t]            downsample + set_data + Agg draw of the six panels
+    figure_plotly[n_t]                the app's 2x3 Plotly figure serialized to JSON
+
+Each case reports the median of --repeat runs. Timings are stored and compared in units of
+a fixed calibration workload (numpy and pure Python) run right before each run of the
+case, so a baseline saved on one machine can be checked on another and load changes
+during the run cancel out. --save stores them as the baseline; otherwise they are
+compared with it and the script exits with an error if any case is slower than
+baseline*(1 + --threshold). Cases faster than --floor ms are too noisy for that test:
+their ratio is printed but never counted as a regression.
+
+    python benchmarks/bench_suite.py --save                  # nueva línea base
+    python benchmarks/bench_suite.py --threshold 0.3         # comprobar regresiones
+    python benchmarks/bench_suite.py --degrees 4 5 6 7 8 9 10 --filter solve_edo
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from downsample import downsample, points_for_width
+from rowEquation import RowEquation
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+REGIMES = {'racing': dict(rho=1000, S=0.5, Cd=0.004),
+           'heavy': dict(rho=1000, S=0.5, Cd=0.5),
+           'stiff': dict(rho=1000, S=0.5, Cd=20)}
+SERIES = ('xx', 'xx_dot', 'xx_ddot', 'yy', 'yy_dot', 'yy_ddot')
+
+
+def equation(degree, regime='racing'):
+    eq = RowEquation(m=80, M=20, L=-1, T=1, **REGIMES[regime])
+    eq.y0_dot = 5
+    eq.set_rower_cinematic(0.5*np.ones(degree - 3))
+    return eq
+
+
+def calibration():
+    """Fixed mixed workload (numpy polyval + a pure Python loop) used as the time unit."""
+    coeffs = np.linspace(-1, 1, 11)
+    t = np.linspace(0, 1, 20000)
+
+    def workload():
+        np.polyval(coeffs, t)
+        v = 0.0
+        for k in range(20000):
+            v += 1e-3*(k % 7) - 1e-4*v
+        return v
+    return workload
+
+
+def _loops(fun, min_time: float):
+    """Number of calls of fun that lasts at least min_time."""
+    fun()
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fun()
+        if time.perf_counter() - t0 >= min_time or number >= 1 << 16:
+            return number
+        number *= 2
+
+
+def _run(fun, number: int):
+    t0 = time.perf_counter()
+    for _ in range(number):
+        fun()
+    return (time.perf_counter() - t0)/number
+
+
+def timeit(fun, unit, repeat: int, min_time: float = 0.02):
+    """
+    (median time per call, median time in calibration units) over `repeat` runs. Each run
+    of fun is paired with a run of the calibration workload `unit` right before it, so
+    frequency changes and load from other processes affect both sides of the ratio.
+    """
+    n_fun, n_unit = _loops(fun, min_time), _loops(unit, min_time)
+    times, ratios = [], []
+    for _ in range(repeat):
+        t_unit = _run(unit, n_unit)
+        t_fun = _run(fun, n_fun)
+        times.append(t_fun)
+        ratios.append(t_fun/t_unit)
+    return float(np.median(times)), float(np.median(ratios))
+
+
+# --------------------------------------------------
+# Casos
+# --------------------------------------------------
+def case_set_rower_cinematic(degree):
+    eq = equation(degree)
+    high = 0.5*np.ones(degree - 3)
+    return lambda: eq.set_rower_cinematic(high)
+
+
+def case_solve_edo(degree, n_t, regime):
+    eq = equation(degree, regime)
+    return lambda: eq.solve_edo(n_t_intervals=n_t)
+
+
+def case_calculate_energy(degree, n_t):
+    eq = equation(degree)
+    eq.solve_edo(n_t_intervals=n_t)
+    return eq.calculate_energy
+
+
+def case_fit(degree):
+    import matplotlib
+    matplotlib.use('Agg')
+    from interactive import InteractiveRowEquationPlot
+
+    rng = np.random.default_rng(0)
+    plot = InteractiveRowEquationPlot()
+    plot.degree = degree
+    ranges = {0: (-1, 0), 1: (-2, 2), 2: (-5, 5)}
+    plot.points = [(t, rng.uniform(*ranges[order]), order)
+                   for t, order in zip(rng.uniform(0, 1, 30), np.arange(30) % 3)]
+
+    def fit():
+        plot._rebuild_fit()
+        plot._apply_fit()
+    return fit
+
+
+def case_render_matplotlib(n_t):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    eq = equation(6)
+    sol = eq.solve_edo(n_t_intervals=n_t)
+    fig, axs = plt.subplots(3, 2, figsize=(12, 9))
+    lines = [ax.plot([], [])[0] for ax in axs.flat]
+
+    def render():
+        for ax, line, key in zip(axs.flat, lines, SERIES):
+            line.set_data(*downsample(sol['tt'], sol[key], points_for_width(ax.bbox.width)))
+            ax.relim()
+            ax.autoscale_view()
+        fig.canvas.draw()
+    return render
+
+
+def case_figure_plotly(n_t):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    eq = equation(6)
+    sol = eq.solve_edo(n_t_intervals=n_t)
+
+    def figure():
+        fig = make_subplots(rows=2, cols=3)
+        domain = fig.layout.xaxis.domain
+        n_out = points_for_width((900 - 160)*(domain[1] - domain[0]))   # como en app.py
+        for i, key in enumerate(SERIES):
+            x, y = downsample(sol['tt'], sol[key], n_out)
+            fig.add_trace(go.Scatter(x=x, y=y, mode='lines'), row=i//3 + 1, col=i % 3 + 1)
+        return fig.to_json()
+    return figure
+
+
+def cases(degrees, n_ts, regimes):
+    """Yields (name, factory) for every case of the grid."""
+    for d in degrees:
+        yield f'set_rower_cinematic[deg={d}]', lambda d=d: case_set_rower_cinematic(d)
+        yield f'fit[deg={d}]', lambda d=d: case_fit(d)
+        for n in n_ts:
+            yield f'calculate_energy[deg={d},n_t={n}]', lambda d=d, n=n: case_calculate_energy(d, n)
+            for r in regimes:
+                yield f'solve_edo[deg={d},n_t={n},{r}]', lambda d=d, n=n, r=r: case_solve_edo(d, n, r)
+    for n in n_ts:
+        yield f'render_matplotlib[n_t={n}]', lambda n=n: case_render_matplotlib(n)
+        yield f'figure_plotly[n_t={n}]', lambda n=n: case_figure_plotly(n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--degrees', type=int, nargs='+', default=[4, 7, 10])
+    parser.add_argument('--n-t', type=int, nargs='+', default=[500, 5000, 50000])
+    parser.add_argument('--regimes', nargs='+', choices=list(REGIMES), default=list(REGIMES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='only cases whose name contains this text')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='store the timings as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.3, help='allowed slowdown (0.3 = 30%%)')
+    parser.add_argument('--floor', type=float, default=1.0,
+                        help='cases faster than this (ms) are not checked for regressions')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['cases']
+
+    unit = calibration()
+    unit_time = timeit(unit, unit, args.repeat)[0]
+    print(f"{'calibration':45s} {unit_time*1e3:10.3f} ms (1 unit)")
+    results, regressions = {}, []
+    for name, factory in cases(args.degrees, args.n_t, args.regimes):
+        if args.filter not in name:
+            continue
+        try:
+            fun = factory()
+        except ImportError as exc:
+            print(f"{name:45s}   skipped ({exc.name} not installed)")
+            continue
+        t, units = timeit(fun, unit, args.repeat)
+        results[name] = units
+        line = f"{name:45s} {t*1e3:10.3f} ms {units:9.3f} units"
+        if name in baseline and not args.save:
+            ratio = results[name]/baseline[name]
+            line += f"   x{ratio:5.2f} vs baseline"
+            if t*1e3 < args.floor:
+                line += "   (below floor)"
+            elif ratio > 1 + args.threshold:
+                regressions.append(name)
+                line += "   REGRESSION"
+        print(line)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'unit': 'calibration', 'calibration_s': unit_time, 'cases': dict(sorted(baseline.items()))},
+                      f, indent=2)
+        print(f"Baseline saved to {args.baseline} ({len(results)} cases)")
+    elif regressions:
+        print(f"{len(regressions)} cases above {args.floor} ms slower than baseline*(1 + {args.threshold})")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
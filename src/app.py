@@ -1,10 +1,17 @@
+import io
+import os
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from rowEquation import RowEquation
+from simcache import SimulationCache
+from surrogate import Surrogate
+from downsample import downsample, points_for_width
+from sensitivity import parameter_sensitivities
 import random
 import stream_app.parts as parts
+from stream_app.jobs import (JobManager, guardar_solucion, mostrar_trabajos, tarea_barrido,
+                             tarea_optimizacion, tarea_solucion, trabajos_de_sesion)
 from streamlit_plotly_events import plotly_events
 
 
@@ -12,6 +19,29 @@ st.set_page_config(layout="wide",
     page_title="Rower-Boat-Water 1D System",
     page_icon="assets/icon.png",   # puede ser .png, .ico, .jpg
 )
+
+ANCHO_GRAFICAS = 900     # px aproximados de col_graficas (3/5 del layout ancho)
+MARGENES_PLOTLY = 160    # márgenes izquierdo + derecho por defecto de Plotly (80 + 80 px)
+
+
+@st.cache_resource
+def get_cache():
+    """Simulation cache shared by every session (ROW_CACHE_DIR enables the npz tier on disk)."""
+    return SimulationCache(maxsize=128, disk_dir=os.environ.get("ROW_CACHE_DIR"))
+
+
+@st.cache_resource
+def get_jobs():
+    """Background job pool shared by every session (each session keeps its own job ids)."""
+    return JobManager(max_workers=int(os.environ.get("ROW_JOB_WORKERS", 4)))
+
+
+@st.cache_resource
+def get_surrogate():
+    """Surrogate table of the magnitudes (src/surrogate.py), loaded from ROW_SURROGATE if set."""
+    path = os.environ.get("ROW_SURROGATE")
+    return Surrogate(path) if path and os.path.exists(path) else None
+
 # --------------------------------------------------
 # LAYOUT
 # --------------------------------------------------
@@ -36,6 +66,15 @@ with col_form:
         S = st.number_input("S", value=0.3)
         Cd = st.number_input("Cd", value=0.8)
         y0_dot = st.number_input("y0_dot", value=0.0)
+        metodo = st.selectbox("Integrador (RK4: previsualización rápida de paso fijo)",
+                              ["RK45", "RK4", "Radau", "BDF", "LSODA", "DOP853"])
+        semilla = st.number_input("Semilla de los coeficientes libres", value=0, step=1)
+        n_frames = st.number_input("Frames de la animación", value=150, step=10, min_value=10)
+        ver_sensibilidades = st.checkbox("Sensibilidades a los parámetros (tornado)")
+        salida_tornado = st.selectbox("Magnitud del tornado", ["p_f", "v_f", "dE_rower"], index=1)
+        periodico = st.checkbox("Régimen periódico (busca y0_dot con v_f = y0_dot)")
+        solo_tabla = st.checkbox("Solo magnitudes desde la tabla precalculada (si la cubre)",
+                                 disabled=get_surrogate() is None)
 
         recalcular = st.form_submit_button("Recalcular")
         # Elegir la gráfica X(t) interactiva
@@ -45,17 +84,47 @@ with col_form:
                                             "x''(t) — Rower Acceleration"])
 
         # N_puntos = st.number_input("Número de puntos a seleccionar", min_value=1, value=3, step=1)
+# Coeficientes aleatorios reproducibles: la misma semilla vuelve a la misma configuración
+rng = random.Random(int(semilla))
+high_coeffs = [rng.uniform(-3, 3) for _ in range(grado - 3)]
+params = dict(m=m, M=M, L=L, T=T, rho=rho, S=S, Cd=Cd, y0_dot=y0_dot)
+
+# Magnitudes al instante desde la tabla; fuera de ella se integra la EDO completa
+rapidas = None
+if recalcular and solo_tabla and not periodico and get_surrogate() is not None:
+    rapidas = get_surrogate().magnitudes(params, high_coeffs)
+completo = recalcular and rapidas is None
+
 # --------------------------------------------------
 # RESULTADOS Y GRÁFICAS A LA IZQUIERDA
 # --------------------------------------------------
 with col_graficas:
 
-    if recalcular:
-        modelo = RowEquation(m, M, L, T, rho, S, Cd)
-        high_coeffs = [random.uniform(-3, 3) for _ in range(grado - 3)]
-        modelo.y0_dot = y0_dot
-        modelo.set_rower_cinematic(high_coeffs)
-        solution = modelo.solve_edo()
+    if rapidas is not None:
+        st.subheader("Magnitudes (tabla precalculada)")
+        for col, (clave, unidad) in zip(st.columns(3), [("v_f", "m/s"), ("p_f", "m"), ("dE_rower", "J")]):
+            col.metric(clave, f"{rapidas[clave]:.3f} {unidad}")
+            col.caption(f"error estimado ± {rapidas[clave + '_err']:.2g} {unidad}")
+
+    if completo:
+        if solo_tabla and not periodico:
+            st.caption("La configuración está fuera de la tabla: se integra la EDO completa.")
+        cache = get_cache()
+        try:
+            modelo = cache.solve(params, high_coeffs, periodic=periodico, method=metodo)
+        except FloatingPointError as exc:
+            st.error(str(exc))
+            st.stop()
+        solution = modelo.solution
+        if solution['solver']['status'] < 0:
+            st.error(f"La integración ha fallado ({metodo}): {solution['solver']['message']}")
+            st.stop()
+        stats = cache.stats
+        st.caption(f"Caché de simulaciones: {stats['hits']} aciertos, {stats['disk_hits']} desde disco, "
+                   f"{stats['misses']} fallos")
+        if periodico:
+            st.caption(f"y0_dot periódico = {modelo.y0_dot:.4f} m/s en "
+                       f"{solution['periodic']['iterations']} iteraciones de Newton")
 
         st.subheader("Gráficas de resultados")
 
@@ -72,14 +141,18 @@ with col_graficas:
             subplot_titles=nombres
         )
 
-        # Añadir series a subplots
+        # Añadir series a subplots, reducidas a ~2 puntos por píxel del área de dibujo de cada
+        # subplot: ancho de la columna de gráficas menos los márgenes de Plotly, por su dominio
+        dominio = fig.layout.xaxis.domain
+        n_puntos = points_for_width((ANCHO_GRAFICAS - MARGENES_PLOTLY)*(dominio[1] - dominio[0]))
         row = 1
         col = 1
         for i in range(6):
+            tt_plot, serie_plot = downsample(solution['tt'], resultados[i], n_puntos)
             fig.add_trace(
                 go.Scatter(
-                    x=solution['tt'],
-                    y=resultados[i],
+                    x=tt_plot,
+                    y=serie_plot,
                     mode='lines',
                     name=nombres[i],
                     line=dict(color='black')  # <-- línea negra
@@ -96,6 +169,18 @@ with col_graficas:
         fig.update_layout(height=900, showlegend=False)
         st.plotly_chart(fig, use_container_width=True)
 
+        # Las gráficas van reducidas; la descarga lleva las series completas
+        buffer = io.BytesIO()
+        claves = ['tt', 'xx', 'xx_dot', 'xx_ddot', 'yy', 'yy_dot', 'yy_ddot']
+        np.savetxt(buffer, np.column_stack([solution[k] for k in claves]), delimiter=',',
+                   header=','.join(claves), comments='')
+        st.download_button("Descargar series completas (CSV)", buffer.getvalue(),
+                           file_name="solucion.csv", mime="text/csv")
+
+        if ver_sensibilidades:
+            sens = parameter_sensitivities(modelo)
+            st.plotly_chart(parts.figura_tornado(sens, salida_tornado), use_container_width=True)
+
          # -----------------------------
         # Gráfica interactiva para click
         # -----------------------------
@@ -108,8 +193,9 @@ with col_graficas:
             print(puntos_seleccionados)
 
 with col_digram:
-    if recalcular:
-        parts.animar_bola_1d(solution['xx'], T = modelo.T, L = modelo.L)
+    if completo:
+        parts.animar_bola_1d(solution['xx'], T = modelo.T, L = modelo.L,
+                             y_positions=solution['yy'], max_frames=int(n_frames))
         st.text("Funcion de posición x(t) del remero:")
         latex_str = rf"x(t) = {' + '.join(
             f'{c:.2f}t^{{{i}}}' if i > 1 else (f'{c:.2f}t' if i == 1 else f'{c:.2f}')
@@ -120,3 +206,37 @@ with col_digram:
 
     st.image("assets/diagram.png"
     )
+
+# --------------------------------------------------
+# TRABAJOS EN SEGUNDO PLANO
+# --------------------------------------------------
+st.header("Trabajos en segundo plano")
+col_lanzar, col_trabajos = st.columns([1, 3])
+
+with col_lanzar:
+    with st.form("formulario_trabajos"):
+        tipo = st.selectbox("Trabajo", ["Solución de alta resolución", "Barrido de y0_dot",
+                                        "Optimizar la cinemática"])
+        n_puntos_trabajo = st.number_input("Puntos de la solución", value=200000, step=10000, min_value=1000)
+        v_min, v_max = st.slider("Rango de y0_dot del barrido", 0.0, 20.0, (1.0, 8.0))
+        n_casos = st.number_input("Casos del barrido", value=2000, step=100, min_value=10)
+        magnitud = st.selectbox("Magnitud a maximizar", ["p_f", "v_f"])
+        lanzar = st.form_submit_button("Lanzar")
+
+    if lanzar:
+        trabajos = get_jobs()
+        coeffs = high_coeffs or [0.0]
+        if tipo == "Solución de alta resolución":
+            job_id = trabajos.submit(f"Solución con {n_puntos_trabajo} puntos", tarea_solucion,
+                                     params, high_coeffs, int(n_puntos_trabajo), metodo,
+                                     on_done=guardar_solucion(get_cache(), params, high_coeffs,
+                                                              int(n_puntos_trabajo), metodo))
+        elif tipo == "Barrido de y0_dot":
+            job_id = trabajos.submit(f"Barrido y0_dot ∈ [{v_min}, {v_max}]", tarea_barrido,
+                                     params, coeffs, v_min, v_max, int(n_casos))
+        else:
+            job_id = trabajos.submit(f"Maximizar {magnitud}", tarea_optimizacion, params, coeffs, magnitud)
+        trabajos_de_sesion().append(job_id)
+
+with col_trabajos:
+    mostrar_trabajos(get_jobs())
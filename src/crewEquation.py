@@ -0,0 +1,137 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from kinematics import horner_rows, poly_derivative
+from rowEquation import RowEquation
+
+
+class CrewEquation():
+    """
+    Crew boat (2x, 4x, 8+...) during the air phase: one hull of mass M and n_seats rowers.
+
+    Each seat i has its own mass m_i, recovery length L_i and duration T_i, free polynomial
+    coefficients and a timing offset d_i: it moves on [d_i, d_i + T_i] following the
+    polynomial built by RowEquation.set_rower_cinematic and stays still outside it. The boat
+    EDO is driven by the mass-weighted sum of the seats' accelerations,
+
+        (M + sum(m_i)) y'' = -0.5*rho*S*Cd*|y'|*y' - sum(m_i * x_i''(t - d_i))
+
+    and the seat sum is evaluated as one array operation over the coefficient matrix.
+    """
+
+    def __init__(self, masses, M: float = 96, L=-1, T=1, offsets=0, rho: float = 1000, S: float = 1.2,
+                 Cd: float = 0.004):
+        self.masses = np.atleast_1d(np.asarray(masses, dtype=float))
+        n_seats = len(self.masses)
+        self.n_seats = n_seats
+        self.M = M
+        self.L = np.broadcast_to(np.asarray(L, dtype=float), (n_seats,)).copy()
+        self.T_seats = np.broadcast_to(np.asarray(T, dtype=float), (n_seats,)).copy()
+        self.offsets = np.broadcast_to(np.asarray(offsets, dtype=float), (n_seats,)).copy()
+        self.rho = rho
+        self.S = S
+        self.Cd = Cd
+        self.mu = 1/(M + self.masses.sum())
+        self.B = self.masses*self.mu          # peso de cada asiento en el forzamiento
+        self.A = -0.5*self.S*self.rho*self.Cd*self.mu
+        self.t0 = float(np.min(self.offsets))
+        self.T = float(np.max(self.offsets + self.T_seats))
+        self.y0_dot = 5
+        self.seats = []
+        self.coeffs = None
+        self.solution = None
+
+    def set_rower_cinematic(self, high_coeffs=()):
+        """
+        high_coeffs: one list of free coefficients a4..an for the whole crew, or one list per
+        seat. Each seat builds its polynomial with RowEquation.set_rower_cinematic.
+        """
+        if len(high_coeffs) == 0 or np.ndim(high_coeffs[0]) == 0:
+            high_coeffs = [list(high_coeffs)]*self.n_seats
+        if len(high_coeffs) != self.n_seats:
+            raise ValueError(f"Se esperaban coeficientes para {self.n_seats} asientos")
+
+        self.seats = []
+        for i in range(self.n_seats):
+            seat = RowEquation(m=self.masses[i], M=self.M, L=self.L[i], T=self.T_seats[i],
+                               rho=self.rho, S=self.S, Cd=self.Cd)
+            seat.set_rower_cinematic(high_coeffs[i])
+            self.seats.append(seat)
+
+        n = max(len(seat.coeffs) for seat in self.seats)
+        self.coeffs = np.zeros((self.n_seats, n))
+        for i, seat in enumerate(self.seats):
+            self.coeffs[i, :len(seat.coeffs)] = seat.coeffs
+        self._vel_coeffs = poly_derivative(self.coeffs, 1)
+        self._acc_coeffs = poly_derivative(self.coeffs, 2)
+        return self.coeffs.shape
+
+    def _local_time(self, t):
+        """Time of each seat inside its own recovery (one row per seat) and the seat durations."""
+        t = np.asarray(t, dtype=float)
+        shape = (-1,) + (1,)*t.ndim
+        return t - self.offsets.reshape(shape), self.T_seats.reshape(shape)
+
+    def x(self, t):
+        """Position of every seat relative to the hull: (n_seats,) for scalar t, (n_seats, n_t) otherwise."""
+        tau, T = self._local_time(t)
+        return horner_rows(self.coeffs, np.clip(tau, 0, T))   # quieto en 0 antes y en L después
+
+    def x_dot(self, t):
+        tau, T = self._local_time(t)
+        return np.where((tau >= 0) & (tau <= T), horner_rows(self._vel_coeffs, tau), 0.0)
+
+    def x_ddot(self, t):
+        tau, T = self._local_time(t)
+        return np.where((tau >= 0) & (tau <= T), horner_rows(self._acc_coeffs, tau), 0.0)
+
+    def augmented_edo(self, t, state):
+        """[y', y, drag dissipation, drag impulse, work of each seat]."""
+        v = state[0]
+        xd = self.x_dot(t)
+        xdd = self.x_ddot(t)
+        drag = self.A*abs(v)*v
+        v_dot = drag - self.B @ xdd
+        F_drag = drag/self.mu
+        seat_power = self.masses*(xdd + v_dot)*xd
+        return np.concatenate([[v_dot, v, -F_drag*v, F_drag], seat_power])
+
+    def solve_edo(self, y0_dot: float = None, n_t_intervals: int = 5000, rtol: float = 1e-6,
+                  atol: float = 1e-9):
+        """
+        Solves the crew EDO over [min(d_i), max(d_i + T_i)]. Series of the seats have shape
+        (n_seats, n_t); the magnitudes include the energy spent by every seat in 'dE_seats'.
+        """
+        y0_dot = self.y0_dot if y0_dot is None else y0_dot
+        state0 = np.zeros(4 + self.n_seats)
+        state0[0] = y0_dot
+        tt = np.linspace(self.t0, self.T, n_t_intervals)
+        sol = solve_ivp(self.augmented_edo, (self.t0, self.T), state0, t_eval=tt, rtol=rtol, atol=atol)
+
+        yy_dot = sol.y[0]
+        xx_ddot = self.x_ddot(tt)
+        solution = {'tt': tt,
+                    'xx': self.x(tt),
+                    'xx_dot': self.x_dot(tt),
+                    'xx_ddot': xx_ddot,
+                    'yy': sol.y[1],
+                    'yy_dot': yy_dot,
+                    'yy_ddot': self.A*np.abs(yy_dot)*yy_dot - self.B @ xx_ddot}
+
+        total_mass = self.M + self.masses.sum()
+        Ei = 0.5*total_mass*y0_dot**2
+        Ef = 0.5*total_mass*yy_dot[-1]**2
+        dE_seats = sol.y[4:, -1]
+        solution['magnitudes'] = {
+            'Ei': Ei,
+            'Ef': Ef,
+            'dE_sist': Ef - Ei,
+            'dE_rower': dE_seats.sum(),
+            'dE_seats': dE_seats,
+            'p_f': sol.y[1, -1],
+            'v_f': yy_dot[-1],
+            'dv': yy_dot[-1] - y0_dot,
+            'W_drag': sol.y[2, -1],
+            'impulse': sol.y[3, -1]}
+        self.solution = solution
+        return solution
@@ -0,0 +1,80 @@
+"""
+Shape-preserving downsampling of the solution series before plotting.
+
+A line plot cannot show more than a couple of points per horizontal pixel, so the series
+are reduced to a budget tied to the plot width:
+
+- minmax: splits the series into buckets and keeps the first, last, minimum and maximum
+  of each one in time order. Fully vectorized; peaks are never lost.
+- lttb: Largest-Triangle-Three-Buckets, keeps in each bucket the point that forms the
+  largest triangle with the previous kept point and the mean of the next bucket.
+
+The solution arrays are never modified: only the plotted copies are reduced.
+"""
+import numpy as np
+
+METHODS = ('minmax', 'lttb')
+
+
+def points_for_width(width_px: float, points_per_pixel: float = 2, minimum: int = 100):
+    """Point budget of a plot width_px pixels wide."""
+    return max(int(width_px*points_per_pixel), minimum)
+
+
+def _bucket_edges(n: int, n_buckets: int):
+    return np.linspace(0, n, n_buckets + 1).astype(int)
+
+
+def minmax_indices(y, n_out: int):
+    """
+    Indices (sorted) of the first, last, min and max point of n_out//4 buckets. The points
+    left over by the equal-size buckets form one last partial bucket, and the final point
+    is always kept.
+    """
+    y = np.asarray(y)
+    n = len(y)
+    n_buckets = max(n_out // 4, 1)
+    if n <= n_out or n < 4*n_buckets:
+        return np.arange(n)
+    size = n // n_buckets
+    end = size*n_buckets
+    body = y[:end].reshape(n_buckets, size)
+    start = np.arange(n_buckets)*size
+    parts = [start, start + size - 1,
+             start + np.argmin(body, axis=1), start + np.argmax(body, axis=1), [n - 1]]
+    if end < n:
+        # Bucket parcial con el resto
+        parts += [[end, end + np.argmin(y[end:]), end + np.argmax(y[end:])]]
+    return np.unique(np.concatenate(parts))
+
+
+def lttb_indices(x, y, n_out: int):
+    """Indices of the Largest-Triangle-Three-Buckets selection (first and last point kept)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = _bucket_edges(n - 2, n_out - 2) + 1
+    idx = np.empty(n_out, dtype=int)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        cx = x[nxt_lo:nxt_hi].mean()
+        cy = y[nxt_lo:nxt_hi].mean()
+        # Doble del área del triángulo (a, j, c) para cada candidato j del bucket
+        area = np.abs((x[a] - cx)*(y[lo:hi] - y[a]) - (x[a] - x[lo:hi])*(cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def downsample(x, y, n_out: int, method: str = 'minmax'):
+    """Reduced copies (x, y) of a series with at most ~n_out points."""
+    if method not in METHODS:
+        raise ValueError(f"Método no soportado: {method}. Opciones: {METHODS}")
+    idx = minmax_indices(y, n_out) if method == 'minmax' else lttb_indices(x, y, n_out)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
@@ -0,0 +1,110 @@
+"""
+Stroke events located by solve_ivp with root refinement.
+
+Each event is a function f(eq, t, state) whose zero crossing marks the event, plus the
+crossing direction that solve_ivp must watch (+1: f goes from negative to positive,
+-1: positive to negative, 0: both). state is the augmented state of RowEquation:
+[y', y, rower work, drag dissipation, drag impulse].
+
+solve_ivp only reports interior crossings. Extremum events (f is the derivative of the
+quantity, e.g. y'' for the boat-speed min) are also checked at t=0 and t=T: an endpoint is an
+extremum when f already lies past the crossing at t=0, or has not reached it at t=T.
+"""
+import numpy as np
+
+
+def boat_acceleration(eq, t, state):
+    v = state[0]
+    return eq.A*np.abs(v)*v - eq.B*eq.kinematics.x_ddot(t)
+
+
+def boat_speed(eq, t, state):
+    return state[0]
+
+
+def rower_jerk(eq, t, state):
+    return eq.kinematics.x_dddot(t)
+
+
+def boat_jerk(eq, t, state):
+    """d/dt y''(t) = 2A|v| y'' - B x'''(t)."""
+    return 2*eq.A*np.abs(state[0])*boat_acceleration(eq, t, state) - eq.B*eq.kinematics.x_dddot(t)
+
+
+# nombre: (función, dirección, extremo)
+EVENTS = {
+    'boat_speed_min': (boat_acceleration, 1, True),     # y'' pasa de negativa a positiva
+    'boat_speed_max': (boat_acceleration, -1, True),
+    'boat_speed_zero': (boat_speed, 0, False),          # cambio de sentido del barco
+    'rower_accel_peak': (rower_jerk, -1, True),         # máximo de x''
+    'rower_accel_min': (rower_jerk, 1, True),
+    'check': (boat_jerk, 1, True),                      # máxima deceleración del barco (check)
+}
+
+
+def build_events(eq, events):
+    """
+    Turns a list of registered names, or a dict {name: name | f(eq, t, state) |
+    (f, direction) | (f, direction, extremum)}, into (names, solve_ivp event callables).
+    Custom events are not extrema unless stated, so their endpoints are not checked.
+    """
+    if isinstance(events, dict):
+        items = list(events.items())
+    else:
+        items = [(name, name) for name in events]
+
+    names, funcs = [], []
+    for name, spec in items:
+        if isinstance(spec, str):
+            if spec not in EVENTS:
+                raise ValueError(f"Evento desconocido: {spec}. Opciones: {tuple(EVENTS)}")
+            fun, direction, extremum = EVENTS[spec]
+        elif isinstance(spec, tuple):
+            fun, direction, extremum = (tuple(spec) + (False,))[:3]
+        else:
+            fun, direction, extremum = spec, 0, False
+
+        def event(t, state, fun=fun):
+            return fun(eq, t, state)
+        event.direction = direction
+        event.terminal = False
+        event.extremum = extremum
+        names.append(name)
+        funcs.append(event)
+    return names, funcs
+
+
+def _at_endpoint(event, t, state, end):
+    """Whether the extremum event occurs at the endpoint t (end=False: t=0, end=True: t=T)."""
+    if event.direction == 0:
+        return True
+    side = event.direction*event(t, state)
+    return side < 0 if end else side > 0
+
+
+def collect_events(eq, names, funcs, sol):
+    """
+    Event times and states of a solve_ivp result as {name: {'t', 'yy_dot', 'yy', 'xx',
+    'xx_dot', 'xx_ddot'}}, including the endpoint extrema that solve_ivp does not report.
+    """
+    t0, tf = sol.t[0], sol.t[-1]
+    tol = 1e-9*(tf - t0)
+    out = {}
+    for name, event, t_ev, y_ev in zip(names, funcs, sol.t_events, sol.y_events):
+        t_ev = np.asarray(t_ev, dtype=float)
+        y_ev = np.asarray(y_ev, dtype=float).reshape(-1, 5)
+        if event.extremum:
+            # solve_ivp solo ve cruces interiores: los extremos en t=0 o t=T se comprueban aparte
+            if _at_endpoint(event, t0, sol.y[:, 0], end=False) and not np.any(t_ev - t0 < tol):
+                t_ev = np.concatenate([[t0], t_ev])
+                y_ev = np.vstack([sol.y[:, 0], y_ev])
+            if _at_endpoint(event, tf, sol.y[:, -1], end=True) and not np.any(tf - t_ev < tol):
+                t_ev = np.concatenate([t_ev, [tf]])
+                y_ev = np.vstack([y_ev, sol.y[:, -1]])
+        out[name] = {'t': t_ev,
+                     'yy_dot': y_ev[:, 0],
+                     'yy': y_ev[:, 1],
+                     'xx': eq.kinematics.x(t_ev),
+                     'xx_dot': eq.kinematics.x_dot(t_ev),
+                     'xx_ddot': eq.kinematics.x_ddot(t_ev)}
+    return out
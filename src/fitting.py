@@ -0,0 +1,95 @@
+import numpy as np
+
+
+def constrained_basis(t, T: float, L: float, degree: int, order: int = 2):
+    """
+    Closed form of the rower cinematic under the boundary conditions of set_rower_cinematic.
+
+    With a2 and a3 eliminated, the order-th derivative of x(t) is linear in the free
+    coefficients a4..an:  x^(order)(t) = base(t) + Phi(t) @ [a4, ..., an].
+    Returns (base, Phi) with shapes (n_t,) and (n_t, degree - 3).
+    """
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    k = np.arange(4, degree + 1)
+    tc = t[:, None]
+    if order == 0:
+        base = 3*L*t**2/T**2 - 2*L*t**3/T**3
+        Phi = tc**k + (k - 3)*T**(k - 2)*tc**2 - (k - 2)*T**(k - 3)*tc**3
+    elif order == 1:
+        base = 6*L*t/T**2 - 6*L*t**2/T**3
+        Phi = k*tc**(k - 1) + 2*(k - 3)*T**(k - 2)*tc - 3*(k - 2)*T**(k - 3)*tc**2
+    elif order == 2:
+        base = 6*L/T**2 - 12*L*t/T**3
+        Phi = k*(k - 1)*tc**(k - 2) + 2*(k - 3)*T**(k - 2) - 6*(k - 2)*T**(k - 3)*tc
+    else:
+        raise ValueError(f"Orden de derivada no soportado: {order} (0, 1 o 2)")
+    return base, Phi
+
+
+class KinematicFit():
+    """
+    Least-squares fit of the free coefficients a4..an to targets on x(t), x'(t) or x''(t).
+
+    The fit is updated incrementally: every call to add() folds the new rows into the
+    triangular factor R of a running QR decomposition, so refitting after each clicked
+    point costs O(n_free^2) per row instead of rebuilding the whole problem. Thousands of
+    targets can be added at once as arrays.
+    """
+
+    def __init__(self, T: float, L: float, degree: int):
+        self.T = T
+        self.L = L
+        self.degree = degree
+        self.n_free = degree - 3
+        self.reset()
+
+    def reset(self):
+        self._R = np.zeros((0, self.n_free))
+        self._qtb = np.zeros(0)
+        self._res2 = 0.0
+        self.n_points = 0
+
+    def add(self, t, target, order: int = 2, weight: float = 1.0):
+        """Adds one or many targets x^(order)(t) = target."""
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        target = np.broadcast_to(np.asarray(target, dtype=float), t.shape)
+        base, Phi = constrained_basis(t, self.T, self.L, self.degree, order)
+        self._fold(weight*Phi, weight*(target - base))
+        self.n_points += len(t)
+        return self
+
+    def regularize(self, weight: float):
+        """
+        Adds the Tikhonov rows weight*s_k*a_k = 0 pulling every free coefficient toward 0,
+        s_k being the rms of its basis function over [0, T] (so weight is per metre of rms
+        displacement). Their penalty is included in residual.
+        """
+        _, Phi = constrained_basis(np.linspace(0, self.T, 101), self.T, self.L, self.degree, 0)
+        self._fold(weight*np.diag(np.sqrt(np.mean(Phi**2, axis=0))), np.zeros(self.n_free))
+        return self
+
+    def _fold(self, rows, rhs):
+        M = np.vstack([self._R, rows])
+        b = np.concatenate([self._qtb, rhs])
+        Q, R = np.linalg.qr(M)
+        qtb = Q.T @ b
+        # Lo que no cabe en el espacio de columnas es residuo: se acumula sin guardar filas
+        self._res2 += max(float(b @ b - qtb @ qtb), 0.0)
+        self._R, self._qtb = R, qtb
+
+    def coeffs(self):
+        """Free coefficients a4..an (minimum norm solution while under-determined)."""
+        if self.n_points == 0:
+            return np.zeros(self.n_free)
+        return np.linalg.lstsq(self._R, self._qtb, rcond=None)[0]
+
+    @property
+    def residual(self):
+        """Sum of squared residuals of the current fit."""
+        a = self.coeffs()
+        return self._res2 + float(np.sum((self._R @ a - self._qtb)**2))
+
+
+def fit_free_coeffs(t, target, T: float, L: float, degree: int, order: int = 2):
+    """One-shot fit of a4..an to targets on the order-th derivative of x(t)."""
+    return KinematicFit(T, L, degree).add(t, target, order).coeffs()
@@ -1,25 +1,63 @@
-import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button, Slider, TextBox
 from rowEquation import RowEquation
+from fitting import KinematicFit
+from surrogate import Surrogate
+from downsample import downsample, points_for_width
 import matplotlib.image as mpimg
 
 
+# (fila, columna, clave de la solución, color, título, etiqueta y)
+PANELS = [
+    (0, 0, 'xx', 'blue', 'x(t) — Rower Position', 'Position [m]'),
+    (1, 0, 'xx_dot', 'red', "x'(t) — Rower Speed", 'Speed [m/s]'),
+    (2, 0, 'xx_ddot', 'green', "x''(t) — Rower Acceleration", 'Acceleration [m/s²]'),
+    (0, 1, 'yy', 'blue', 'y(t) — Boat Position', 'Position [m]'),
+    (1, 1, 'yy_dot', 'red', "y'(t) — Boat Speed", 'Speed [m/s]'),
+    (2, 1, 'yy_ddot', 'green', "y''(t) — Boat Acceleration", 'Acceleration [m/s²]'),
+]
+
+
 class InteractiveRowEquationPlot:
-    def __init__(self):
+    # Eje y: margen al reescalar y fracción mínima del eje que deben ocupar los datos
+    MARGIN = 0.1
+    SHRINK = 0.4
+
+    def __init__(self, n_t_intervals: int = 5000, debounce_ms: int = 150, surrogate_path: str = None,
+                 solve_delay_ms: int = 400):
         self.eq = RowEquation()
+        # Tabla precalculada: magnitudes al instante mientras se editan parámetros dentro de ella
+        self.surrogate = Surrogate(surrogate_path) if surrogate_path else None
         self.degree = 4
-        self.points = []
+        self.n_t_intervals = n_t_intervals
+        self.points = []  # (t, valor, orden): objetivos sobre x (0), x' (1) o x'' (2)
+        self.fit = None
+        # Base de Chebyshev en [0, T]: grados altos del slider bien condicionados
+        self.basis = 'chebyshev'
 
         # Inicializar polinomio y solución
-        self.eq.set_rower_cinematic([1])
-        self.eq.solve_edo()
+        self.eq.set_rower_cinematic([1], basis=self.basis)
+        self.eq.solve_edo(n_t_intervals=self.n_t_intervals)
 
         # Figura con 3x2 subplots
         self.fig, self.axs = plt.subplots(4, 2, figsize=(15, 12))
         plt.subplots_adjust(right=0.78, hspace=0.4)
         self.cid = self.fig.canvas.mpl_connect('button_press_event', self.onclick)
-
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+        # El slider del grado dispara muchos eventos al arrastrarlo: se recalcula al parar
+        self._pending_degree = None
+        self._timer = self.fig.canvas.new_timer(interval=debounce_ms)
+        self._timer.single_shot = True
+        self._timer.add_callback(self._apply_degree)
+        # Con la tabla, la integración completa (curvas) se aplaza hasta que se dejan de editar
+        self._solve_timer = self.fig.canvas.new_timer(interval=solve_delay_ms)
+        self._solve_timer.single_shot = True
+        self._solve_timer.add_callback(self._full_solve)
+
+        self._background = None
+        self._xmax = None
+        self._setup_axes()
         self._add_controls()
         self.draw_plots()
         plt.show()
@@ -52,10 +90,14 @@ class InteractiveRowEquationPlot:
         # self.box_y0_dot.on_submit(self.update_param)
 
         # Botones
-        self.ax_reset = plt.axes([slider_ax, 0.15, 0.15, 0.05])
+        self.ax_reset = plt.axes([slider_ax, 0.15, 0.07, 0.05])
         self.button_reset = Button(self.ax_reset, 'Reset puntos')
         self.button_reset.on_clicked(self.reset_points)
 
+        self.ax_rescale = plt.axes([slider_ax + 0.08, 0.15, 0.07, 0.05])
+        self.button_rescale = Button(self.ax_rescale, 'Reescalar')
+        self.button_rescale.on_clicked(lambda event: self.draw_plots(rescale=True))
+
         self.ax_fit = plt.axes([slider_ax, 0.05, 0.15, 0.05])
         self.button_fit = Button(self.ax_fit, 'Ajustar')
         self.button_fit.on_clicked(self.fit_polynomial)
@@ -64,64 +106,98 @@ class InteractiveRowEquationPlot:
     # ------------------------------------------------------------------
     # Gráficas
     # ------------------------------------------------------------------
-    def draw_plots(self):
-
-        for i in range(3):
-            for j in range(2):
-                self.axs[i, j].clear()
+    def _setup_axes(self):
+        """Creates the persistent artists once: lines, target points, info text and diagram."""
+        self.lines = {}
+        self.point_markers = {}
+        self.legends = {}
+        for i, j, key, color, title, ylabel in PANELS:
+            ax = self.axs[i, j]
+            self.lines[key], = ax.plot([], [], color=color, animated=True)
+            ax.set_title(title)
+            ax.set_xlabel('Time [s]')
+            ax.set_ylabel(ylabel)
+            ax.grid(True)
+        for order in range(3):
+            self.point_markers[order], = self.axs[order, 0].plot([], [], 'o', color='black',
+                                                                 label='Puntos', animated=True)
+            # La leyenda es estática (va en el fondo): solo se muestra si el panel tiene puntos
+            self.legends[order] = self.axs[order, 0].legend(handles=[self.point_markers[order]],
+                                                            loc='upper right')
+            self.legends[order].set_visible(False)
+
+        self.info_text = self.fig.text(0.81, 0.33, '', fontsize=10, verticalalignment='top',
+                                       bbox=dict(facecolor='white', alpha=0.8), animated=True)
+
+        # Diagrama: se lee del disco una sola vez y ocupa la fila 4
+        for j in range(2):
+            self.axs[3, j].remove()
+        try:
+            img = mpimg.imread('assets/diagram.png')
+            ax_img = self.fig.add_axes([0.05, 0.00, 0.9, 0.25])
+            ax_img.imshow(img)
+            ax_img.axis('off')
+        except (FileNotFoundError, OSError):
+            pass
 
+    def _animated_artists(self):
+        return list(self.lines.values()) + list(self.point_markers.values()) + [self.info_text]
+
+    def _on_draw(self, event):
+        """After a full draw, caches the static background and paints the animated artists on top."""
+        canvas = self.fig.canvas
+        if getattr(canvas, 'supports_blit', False):
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self._animated_artists():
+            self.fig.draw_artist(artist)
+
+    def _update_ylim(self, ax, values, force: bool = False):
+        """
+        Rescales the y axis only when forced, when the data leave the current limits or when
+        they fill less than SHRINK of them (hysteresis, so small changes keep the limits and
+        the fast blit path). Returns True if the limits changed.
+        """
+        values = [v for v in values if len(v)]
+        if not values:
+            return False
+        lo = float(min(min(v) for v in values))
+        hi = float(max(max(v) for v in values))
+        y0, y1 = ax.get_ylim()
+        if not force and y0 <= lo and hi <= y1 and hi - lo >= self.SHRINK*(y1 - y0):
+            return False
+        pad = self.MARGIN*(hi - lo) or 0.5*max(abs(hi), 1.0)
+        ax.set_ylim(lo - pad, hi + pad)
+        return True
+
+    def draw_plots(self, update_info: bool = True, rescale: bool = False):
+        """
+        Updates the animated artists and blits them; a full redraw only happens when the
+        axes limits or the legends change (or rescale=True, the 'Reescalar' button).
+        """
         s = self.eq.solution
         if s is None:
             return
-        # --- x(t)
-        self.axs[0, 0].plot(s['tt'], s['xx'], color='blue')
-        self.axs[0, 0].set_title('x(t) — Rower Position')
-        self.axs[0, 0].set_xlabel('Time [s]')
-        self.axs[0, 0].set_ylabel('Position [m]')
-
-        self.axs[1, 0].plot(s['tt'], s['xx_dot'], color='red')
-        self.axs[1, 0].set_title("x'(t) — Rower Speed")
-        self.axs[1, 0].set_xlabel('Time [s]')
-        self.axs[1, 0].set_ylabel('Speed [m/s]')
-
-        self.axs[2, 0].plot(s['tt'], s['xx_ddot'], color='green')
-        self.axs[2, 0].set_title("x''(t) — Rower Acceleration")
-        self.axs[2, 0].set_xlabel('Time [s]')
-        self.axs[2, 0].set_ylabel('Acceleration [m/s²]')
-
-        if self.points:
-            px, py = zip(*self.points)
-            self.axs[2, 0].scatter(px, py, color='black', label='Puntos')
-            self.axs[2, 0].legend()
-
-        # --- y(t)
-        self.axs[0, 1].plot(s['tt'], s['yy'], color='blue')
-        self.axs[0, 1].set_title('y(t) — Boat Position')
-        self.axs[0, 1].set_xlabel('Time [s]')
-        self.axs[0, 1].set_ylabel('Position [m]')
-
-        self.axs[1, 1].plot(s['tt'], s['yy_dot'], color='red')
-        self.axs[1, 1].set_title("y'(t) — Boat Speed")
-        self.axs[1, 1].set_xlabel('Time [s]')
-        self.axs[1, 1].set_ylabel('Speed [m/s]')
-
-        self.axs[2, 1].plot(s['tt'], s['yy_ddot'], color='green')
-        self.axs[2, 1].set_title("y''(t) — Boat Acceleration")
-        self.axs[2, 1].set_xlabel('Time [s]')
-        self.axs[2, 1].set_ylabel('Acceleration [m/s²]')
-
-
-        for i in range(3):
-            for j in range(2):
-                self.axs[i, j].grid(True)
-                self.axs[i, j].set_xlim(0, self.eq.T)
-
-        if 'magnitudes' in s and self.eq.solution['magnitudes'] is not None:
-            for txt in self.fig.texts:
-                txt.remove()
+        full = rescale or self._background is None or self._xmax is None
+        # Solo se dibujan ~2 puntos por píxel del eje; self.eq.solution guarda la serie completa
+        shown = {}
+        for i, j, key, *_ in PANELS:
+            n_points = points_for_width(self.axs[i, j].bbox.width)
+            self.lines[key].set_data(*downsample(s['tt'], s[key], n_points))
+            shown[i, j] = [self.lines[key].get_ydata()]
+
+        for order in range(3):
+            pts = [(t, v) for t, v, o in self.points if o == order]
+            px, py = zip(*pts) if pts else ([], [])
+            self.point_markers[order].set_data(px, py)
+            shown[order, 0].append(py)
+            if self.legends[order].get_visible() != bool(pts):
+                self.legends[order].set_visible(bool(pts))
+                full = True
+
+        if update_info and 'magnitudes' in s and self.eq.solution['magnitudes'] is not None:
             mag = s['magnitudes']
             info_text = (
-                f"Ei: {mag['Ei']:.2f} J\n"                
+                f"Ei: {mag['Ei']:.2f} J\n"
                 f"Ef: {mag['Ef']:.2f} J\n"
                 f"dE_sist: {mag['dE_sist']:.2f} J\n"
                 f"dE_rower: {mag['dE_rower']:.2f} J\n"
@@ -129,40 +205,109 @@ class InteractiveRowEquationPlot:
                 f"v_f: {mag['v_f']:.2f} m/s\n"
                 f"dv: {mag['dv']:.2f} m/s"
             )
-            # Posición fija en la ventana de la figura
-            self.fig.text(0.81, 0.33, info_text, fontsize=10, verticalalignment='top', bbox=dict(facecolor='white', alpha=0.8))
-        try:
-            # Antes de dibujar la imagen
-            for j in range(2):
-                self.axs[3, j].remove()  # elimina los axes vacíos de la fila 4
-            img = mpimg.imread('assets/diagram.png')  # reemplaza con tu archivo
-            ax_img = self.fig.add_axes([0.05, 0.00, 0.9, 0.25])  # ajusta la posición y tamaño
-            ax_img.imshow(img)
-            ax_img.axis('off')
-        except:
-            pass
+            self.info_text.set_text(info_text)
 
-        self.fig.canvas.draw_idle()
+        # Límites: solo si cambian hace falta redibujar ejes y ticks (redibujado completo)
+        if self._xmax != self.eq.T:
+            self._xmax = self.eq.T
+            for i, j, *_ in PANELS:
+                self.axs[i, j].set_xlim(0, self.eq.T)
+            full = True
+        for (i, j), values in shown.items():
+            if self._update_ylim(self.axs[i, j], values, force=rescale):
+                full = True
+
+        canvas = self.fig.canvas
+        if full:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        for artist in self._animated_artists():
+            self.fig.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
 
     # ------------------------------------------------------------------
     # Eventos interactivos
     # ------------------------------------------------------------------
     def onclick(self, event):
-        if event.inaxes == self.axs[2, 0]:
-            self.points.append((event.xdata, event.ydata))
-            self.draw_plots()
+        for order in range(3):
+            if event.inaxes == self.axs[order, 0]:
+                self.add_points([event.xdata], [event.ydata], order)
+                return
+
+    def add_points(self, t, values, order: int = 2):
+        """Adds targets on x (order 0), x' (1) or x'' (2) and refits the curve live."""
+        self.points.extend((float(ti), float(vi), order) for ti, vi in zip(t, values))
+        if self.fit is None:
+            self._rebuild_fit()
+        else:
+            self.fit.add(t, values, order)
+        self._apply_fit()
+
+    def _rebuild_fit(self):
+        """Rebuilds the incremental fit from the stored points (degree, T or L changed)."""
+        self.fit = KinematicFit(self.eq.T, self.eq.L, self.degree)
+        for order in range(3):
+            pts = [(t, v) for t, v, o in self.points if o == order]
+            if pts:
+                t, v = zip(*pts)
+                self.fit.add(t, v, order)
+
+    def _apply_fit(self):
+        self.eq.set_rower_cinematic(self.fit.coeffs(), basis=self.basis)
+        self._solve()
+
+    def _solve(self):
+        """
+        Magnitudes from the surrogate table when it covers the configuration (the full solve is
+        then deferred until edits pause); otherwise solve_edo right away. Returns True if the
+        solution was computed now.
+        """
+        quick = None
+        if self.surrogate is not None:
+            params = {p: getattr(self.eq, p) for p in ('m', 'M', 'L', 'T', 'rho', 'S', 'Cd', 'y0_dot')}
+            quick = self.surrogate.magnitudes(params, self.eq.coeffs[4:])
+        if quick is None:
+            self._full_solve()
+            return True
+        self.info_text.set_text(
+            f"(tabla)\n"
+            f"dE_rower: {quick['dE_rower']:.2f} ± {quick['dE_rower_err']:.2f} J\n"
+            f"dx_f: {quick['p_f']:.2f} ± {quick['p_f_err']:.3f} m\n"
+            f"v_f: {quick['v_f']:.2f} ± {quick['v_f_err']:.3f} m/s")
+        self.draw_plots(update_info=False)
+        self._solve_timer.stop()
+        self._solve_timer.start()
+        return False
+
+    def _full_solve(self):
+        self.eq.solve_edo(n_t_intervals=self.n_t_intervals)
+        self.draw_plots()
 
     def reset_points(self, event):
         self.points = []
+        self.fit = None
         self.draw_plots()
 
     def change_degree(self, val):
-        self.degree = int(val)
+        """Slider callback: debounces the recompute until the drag pauses."""
+        self._pending_degree = int(val)
+        self._timer.stop()
+        self._timer.start()
+
+    def _apply_degree(self):
+        if self._pending_degree is None or self._pending_degree == self.degree:
+            return
+        self.degree = self._pending_degree
+        if self.points:
+            self._rebuild_fit()
+            self._apply_fit()
+            return
         high_coeffs = [0] * (self.degree - 3)
         high_coeffs[-1] = 1
-        self.eq.set_rower_cinematic(high_coeffs)
-        self.eq.solve_edo()
-        self.draw_plots()
+        self.eq.set_rower_cinematic(high_coeffs, basis=self.basis)
+        self._solve()
 
     def update_param(self, text):
         """Actualiza parámetros físicos de RowEquation."""
@@ -185,54 +330,28 @@ class InteractiveRowEquationPlot:
         self.eq.mu = 1 / (self.eq.M + self.eq.m)
         self.eq.B = self.eq.m * self.eq.mu
         self.eq.A = -0.5 * self.eq.S * self.eq.rho * self.eq.Cd * self.eq.mu
-        high_coeffs = [0] * (self.degree - 3)
-        high_coeffs[-1] = 1
-        self.eq.set_rower_cinematic(high_coeffs)
-        # Resolver de nuevo la EDO
-        self.eq.solve_edo()
-        print(self.eq.summary())
-        self.draw_plots()
+        if self.points:
+            # T o L pueden haber cambiado: la base del ajuste depende de ellos
+            self._rebuild_fit()
+            self.eq.set_rower_cinematic(self.fit.coeffs(), basis=self.basis)
+        else:
+            high_coeffs = [0] * (self.degree - 3)
+            high_coeffs[-1] = 1
+            self.eq.set_rower_cinematic(high_coeffs, basis=self.basis)
+        # Resolver de nuevo la EDO (o consultar la tabla si la cubre)
+        if self._solve():
+            print(self.eq.summary())
 
 
     def fit_polynomial(self, event):
+        """Refits all the stored points from scratch (the fit is otherwise updated on each click)."""
         if not self.points:
             print("No hay puntos seleccionados para ajustar.")
             return
 
-        t_points, a_target = zip(*self.points)
-        t_points = np.array(t_points)
-        a_target = np.array(a_target)
-        n_free = self.degree - 3  # cantidad de coeficientes libres (a4,...,an)
-
-        # Construimos la matriz de diseño A y el vector y
-        A = np.zeros((len(t_points), n_free))
-        y = np.zeros(len(t_points))
-
-        for i, t in enumerate(t_points):
-            # Inicializamos los coeficientes libres con 0 temporalmente para calcular a2 y a3
-            dummy_free = [0]*n_free
-            self.eq.set_rower_cinematic(dummy_free)
-            
-            # Término constante (x''(t) con coeficientes libres = 0)
-            x_ddot_base = self.eq.x_ddot(np.array([t]))[0]
-            y[i] = a_target[i] - x_ddot_base
-            
-            # Llenamos la fila de la matriz A para cada coeficiente libre
-            for j in range(n_free):
-                test_free = [0]*n_free
-                test_free[j] = 1  # solo este coeficiente = 1
-                self.eq.set_rower_cinematic(test_free)
-                x_ddot_col = self.eq.x_ddot(np.array([t]))[0]
-                A[i, j] = x_ddot_col - x_ddot_base
-
-        # Resolver el sistema lineal en mínimos cuadrados
-        best_a, residuals, rank, s = np.linalg.lstsq(A, y, rcond=None)
-
-        # Guardar los coeficientes en RowEquation
-        self.eq.set_rower_cinematic(best_a)
-        self.eq.solve_edo()
-        print(f"Ajuste analítico terminado. Error cuadrático: {np.sum((self.eq.x_ddot(t_points) - a_target)**2):.3e}")
-        self.draw_plots()
+        self._rebuild_fit()
+        self._apply_fit()
+        print(f"Ajuste analítico terminado. Error cuadrático: {self.fit.residual:.3e}")
 
 
 
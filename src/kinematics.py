@@ -0,0 +1,104 @@
+import numpy as np
+from numpy.polynomial import chebyshev as C
+
+
+def horner(coeffs, t):
+    """
+    Evaluates sum(coeffs[k]*t**k) with Horner's scheme. Works with scalars and arrays of t;
+    a scalar t returns a float.
+    """
+    scalar = np.ndim(t) == 0
+    t = np.asarray(t, dtype=float)
+    out = np.zeros_like(t)
+    for c in coeffs[::-1]:
+        out = out*t + c
+    return float(out) if scalar else out
+
+
+def horner_rows(coeffs, t):
+    """
+    Horner evaluation of one polynomial per row of coeffs (n_rows, n+1) at t of shape
+    (n_rows,) (one time per row) or (n_rows, n_t).
+    """
+    t = np.asarray(t, dtype=float)
+    out = np.zeros_like(t)
+    c = coeffs if t.ndim == 1 else coeffs[:, :, None]
+    for k in range(coeffs.shape[1] - 1, -1, -1):
+        out = out*t + c[:, k]
+    return out
+
+
+def poly_derivative(coeffs, order: int = 1):
+    """Coefficients (ascending powers, along the last axis) of the order-th derivative."""
+    c = np.asarray(coeffs, dtype=float)
+    for _ in range(order):
+        if c.shape[-1] <= 1:
+            return np.zeros(c.shape[:-1] + (1,))
+        c = c[..., 1:]*np.arange(1, c.shape[-1])
+    return c
+
+
+def poly_antiderivative(coeffs):
+    """Coefficients of the antiderivative that vanishes at t=0."""
+    c = np.asarray(coeffs, dtype=float)
+    return np.concatenate([[0.], c/np.arange(1, len(c) + 1)])
+
+
+class PolynomialKinematics():
+    """
+    Rower cinematic x(t) built once from the polynomial coefficients.
+
+    Position, speed, acceleration, jerk and the antiderivative of x(t) are precomputed as
+    coefficient arrays and evaluated on scalars and arrays alike: with basis='power' (the
+    default) by Horner's scheme, with basis='chebyshev' as Chebyshev series in the shifted
+    variable u = 2t/T - 1 on [0, T] by Clenshaw's recurrence, whose terms stay bounded by
+    the series coefficients instead of growing like t**k for the high degrees.
+    """
+
+    BASES = ('power', 'chebyshev')
+
+    def __init__(self, coeffs, T: float, basis: str = 'power'):
+        if basis not in self.BASES:
+            raise ValueError(f"Base no soportada: {basis}. Opciones: {self.BASES}")
+        self.coeffs = np.asarray(coeffs, dtype=float)
+        self.T = T
+        self.basis = basis
+        self.position = self.coeffs
+        self.velocity = poly_derivative(self.coeffs, 1)
+        self.acceleration = poly_derivative(self.coeffs, 2)
+        self.jerk = poly_derivative(self.coeffs, 3)
+        self.antiderivative = poly_antiderivative(self.coeffs)
+        self._series = {0: self.position, 1: self.velocity, 2: self.acceleration,
+                        3: self.jerk, -1: self.antiderivative}
+        if basis == 'chebyshev':
+            # Cada serie se reescribe en u = 2t/T - 1 (cambio de variable exacto del polinomio)
+            self._series = {order: C.poly2cheb(np.polynomial.Polynomial(c).convert(
+                                domain=[0, T], window=[-1, 1]).coef)
+                            for order, c in self._series.items()}
+
+    @property
+    def degree(self):
+        return len(self.coeffs) - 1
+
+    def _eval(self, order: int, t):
+        if self.basis == 'power':
+            return horner(self._series[order], t)
+        scalar = np.ndim(t) == 0
+        out = C.chebval(2*np.asarray(t, dtype=float)/self.T - 1, self._series[order])
+        return float(out) if scalar else out
+
+    def x(self, t):
+        return self._eval(0, t)
+
+    def x_dot(self, t):
+        return self._eval(1, t)
+
+    def x_ddot(self, t):
+        return self._eval(2, t)
+
+    def x_dddot(self, t):
+        return self._eval(3, t)
+
+    def integral(self, t):
+        """Integral of x(t) between 0 and t."""
+        return self._eval(-1, t)
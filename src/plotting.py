@@ -0,0 +1,82 @@
+"""
+Matplotlib figures of RowEquation. Kept out of rowEquation.py so the numerical core (and
+every batch worker that only calls solve_edo) does not import matplotlib; RowEquation.plot()
+and plot_rower_cinematic() import this module on first use.
+"""
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+def plot_rower_cinematic(eq, n_t: int = 1000):
+    """x(t), x'(t) and x''(t) of the rower cinematic set on eq."""
+    if not eq.coeffs:
+        print("Set the coefficients of the polinomical rower's cinematic before plotting the results.")
+    tt = np.linspace(0, eq.T, n_t)
+    plt.figure(figsize=(10,5))
+    plt.subplot(1,2,1)
+    plt.plot(tt, eq.x(tt), label='x(t) [L]', color='blue')
+    plt.xlabel('t')
+    # plt.ylabel('p(t)')
+    plt.title('Polinomio p(t)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.subplot(1,2,1)
+    plt.plot(tt, eq.x_dot(tt), label="x'(t) [L/T]", color='red')
+    plt.xlabel('t')
+    # plt.ylabel("dp(t)")
+    plt.title('Derivada dp(t)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.subplot(1,2,1)
+    plt.plot(tt, eq.x_ddot(tt), label="x''(t) [L/T^2]", color='green')
+    plt.xlabel('t')
+    # plt.ylabel("ddp(t)")
+    plt.title('Derivada ddp(t)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.tight_layout()
+    plt.show()
+
+def plot_solution(eq):
+    """Rower cinematic and boat response of the last solve_edo() of eq."""
+    if not eq.solution:
+        print('Solve the EDO with solve_edo() method before plotting results')
+    plt.figure(figsize=(10,5))
+    plt.subplot(1,2,1)
+    plt.plot(eq.solution['tt'], eq.solution['xx'], label='x(t)[L]', color='blue')
+    plt.xlabel('t')
+    plt.ylabel('p(t)')
+    plt.title('Polinomio p(t)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.subplot(1,2,1)
+    plt.plot(eq.solution['tt'], eq.solution['xx_dot'], label="x'(t) [L/T]", color='red')
+    plt.xlabel('t')
+    plt.ylabel("dp(t)")
+    plt.title('Derivada dp(t)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.subplot(1,2,1)
+    plt.plot(eq.solution['tt'], eq.solution['xx_ddot'], label="x''(t) [L/T^2]", color='green')
+    plt.xlabel('t')
+    plt.ylabel("ddp(t)")
+    plt.title('Derivada ddp(t)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.tight_layout()
+    # plt.show()
+    plt.figure(figsize=(10,5))
+    plt.plot(eq.solution['tt'], eq.solution['yy'], label='y(t) [L]')
+    plt.plot(eq.solution['tt'], eq.solution['yy_dot'], label="y'(t) [L/T]")
+    plt.plot(eq.solution['tt'], eq.solution['yy_ddot'], label = "y''(t) [L/T^2]")
+    plt.xlabel('t')
+    plt.title('Solución de la EDO')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
@@ -0,0 +1,65 @@
+"""
+Opt-in instrumentation of RowEquation.solve_edo (profile=True or profile='alloc').
+
+StageProfiler times named stages with perf_counter, counts calls of the wrapped RHS
+and, with allocations enabled, records the tracemalloc peak of every stage. When
+disabled every hook is a no-op, so the normal solve pays nothing.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageProfiler():
+
+    def __init__(self, enabled=False):
+        self.enabled = bool(enabled)
+        self.allocations = enabled == 'alloc'
+        self.times = {}
+        self.peaks = {}
+        self.calls = {}
+        self._started_tracing = False
+
+    def counted(self, name: str, fun):
+        """fun wrapped so every call is counted under name (fun itself if disabled)."""
+        if not self.enabled or fun is None:
+            return fun
+        self.calls.setdefault(name, 0)
+
+        def wrapper(*args, **kwargs):
+            self.calls[name] += 1
+            return fun(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        if self.allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - t0
+            if self.allocations:
+                self.peaks[name] = max(self.peaks.get(name, 0), tracemalloc.get_traced_memory()[1] - base)
+
+    def stats(self):
+        """{'rhs_calls', 'time': {stage: s}, 'alloc_peak': {stage: bytes}} or None."""
+        if not self.enabled:
+            return None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        out = {'rhs_calls': self.calls.get('rhs', 0),
+               'time': dict(self.times)}
+        out['time']['total'] = sum(self.times.values())
+        if self.allocations:
+            out['alloc_peak'] = dict(self.peaks)
+        return out
@@ -0,0 +1,195 @@
+import numpy as np
+
+from kinematics import horner_rows, poly_derivative
+
+# Parámetros de RowEquation (en el orden de su constructor) + velocidad inicial, y sus valores
+# por defecto: única definición para la caché, los barridos, la tabla y el servicio
+PARAMS = ('m', 'M', 'L', 'T', 'rho', 'S', 'Cd', 'y0_dot')
+DEFAULTS = {'m': 80, 'M': 20, 'L': -1, 'T': 1, 'rho': 1000, 'S': 0.5, 'Cd': 0.004, 'y0_dot': 10}
+
+
+class RowEnsemble():
+    """
+    Batch of RowEquation configurations integrated together.
+
+    Every physical parameter may be a scalar or an array of length n_cases; they are
+    broadcast against each other. `high_coeffs` is a (n_cases, n_free) matrix with the
+    free coefficients a4..an of each case (pad with zeros to mix polynomial degrees).
+    All trajectories are stepped at once with a fixed-step RK4 on a per-case grid of
+    n_t_intervals points over [0, T_i].
+    """
+
+    PARAMS = PARAMS
+
+    def __init__(self, m=80, M=20, L=-1, T=1, rho=1000, S=0.5, Cd=0.004, y0_dot=10, high_coeffs=None):
+        params = np.broadcast_arrays(*[np.atleast_1d(np.asarray(p, dtype=float))
+                                       for p in (m, M, L, T, rho, S, Cd, y0_dot)])
+        n_cases = params[0].shape[0]
+        if high_coeffs is not None:
+            high_coeffs = np.atleast_2d(np.asarray(high_coeffs, dtype=float))
+            if n_cases == 1 and high_coeffs.shape[0] > 1:
+                n_cases = high_coeffs.shape[0]
+            high_coeffs = np.broadcast_to(high_coeffs, (n_cases, high_coeffs.shape[1]))
+        params = [np.broadcast_to(p, (n_cases,)).copy() for p in params]
+        self.m, self.M, self.L, self.T, self.rho, self.S, self.Cd, self.y0_dot = params
+        self.n_cases = n_cases
+
+        self.mu = 1/(self.M+self.m)
+        self.B = self.m*self.mu
+        self.A = -0.5*self.S*self.rho*self.Cd*self.mu
+        self.coeffs = None
+        self.solution = None
+        self.set_rower_cinematic(np.zeros((n_cases, 1)) if high_coeffs is None else high_coeffs)
+
+    @classmethod
+    def from_equations(cls, equations, y0_dot=None):
+        """Build an ensemble from a list of RowEquation instances with their cinematic already set."""
+        n_free = max(len(eq.coeffs) - 4 for eq in equations)
+        high = np.zeros((len(equations), max(n_free, 1)))
+        for i, eq in enumerate(equations):
+            free = eq.coeffs[4:]
+            high[i, :len(free)] = free
+        cols = {p: [getattr(eq, p) for eq in equations] for p in cls.PARAMS}
+        if y0_dot is not None:
+            cols['y0_dot'] = y0_dot
+        return cls(high_coeffs=high, **cols)
+
+    def set_rower_cinematic(self, high_coeffs):
+        """
+        Vectorized version of RowEquation.set_rower_cinematic: one row of free coefficients
+        (a4..an) per case, a2 and a3 derived from the boundary conditions of each case.
+        """
+        high_coeffs = np.atleast_2d(np.asarray(high_coeffs, dtype=float))
+        high_coeffs = np.broadcast_to(high_coeffs, (self.n_cases, high_coeffs.shape[1]))
+        n = high_coeffs.shape[1] + 3
+        T = self.T[:, None]
+        k = np.arange(4, n + 1)
+
+        a2 = 3*self.L/self.T**2 + np.sum((k - 3)*high_coeffs*T**(k - 2), axis=1)
+        a3 = -2*self.L/self.T**3 - np.sum((k - 2)*high_coeffs*T**(k - 3), axis=1)
+
+        zeros = np.zeros((self.n_cases, 2))
+        self.coeffs = np.hstack([zeros, a2[:, None], a3[:, None], high_coeffs])
+        self.polinomical_grade = self.coeffs.shape[1] - 1
+        # Coeficientes de x'' (grado n-2) precalculados para el RHS
+        kk = np.arange(2, self.coeffs.shape[1])
+        self._acc_coeffs = self.coeffs[:, 2:]*kk*(kk - 1)
+        return self.coeffs.shape
+
+    @staticmethod
+    def _polyval(coeffs, t):
+        return horner_rows(coeffs, t)
+
+    def _derivative(self, order):
+        return poly_derivative(self.coeffs, order)
+
+    def x(self, t):
+        return self._polyval(self.coeffs, t)
+
+    def x_dot(self, t):
+        return self._polyval(self._derivative(1), t)
+
+    def x_ddot(self, t):
+        return self._polyval(self._acc_coeffs, t)
+
+    def _rhs(self, t, v):
+        """Boat acceleration, rower acceleration and drag acceleration for every case at times t (n_cases,)."""
+        xdd = self._polyval(self._acc_coeffs, t)
+        drag = self.A*np.abs(v)*v
+        v_dot = drag - self.B*xdd
+        return v_dot, xdd, drag
+
+    def solve(self, n_t_intervals: int = 5000, substeps: int = 1, store_trajectories: bool = True):
+        """
+        Integrates every case with RK4 on its own grid of n_t_intervals points (substeps RK4
+        steps between stored samples). The rower work, drag dissipation and drag impulse are
+        carried as extra states (as in RowEquation.solve_edo) so the magnitudes do not depend
+        on the output grid; with store_trajectories=False only the magnitudes are returned,
+        which keeps memory flat for very large sweeps.
+        A case whose speed overflows or stops being finite (step too large for its drag) is
+        masked: solution['diverged'] flags it and its magnitudes and trajectories are NaN,
+        while the other cases are unaffected.
+        """
+        n_steps = (n_t_intervals - 1)*substeps
+        h = self.T/n_steps
+        xd_coeffs = self._derivative(1)
+
+        v = self.y0_dot.copy()
+        y = np.zeros(self.n_cases)
+        # Integrales: trabajo del remero, disipación por arrastre e impulso del agua
+        w = np.zeros((3, self.n_cases))
+        total_mass = self.M + self.m
+
+        def deriv(t, v):
+            v_dot, xdd, drag = self._rhs(t, v)
+            F_drag = total_mass*drag
+            rates = np.stack([self.m*(xdd + v_dot)*self._polyval(xd_coeffs, t), -F_drag*v, F_drag])
+            return v_dot, rates
+
+        if store_trajectories:
+            yy = np.empty((self.n_cases, n_t_intervals))
+            yy_dot = np.empty((self.n_cases, n_t_intervals))
+            yy[:, 0] = y
+            yy_dot[:, 0] = v
+
+        t = np.zeros(self.n_cases)
+        # Un caso que diverge solo se contamina a sí mismo (operaciones elemento a elemento):
+        # se deja correr sin avisos y se enmascara al final
+        with np.errstate(over='ignore', invalid='ignore'):
+            for i in range(n_steps):
+                k1, p1 = deriv(t, v)
+                k2, p2 = deriv(t + h/2, v + h/2*k1)
+                k3, p3 = deriv(t + h/2, v + h/2*k2)
+                k4, p4 = deriv(t + h, v + h*k3)
+                y = y + h/6*(v + 2*(v + h/2*k1) + 2*(v + h/2*k2) + (v + h*k3))
+                w = w + h/6*(p1 + 2*p2 + 2*p3 + p4)
+                v = v + h/6*(k1 + 2*k2 + 2*k3 + k4)
+                t = (i + 1)*h
+                if store_trajectories and (i + 1) % substeps == 0:
+                    j = (i + 1)//substeps
+                    yy[:, j] = y
+                    yy_dot[:, j] = v
+        diverged = ~((np.abs(v) < 1e12) & np.isfinite(y) & np.isfinite(w).all(axis=0))
+        if diverged.any():
+            v[diverged] = y[diverged] = w[:, diverged] = np.nan
+            if store_trajectories:
+                yy[diverged] = yy_dot[diverged] = np.nan
+
+        solution = {}
+        if store_trajectories:
+            tt = self.T[:, None]*np.linspace(0, 1, n_t_intervals)
+            xx_ddot = self._polyval(self._acc_coeffs, tt)
+            solution = {'tt': tt,
+                        'xx': self._polyval(self.coeffs, tt),
+                        'xx_dot': self._polyval(xd_coeffs, tt),
+                        'xx_ddot': xx_ddot,
+                        'yy': yy,
+                        'yy_dot': yy_dot,
+                        'yy_ddot': self.A[:, None]*np.abs(yy_dot)*yy_dot - self.B[:, None]*xx_ddot}
+
+        V_i = self.y0_dot
+        with np.errstate(over='ignore'):
+            Ei = 0.5*(self.M+self.m)*V_i**2
+        Ef = 0.5*(self.M+self.m)*v**2
+        solution['magnitudes'] = {
+            'Ei': Ei,
+            'Ef': Ef,
+            'dE_sist': Ef - Ei,
+            'dE_rower': w[0],
+            'p_f': y,
+            'v_f': v,
+            'dv': v - V_i,
+            'W_drag': w[1],
+            'impulse': w[2],
+            'v_mean': y/self.T}
+        solution['diverged'] = diverged
+        self.solution = solution
+        return solution
+
+    def case_solution(self, i: int):
+        """Solution of case i with the same layout as RowEquation.solve_edo()."""
+        if self.solution is None:
+            raise ValueError("Primero debes resolver el ensemble con solve()")
+        case = {k: v[i] for k, v in self.solution.items() if k not in ('magnitudes', 'diverged')}
+        case['magnitudes'] = {k: float(v[i]) for k, v in self.solution['magnitudes'].items()}
+        return case
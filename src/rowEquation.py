@@ -1,9 +1,19 @@
+from types import SimpleNamespace
+
 import numpy as np
 from scipy.integrate import solve_ivp
-import matplotlib.pyplot as plt
+from scipy.interpolate import CubicHermiteSpline
+from kinematics import PolynomialKinematics
+from solution import RowSolution
+from sensitivity import parameter_sensitivities
+from events import build_events, collect_events
+from profiling import StageProfiler
 
 
 class RowEquation():
+    # Backends de integración: los de solve_ivp y un RK4 de paso fijo para previsualizaciones
+    METHODS = ('RK45', 'RK23', 'DOP853', 'Radau', 'BDF', 'LSODA', 'RK4')
+
     def __init__(self,m=80, M=20, L=-1, T=1, rho: float = 1000, S: float = 0.5, Cd: float = 0.004):
         self.m = m
         self.M = M
@@ -16,15 +26,18 @@ class RowEquation():
         self.S = S
         self.A = -0.5*self.S*self.rho*self.Cd*self.mu
         self.coeffs = []
+        self.kinematics = None
         self.polinomical_grade = None
         self.y0 = 0
         self.y0_dot = 10
         self.solution = None
 
-    def set_rower_cinematic(self, high_coeffs: list = []):
+    def set_rower_cinematic(self, high_coeffs: list = [], basis: str = 'power'):
         """
         Define the coefficients of the polynomial rower cinematic.
         Coefficients a0, a1, a2, a3 are not free — they are derived from the others.
+        The derivative coefficients are cached in self.kinematics, evaluated in the given
+        basis ('power' or 'chebyshev' on [0, T], see PolynomialKinematics) for this call only.
         """
         high_coeffs = list(high_coeffs)   # ✅ convierte arrays a listas
 
@@ -41,78 +54,295 @@ class RowEquation():
 
         self.coeffs = [0, 0, a2, a3] + high_coeffs
         self.polinomical_grade = len(self.coeffs) - 1
+        self.kinematics = PolynomialKinematics(self.coeffs, self.T, basis=basis)
 
         return len(self.coeffs), self.polinomical_grade
 
+    def _kinematics(self):
+        if self.kinematics is None:
+            raise ValueError("Cinemática no definida: llama a set_rower_cinematic() antes")
+        return self.kinematics
+
     def x(self,t):
         """
         Calculates the rower position according to his/her polinomical cinematic. Depens on time.
         Ship position is the rower frame of reference. 
         """
-        return sum(self.coeffs[k]*t**k for k in range(len(self.coeffs)))
+        return self._kinematics().x(t)
 
     def x_dot(self,t):
         """
         Calculates the rower speed according to his/her polinomical cinematic. Depens on time.
         Ship position is the rower frame of reference. 
         """
-        return sum(k*self.coeffs[k]*t**(k-1) for k in range(1, len(self.coeffs)))
+        return self._kinematics().x_dot(t)
 
     def x_ddot(self,t):
         """
         Calculates the rower acceleration according to his/her polinomical cinematic. Depens on time.
          Ship position is the rower frame of reference. 
         """
-        return sum(k*(k-1)*self.coeffs[k]*t**(k-2) for k in range(2, len(self.coeffs)))
+        return self._kinematics().x_ddot(t)
 
     def dynamic_edo(self, t, v):
         """Dynamic EDO which relates water frictional force and the rower's movement on the ship."""
-        return self.A*np.abs(v)*v - self.B*self.x_ddot(t)
+        return self.A*np.abs(v)*v - self.B*self.kinematics.x_ddot(t)
+
+    def augmented_edo(self, t, state):
+        """
+        RHS of the boat EDO extended with the integrated quantities:
+        [y', y, rower work, drag dissipation, drag impulse].
+        """
+        v = state[0]
+        xx_dot = self.kinematics.x_dot(t)
+        xx_ddot = self.kinematics.x_ddot(t)
+        drag = self.A*np.abs(v)*v           # aceleración de arrastre (por unidad de masa total)
+        v_dot = drag - self.B*xx_ddot
+        F_drag = (self.M + self.m)*drag     # fuerza del agua sobre el sistema
+        return [v_dot,
+                v,
+                self.m*(xx_ddot + v_dot)*xx_dot,
+                -F_drag*v,
+                F_drag]
+
+    def _solve_rk4(self, state0, n_t_intervals: int, substeps: int = 4):
+        """
+        Fixed-step RK4 on the output grid (substeps steps per interval). Only the boat speed
+        feeds back into the EDO, so the step loop advances y' alone (scalar arithmetic on
+        the kinematics tabulated at the half-step nodes) and keeps its four stage values;
+        the position, rower work, drag dissipation and impulse are then integrated from the
+        stages with array operations, as RowEnsemble does for its cases. Returns an object
+        with the fields of a solve_ivp result; raises FloatingPointError if the step is too
+        large for the drag (h*2|A||v| > ~2.8).
+        """
+        n_steps = (n_t_intervals - 1)*substeps
+        h = self.T/n_steps
+        t_nodes = np.linspace(0, self.T, 2*n_steps + 1)   # pasos y medios pasos
+        xd = self.kinematics.x_dot(t_nodes)
+        xdd = self.kinematics.x_ddot(t_nodes)
+        g = (-self.B*xdd).tolist()
+        A = float(self.A)
+        hh, h6 = 0.5*h, h/6
+
+        stages = []
+        v = float(state0[0])
+        for i in range(n_steps):
+            a, b, c = g[2*i], g[2*i + 1], g[2*i + 2]
+            k1 = A*abs(v)*v + a
+            v2 = v + hh*k1
+            k2 = A*abs(v2)*v2 + b
+            v3 = v + hh*k2
+            k3 = A*abs(v3)*v3 + b
+            v4 = v + h*k3
+            k4 = A*abs(v4)*v4 + c
+            stages.append((v, v2, v3, v4))
+            v += h6*(k1 + 2*k2 + 2*k3 + k4)
+        S = np.array(stages).T
+        if not (np.isfinite(v) and np.all(np.abs(S) < 1e12)):
+            raise FloatingPointError("El RK4 de paso fijo diverge: aumenta rk4_substeps o usa un método "
+                                     "adaptativo (RK45, DOP853, LSODA)")
+
+        # Integrales a partir de las etapas: nodos (paso, medio paso, medio paso, paso siguiente)
+        j = 2*np.arange(n_steps)
+        nodes = np.stack([j, j + 1, j + 1, j + 2])
+        drag = A*np.abs(S)*S
+        v_dot = drag - self.B*xdd[nodes]
+        F_drag = (self.M + self.m)*drag
+        rates = np.stack([S, self.m*(xdd[nodes] + v_dot)*xd[nodes], -F_drag*S, F_drag])
+        weights = h6*np.array([1, 2, 2, 1])[:, None]
+        increments = np.einsum('kij,ij->kj', rates, weights)
 
-    def solve_edo(self, y0: float =0, y0_dot: float = None, n_t_intervals: int = 5000):
+        Y = np.empty((5, n_t_intervals))
+        Y[:, 0] = state0
+        Y[1:, 1:] = np.asarray(state0[1:], dtype=float)[:, None] + \
+            np.cumsum(increments, axis=1)[:, substeps - 1::substeps]
+        Y[0, 1:] = np.append(S[0, substeps::substeps], v)
+        tt = np.linspace(0, self.T, n_t_intervals)
+        dV = self.A*np.abs(Y[0])*Y[0] - self.B*self.kinematics.x_ddot(tt)
+        # Interpolante de Hermite cúbico para la salida densa (v, y)
+        dense = CubicHermiteSpline(tt, Y[:2], np.vstack([dV, Y[0]]), axis=1)
+        return SimpleNamespace(t=tt, y=Y, sol=dense, nfev=4*n_steps, njev=0, nlu=0, nsteps=n_steps,
+                               status=0, message='Fixed-step RK4 finished.', success=True)
+
+    def solve_edo(self, y0: float =0, y0_dot: float = None, n_t_intervals: int = 5000,
+                  rtol: float = 1e-3, atol: float = 1e-6, dense: bool = False,
+                  sensitivities: bool = False, method: str = 'RK45', rk4_substeps: int = 1,
+                  events=None, profile=False):
+        """
+        Solves the boat EDO over [0, T] sampled on n_t_intervals points. The rower work, drag
+        dissipation and impulse are integrated with the state, so the magnitudes are exact to
+        solver tolerance; n_t_intervals=None keeps only the solver steps (cheapest, for sweeps
+        that need the magnitudes only).
+        With dense=True returns a lazy RowSolution built on the solver's dense output: the
+        series are only computed (on n_t_intervals points, or any grid via resample()) when read.
+        With sensitivities=True the state and its variational equations are integrated again
+        in a second solve with the same method, tolerances and RK4 steps, and
+        solution['sensitivities'] holds d(p_f, v_f, dE_rower)/d(M, m, Cd, S, rho, T, L, y0_dot).
+        method selects the integrator: any solve_ivp method or 'RK4', a fixed-step integrator
+        on the output grid with rk4_substeps steps per interval for cheap previews. The solver
+        stats (nsteps counts the accepted steps) are stored in solution['solver'].
+        events: names registered in events.EVENTS (e.g. 'boat_speed_min', 'boat_speed_zero',
+        'rower_accel_peak', 'check') or a dict {name: f(eq, t, state) | (f, direction)}. They
+        are located by solve_ivp with root refinement and reported in magnitudes['events'].
+        profile=True records the RHS call count and the wall time of the integration,
+        post-processing and magnitudes stages in solution['stats']; profile='alloc' adds the
+        tracemalloc peak of every stage (slower, for memory investigations only). A profiled
+        dense solve evaluates its series during post-processing instead of lazily.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Método de integración no soportado: {method}. Opciones: {self.METHODS}")
+        if events and method == 'RK4':
+            raise ValueError("La detección de eventos necesita un método de solve_ivp, no 'RK4'")
+        if n_t_intervals is not None and n_t_intervals < 2:
+            raise ValueError("n_t_intervals debe ser None o >= 2 (la rejilla incluye t=0 y t=T)")
+        event_names, event_funcs = build_events(self, events) if events else ([], None)
 
         # ----------------------
         # Resolver numéricamente
         # ----------------------
         y0_dot = self.y0_dot if y0_dot is None else y0_dot
         t_span = (0, self.T)
-        t_eval = np.linspace(0, self.T, n_t_intervals)
-        sol = solve_ivp(lambda t, y: [self.dynamic_edo(t, y[0]), y[0]], t_span, [y0_dot, y0], t_eval=t_eval)
+        state0 = [y0_dot, y0, 0, 0, 0]
+        prof = StageProfiler(profile)
+        with prof.stage('integration'):
+            if method == 'RK4':
+                sol = self._solve_rk4(state0, n_t_intervals or 201, substeps=rk4_substeps)
+                nsteps = sol.nsteps
+                prof.calls['rhs'] = sol.nfev
+            else:
+                # Sin t_eval los pasos aceptados quedan en sol.t; la rejilla de salida se evalúa
+                # después con la salida densa, que solo se conserva si dense=True
+                sol = solve_ivp(prof.counted('rhs', self.augmented_edo), t_span, state0, method=method,
+                                rtol=rtol, atol=atol, dense_output=bool(dense or n_t_intervals),
+                                events=event_funcs)
+                nsteps = len(sol.t) - 1
+        solver_stats = {'method': method,
+                        'nfev': sol.nfev,
+                        'njev': sol.njev,
+                        'nlu': sol.nlu,
+                        'nsteps': nsteps,
+                        'status': sol.status,
+                        'message': sol.message,
+                        'rtol': rtol,
+                        'atol': atol}
+        integrals = {'W_rower': sol.y[2, -1],
+                     'W_drag': sol.y[3, -1],
+                     'impulse': sol.y[4, -1]}
 
-        yy_dot = sol.y[0]  # y'(t)
-        yy = sol.y[1]  # y(t)
-        yy_ddot = self.A * yy_dot**2 - self.B * np.array([self.x_ddot(ti) for ti in t_eval])
+        with prof.stage('post_processing'):
+            if dense:
+                solution = RowSolution(sol, self.kinematics, self.A, self.B, self.T,
+                                       n_t_intervals=n_t_intervals or 5000)
+                solution['integrals'] = integrals
+                solution['solver'] = solver_stats
+                if profile:
+                    # Perfilando, las series se evalúan aquí para que la etapa mida su coste real
+                    for key, values in solution.resample().items():
+                        solution[key] = values
+            else:
+                tt, Y = sol.t, sol.y
+                if n_t_intervals and method != 'RK4':
+                    tt = np.linspace(0, self.T, n_t_intervals)
+                    Y = sol.sol(tt)
+                yy_dot = Y[0]  # y'(t)
+                yy = Y[1]  # y(t)
+                xx = self.kinematics.x(tt)
+                xx_dot = self.kinematics.x_dot(tt)
+                xx_ddot = self.kinematics.x_ddot(tt)
+                yy_ddot = self.A * np.abs(yy_dot) * yy_dot - self.B * xx_ddot
 
-        tt = np.linspace(0, self.T, n_t_intervals)
-        xx = self.x(tt)
-        xx_dot = self.x_dot(tt)
-        xx_ddot = self.x_ddot(tt)
-
-        solution = {'tt': tt,
-                    'xx': xx,
-                    'xx_dot': xx_dot,
-                    'xx_ddot': xx_ddot,
-                    'yy': yy,
-                    'yy_dot': yy_dot,
-                    'yy_ddot': yy_ddot}
+                solution = {'tt': tt,
+                            'xx': xx,
+                            'xx_dot': xx_dot,
+                            'xx_ddot': xx_ddot,
+                            'yy': yy,
+                            'yy_dot': yy_dot,
+                            'yy_ddot': yy_ddot,
+                            'integrals': integrals,
+                            'solver': solver_stats}
+            if events:
+                solution['events'] = collect_events(self, event_names, event_funcs, sol)
+        if sensitivities:
+            with prof.stage('sensitivities'):
+                solution['sensitivities'] = parameter_sensitivities(
+                    self, y0_dot=y0_dot, y0=y0, method=method, rtol=rtol, atol=atol,
+                    n_steps=nsteps if method == 'RK4' else None)
         self.solution = solution
-        self.calculate_magnitudes()
+        with prof.stage('magnitudes'):
+            self.calculate_magnitudes()
+        if profile:
+            solution['stats'] = prof.stats()
+        return solution
+
+    def _shoot(self, v0: float, rtol: float = 1e-10, atol: float = 1e-12):
+        """
+        Integrates one recovery from y'(0)=v0 together with the sensitivity s = dy'/dv0,
+        which follows s' = 2*A*|v|*s with s(0) = 1. Returns v_f, dv_f/dv0 and nfev.
+        """
+        def rhs(t, state):
+            v, s = state
+            return [self.dynamic_edo(t, v), 2*self.A*np.abs(v)*s]
+
+        sol = solve_ivp(rhs, (0, self.T), [v0, 1.0], rtol=rtol, atol=atol)
+        return float(sol.y[0, -1]), float(sol.y[1, -1]), sol.nfev
+
+    def solve_periodic(self, y0_dot: float = None, tol: float = 1e-9, max_iter: int = 30,
+                       n_t_intervals: int = 5000):
+        """
+        Finds the initial boat speed whose recovery ends at the same speed, v_f(v0) = v0,
+        with a Newton shooting method on g(v0) = v_f(v0) - v0 using g'(v0) = dv_f/dv0 - 1.
+        The root is kept bracketed once a sign change is found (bisection fallback).
+        Solves the periodic recovery, stores it in self.solution and adds the convergence
+        stats in solution['periodic'].
+        """
+        v0 = self.y0_dot if y0_dot is None else y0_dot
+        lo, hi = None, None  # g(lo) > 0 > g(hi); g es decreciente porque dv_f/dv0 < 1
+        nfev = 0
+        history = []
+        converged = False
+        for it in range(1, max_iter + 1):
+            v_f, dvf_dv0, n = self._shoot(v0)
+            nfev += n
+            g = v_f - v0
+            history.append((v0, g))
+            if abs(g) < tol:
+                converged = True
+                break
+            if g > 0:
+                lo = v0 if lo is None else max(lo, v0)
+            else:
+                hi = v0 if hi is None else min(hi, v0)
+            dg = dvf_dv0 - 1
+            step = -g/dg if dg != 0 else -g
+            v_new = v0 + step
+            if lo is not None and hi is not None and not (lo < v_new < hi):
+                v_new = 0.5*(lo + hi)
+            v0 = v_new
+
+        self.y0_dot = v0
+        solution = self.solve_edo(y0_dot=v0, n_t_intervals=n_t_intervals, rtol=1e-10, atol=1e-12)
+        solution['periodic'] = {'y0_dot': v0,
+                                'converged': converged,
+                                'iterations': it,
+                                'residual': g,
+                                'n_integrations': it + 1,
+                                'nfev': nfev,
+                                'history': history}
         return solution
-    
+
     def calculate_magnitudes(self):
         if not self.solution:
             return 
-        V_i = self.y0_dot
-        V_f = self.solution['yy_dot'][-1]
-        # p_i = self.solution['yy'][0]
-        p_f = self.solution['yy'][-1]
+        V_i, V_f = self._endpoints('yy_dot')
+        p_i, p_f = self._endpoints('yy')
 
         ## Energía mecánica perdida del sistema:
         Ei = 0.5*(self.M+self.m)*V_i**2
         Ef = 0.5*(self.M+self.m)*V_f**2
         dE_sistema =Ef - Ei
-        ## Energía gastaad por el remero:
-        dE_rower = self.calculate_energy()
+        ## Energía gastaad por el remero (integrada con la EDO si está disponible):
+        integrals = self.solution.get('integrals')
+        dE_rower = integrals['W_rower'] if integrals else self.calculate_energy()
 
         self.solution['magnitudes'] = {
             'Ei': Ei,
@@ -122,11 +352,25 @@ class RowEquation():
             'p_f': p_f,
             'v_f': V_f,
             'dv': V_f-V_i}
+        if integrals:
+            self.solution['magnitudes'].update({
+                'W_drag': integrals['W_drag'],
+                'impulse': integrals['impulse'],
+                'v_mean': (p_f - p_i)/self.T})
+        if 'events' in self.solution:
+            self.solution['magnitudes']['events'] = self.solution['events']
+
+    def _endpoints(self, key):
+        """First and last value of a solution series (without materializing a lazy solution)."""
+        if isinstance(self.solution, RowSolution):
+            return self.solution.endpoints(key)
+        return self.solution[key][0], self.solution[key][-1]
 
     def calculate_energy(self):
         """
         Calcula la energía gastada por la persona al caminar sobre el barco
-        usando la solución almacenada en self.solution.
+        usando la solución almacenada en self.solution (suma de rectángulos sobre la
+        malla; solve_edo ya integra este trabajo con la EDO).
         """
         if self.solution is None:
             raise ValueError("Primero debes resolver la EDO con solve_edo()")
@@ -147,76 +391,12 @@ class RowEquation():
         return E_persona
 
     def plot_rower_cinematic(self, n_t:int = 1000):
-        if not self.coeffs:
-            print("Set the coefficients of the polinomical rower's cinematic before plotting the results.")
-        tt = np.linspace(0, self.T, n_t)
-        plt.figure(figsize=(10,5))
-        plt.subplot(1,2,1)
-        plt.plot(tt, self.x(tt), label='x(t) [L]', color='blue')
-        plt.xlabel('t')
-        # plt.ylabel('p(t)')
-        plt.title('Polinomio p(t)')
-        plt.grid(True)
-        plt.legend()
-
-        plt.subplot(1,2,1)
-        plt.plot(tt, self.x_dot(tt), label="x'(t) [L/T]", color='red')
-        plt.xlabel('t')
-        # plt.ylabel("dp(t)")
-        plt.title('Derivada dp(t)')
-        plt.grid(True)
-        plt.legend()
-
-        plt.subplot(1,2,1)
-        plt.plot(tt, self.x_ddot(tt), label="x''(t) [L/T^2]", color='green')
-        plt.xlabel('t')
-        # plt.ylabel("ddp(t)")
-        plt.title('Derivada ddp(t)')
-        plt.grid(True)
-        plt.legend()
-
-        plt.tight_layout()
-        plt.show()
+        from plotting import plot_rower_cinematic   # matplotlib solo se importa al dibujar
+        plot_rower_cinematic(self, n_t)
 
     def plot(self):
-        if not self.solution:
-            print('Solve the EDO with solve_edo() method before plotting results')
-        plt.figure(figsize=(10,5))
-        plt.subplot(1,2,1)
-        plt.plot(self.solution['tt'], self.solution['xx'], label='x(t)[L]', color='blue')
-        plt.xlabel('t')
-        plt.ylabel('p(t)')
-        plt.title('Polinomio p(t)')
-        plt.grid(True)
-        plt.legend()
-
-        plt.subplot(1,2,1)
-        plt.plot(self.solution['tt'], self.solution['xx_dot'], label="x'(t) [L/T]", color='red')
-        plt.xlabel('t')
-        plt.ylabel("dp(t)")
-        plt.title('Derivada dp(t)')
-        plt.grid(True)
-        plt.legend()
-
-        plt.subplot(1,2,1)
-        plt.plot(self.solution['tt'], self.solution['xx_ddot'], label="x''(t) [L/T^2]", color='green')
-        plt.xlabel('t')
-        plt.ylabel("ddp(t)")
-        plt.title('Derivada ddp(t)')
-        plt.grid(True)
-        plt.legend()
-
-        plt.tight_layout()
-        # plt.show()
-        plt.figure(figsize=(10,5))
-        plt.plot(self.solution['tt'], self.solution['yy'], label='y(t) [L]')
-        plt.plot(self.solution['tt'], self.solution['yy_dot'], label="y'(t) [L/T]")
-        plt.plot(self.solution['tt'], self.solution['yy_ddot'], label = "y''(t) [L/T^2]")
-        plt.xlabel('t')
-        plt.title('Solución de la EDO')
-        plt.legend()
-        plt.grid(True)
-        plt.show()
+        from plotting import plot_solution
+        plot_solution(self)
 
     def summary(self):
         info = {'M': self.M,
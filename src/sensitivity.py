@@ -0,0 +1,142 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from fitting import constrained_basis
+
+
+def _rk4(rhs, T: float, state0, n_steps: int):
+    """Fixed-step RK4 over [0, T] in n_steps steps; returns the final state and nfev."""
+    h = T/n_steps
+    state = np.asarray(state0, dtype=float)
+    for i in range(n_steps):
+        t = i*h
+        k1 = rhs(t, state)
+        k2 = rhs(t + 0.5*h, state + 0.5*h*k1)
+        k3 = rhs(t + 0.5*h, state + 0.5*h*k2)
+        k4 = rhs(t + h, state + h*k3)
+        state = state + h/6*(k1 + 2*k2 + 2*k3 + k4)
+    return state, 4*n_steps
+
+
+def integrate_sensitivities(eq, dA, dB, dm, dkin, dv0, y0_dot: float = None,
+                            rtol: float = 1e-8, atol: float = 1e-10, method: str = 'RK45',
+                            n_steps: int = None, y0: float = 0):
+    """
+    Integrates the boat EDO of `eq` together with its forward sensitivities.
+
+    Each of the n_dir directions p_j is described by the derivatives of the model
+    ingredients with respect to it: dA[j], dB[j], dm[j] (scalars), dv0[j] = dy'(0)/dp_j and
+    dkin(t) -> (dx'/dp, dx''/dp), two arrays of n_dir values at time t. For
+        v' = A|v|v - B x''(t),   W' = m (x'' + v') x'
+    the variational equations are
+        s_v' = dA|v|v + 2A|v| s_v - dB x'' - B dx''
+        s_y' = s_v
+        s_W' = dm (x'' + v') x' + m (dx'' + s_v') x' + m (x'' + v') dx'
+    method is a solve_ivp method (with rtol, atol) or 'RK4' with n_steps fixed steps, so
+    the sensitivities can follow the same integrator as the trajectory they belong to.
+    Returns the final p_f, v_f, dE_rower and their gradients dp_f, dv_f, ddE_rower (n_dir,).
+    """
+    dA, dB, dm, dv0 = (np.atleast_1d(np.asarray(d, dtype=float)) for d in (dA, dB, dm, dv0))
+    n_dir = len(dA)
+    kin = eq.kinematics
+    y0_dot = eq.y0_dot if y0_dot is None else y0_dot
+
+    def rhs(t, state):
+        v, _, _ = state[:3]
+        s_v = state[3:3 + n_dir]
+        xd = kin.x_dot(t)
+        xdd = kin.x_ddot(t)
+        dxd, dxdd = dkin(t)
+        v_dot = eq.A*abs(v)*v - eq.B*xdd
+        sv_dot = dA*abs(v)*v + 2*eq.A*abs(v)*s_v - dB*xdd - eq.B*dxdd
+        power = eq.m*(xdd + v_dot)*xd
+        sW_dot = dm*(xdd + v_dot)*xd + eq.m*(dxdd + sv_dot)*xd + eq.m*(xdd + v_dot)*dxd
+        return np.concatenate([[v_dot, v, power], sv_dot, s_v, sW_dot])
+
+    state0 = np.concatenate([[y0_dot, y0, 0], dv0, np.zeros(2*n_dir)])
+    if method == 'RK4':
+        final, nfev = _rk4(rhs, eq.T, state0, n_steps)
+    else:
+        sol = solve_ivp(rhs, (0, eq.T), state0, method=method, rtol=rtol, atol=atol)
+        final, nfev = sol.y[:, -1], sol.nfev
+    return {'v_f': final[0],
+            'p_f': final[1],
+            'dE_rower': final[2],
+            'dv_f': final[3:3 + n_dir],
+            'dp_f': final[3 + n_dir:3 + 2*n_dir],
+            'ddE_rower': final[3 + 2*n_dir:],
+            'nfev': nfev}
+
+
+def coefficient_sensitivities(eq, y0_dot: float = None, **kwargs):
+    """
+    Gradients of p_f, v_f and dE_rower with respect to the free coefficients a4..an of the
+    current cinematic (a2 and a3 follow them through the boundary conditions).
+    """
+    degree = len(eq.coeffs) - 1
+    n_free = degree - 3
+    zeros = np.zeros(n_free)
+
+    def dkin(t):
+        dxd = constrained_basis(t, eq.T, eq.L, degree, order=1)[1][0]
+        dxdd = constrained_basis(t, eq.T, eq.L, degree, order=2)[1][0]
+        return dxd, dxdd
+
+    return integrate_sensitivities(eq, zeros, zeros, zeros, dkin, zeros, y0_dot=y0_dot, **kwargs)
+
+
+PARAMETERS = ('M', 'm', 'Cd', 'S', 'rho', 'T', 'L', 'y0_dot')
+OUTPUTS = ('p_f', 'v_f', 'dE_rower')
+
+
+def parameter_sensitivities(eq, y0_dot: float = None, **kwargs):
+    """
+    Sensitivity matrix d(p_f, v_f, dE_rower)/d(M, m, Cd, S, rho, T, L, y0_dot) of the current
+    cinematic (free coefficients a4..an held fixed) from one augmented integration; kwargs
+    (method, rtol, atol, n_steps, y0) go to integrate_sensitivities.
+
+    A = -0.5*S*rho*Cd/(M+m) and B = m/(M+m) give the direct terms; L and T enter through
+    a2 and a3. T also moves the end of the interval, so its total derivative adds the rate
+    of each output at t=T (v_f for p_f, y''(T) for v_f and the rower power for dE_rower).
+    Returns a dict with 'params', 'outputs', their 'values', 'outputs_values' and the
+    'matrix' (3 x 8) with one row per output.
+    """
+    y0_dot = eq.y0_dot if y0_dot is None else y0_dot
+    mu, A, B, T, L = eq.mu, eq.A, eq.B, eq.T, eq.L
+    K = -0.5*mu
+    dA = np.array([-A*mu, -A*mu, K*eq.S*eq.rho, K*eq.Cd*eq.rho, K*eq.Cd*eq.S, 0, 0, 0])
+    dB = np.array([-B*mu, mu*(1 - B), 0, 0, 0, 0, 0, 0])
+    dm = np.array([0, 1., 0, 0, 0, 0, 0, 0])
+    dv0 = np.array([0, 0, 0, 0, 0, 0, 0, 1.])
+
+    # a2, a3 en función de T (coeficientes libres fijos)
+    free = np.asarray(eq.coeffs[4:], dtype=float)
+    k = np.arange(4, len(free) + 4)
+    da2_dT = -6*L/T**3 + np.sum((k - 3)*(k - 2)*free*T**(k - 3))
+    da3_dT = 6*L/T**4 - np.sum((k - 2)*(k - 3)*free*T**(k - 4))
+
+    def dkin(t):
+        dxd = np.zeros(8)
+        dxdd = np.zeros(8)
+        dxd[5] = 2*da2_dT*t + 3*da3_dT*t**2
+        dxdd[5] = 2*da2_dT + 6*da3_dT*t
+        dxd[6] = 6*t/T**2 - 6*t**2/T**3
+        dxdd[6] = 6/T**2 - 12*t/T**3
+        return dxd, dxdd
+
+    res = integrate_sensitivities(eq, dA, dB, dm, dkin, dv0, y0_dot=y0_dot, **kwargs)
+
+    # Término de frontera del parámetro T: la integral termina en t = T
+    kin = eq.kinematics
+    v_dot_T = A*abs(res['v_f'])*res['v_f'] - B*kin.x_ddot(T)
+    power_T = eq.m*(kin.x_ddot(T) + v_dot_T)*kin.x_dot(T)
+    res['dp_f'][5] += res['v_f']
+    res['dv_f'][5] += v_dot_T
+    res['ddE_rower'][5] += power_T
+
+    return {'params': PARAMETERS,
+            'outputs': OUTPUTS,
+            'values': {'M': eq.M, 'm': eq.m, 'Cd': eq.Cd, 'S': eq.S, 'rho': eq.rho,
+                       'T': T, 'L': L, 'y0_dot': y0_dot},
+            'outputs_values': {q: res[q] for q in OUTPUTS},
+            'matrix': np.vstack([res['d' + q] for q in OUTPUTS])}
@@ -0,0 +1,324 @@
+"""
+Local HTTP/JSON simulation service.
+
+One long-lived process keeps numpy/scipy imported and the SimulationCache warm, so scripts
+and dashboards no longer pay the start-up cost on every call. Endpoints:
+
+    POST /solve        {"params": {...}, "high_coeffs": [...], "n_t_intervals": 5000,
+                        "method": "RK45", "points": 500}   -> series (downsampled) + magnitudes
+    POST /magnitudes   {"params": {...}, "high_coeffs": [...]}  -> magnitudes
+    POST /fit          {"T": 1, "L": -1, "degree": 6, "points": [[t, x''], ...], "order": 2,
+                        "params": {...} (optional: also returns the magnitudes of the fit)}
+    GET  /stats        latency percentiles per endpoint, queue depth, batch sizes, cache
+
+params holds m, M, L, T, rho, S, Cd and y0_dot (RowEquation defaults for missing keys).
+/magnitudes requests are not solved one by one: a micro-batcher thread collects whatever
+arrives within batch_wait_ms (up to max_batch) and integrates it as one RowEnsemble, so
+concurrent callers share a single vectorized solve. /solve and /magnitudes validate the
+parameters and coefficients (finite, in range) and answer 400 otherwise, a magnitude
+request before it joins a batch; errors are reported to the request that caused them
+only. Non-finite numbers are answered as null (the JSON is strict).
+
+    python src/service.py --port 8765
+    curl -s localhost:8765/magnitudes -d '{"params": {"y0_dot": 5}, "high_coeffs": [1]}'
+"""
+import argparse
+import json
+import math
+import numbers
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request as urlrequest
+
+import numpy as np
+
+from downsample import minmax_indices
+from fitting import KinematicFit
+from rowEnsemble import DEFAULTS, PARAMS, RowEnsemble
+from simcache import SimulationCache
+
+SERIES = ('xx', 'xx_dot', 'xx_ddot', 'yy', 'yy_dot', 'yy_ddot')
+MAGNITUDES = ('Ei', 'Ef', 'dE_sist', 'dE_rower', 'p_f', 'v_f', 'dv', 'W_drag', 'impulse', 'v_mean')
+
+
+def _params(body):
+    raw = body.get('params', {})
+    unknown = set(raw) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {sorted(unknown)}")
+    return {p: float(raw.get(p, DEFAULTS[p])) for p in PARAMS}
+
+
+# Parámetros que deben ser estrictamente positivos (el resto, no negativos salvo L)
+POSITIVE = ('m', 'M', 'T')
+NON_NEGATIVE = ('rho', 'S', 'Cd')
+
+
+def _finite(value):
+    """float(value), or None if it is nan or infinite."""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _floats(mapping):
+    """Numeric scalar entries of mapping as floats (None if not finite); the rest is dropped."""
+    return {k: _finite(v) for k, v in mapping.items() if isinstance(v, numbers.Real)}
+
+
+def _jsonable(value):
+    """Payload converted to plain JSON types, with every non-finite number mapped to None."""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return _finite(value)
+    return value
+
+
+def _validate(params: dict, high_coeffs):
+    """Checks one magnitude request; returns its free coefficients as a list of floats."""
+    for p in PARAMS:
+        if not math.isfinite(params[p]):
+            raise ValueError(f"Parámetro no finito: {p}={params[p]}")
+    bad = [p for p in POSITIVE if params[p] <= 0] + [p for p in NON_NEGATIVE if params[p] < 0]
+    if bad:
+        raise ValueError(f"Parámetros fuera de rango: {', '.join(f'{p}={params[p]}' for p in bad)}")
+    coeffs = np.asarray(high_coeffs, dtype=float)
+    if coeffs.ndim != 1:
+        raise ValueError("high_coeffs debe ser una lista de números")
+    if not np.all(np.isfinite(coeffs)):
+        raise ValueError("high_coeffs contiene valores no finitos")
+    return coeffs.tolist()
+
+
+class MicroBatcher():
+    """
+    Coalesces magnitude requests into RowEnsemble batches. submit() returns a Future; the
+    worker thread waits for a first request, keeps collecting for batch_wait_ms or until
+    max_batch requests, pads the free coefficients to a common degree and solves them all.
+    Only final magnitudes are needed, so 200 RK4 steps are enough (relative error ~1e-9 on
+    v_f and p_f against the adaptive solve_edo). submit() validates the request and raises
+    ValueError before queueing it; a case that diverges fails only its own future, and if the
+    batch solve itself fails each request is retried alone.
+    """
+
+    def __init__(self, max_batch: int = 256, batch_wait_ms: float = 5, n_t_intervals: int = 200):
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait_ms/1000
+        self.n_t_intervals = n_t_intervals
+        self._queue = queue.Queue()
+        self.batch_sizes = deque(maxlen=1000)
+        self._thread = threading.Thread(target=self._loop, name='row-batcher', daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def submit(self, params: dict, high_coeffs):
+        high_coeffs = _validate(params, high_coeffs)
+        future = Future()
+        self._queue.put((params, high_coeffs, future))
+        return future
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.batch_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._solve(batch)
+
+    def _solve(self, batch):
+        self.batch_sizes.append(len(batch))
+        try:
+            mag, diverged = self._ensemble(batch)
+        except Exception as exc:
+            if len(batch) > 1:
+                # Se reintenta cada petición sola: el error queda en la que lo provoca
+                for request in batch:
+                    self._solve([request])
+                return
+            batch[0][2].set_exception(exc)
+            return
+        for i, (*_, future) in enumerate(batch):
+            if diverged[i]:
+                future.set_exception(FloatingPointError("La integración diverge para estos parámetros"))
+            else:
+                future.set_result({k: _finite(mag[k][i]) for k in MAGNITUDES if k in mag})
+
+    def _ensemble(self, batch):
+        n_free = max(max(len(h) for _, h, _ in batch), 1)
+        high = np.zeros((len(batch), n_free))
+        for i, (_, h, _) in enumerate(batch):
+            high[i, :len(h)] = h    # ceros a la derecha: mismo polinomio
+        cols = {p: np.array([params[p] for params, _, _ in batch]) for p in PARAMS}
+        sol = RowEnsemble(high_coeffs=high, **cols).solve(n_t_intervals=self.n_t_intervals,
+                                                          store_trajectories=False)
+        return sol['magnitudes'], sol['diverged']
+
+
+class RowService():
+    """State shared by the request handlers: cache, micro-batcher and latency records."""
+
+    def __init__(self, max_batch: int = 256, batch_wait_ms: float = 5, cache_size: int = 256):
+        self.cache = SimulationCache(maxsize=cache_size)
+        self.batcher = MicroBatcher(max_batch, batch_wait_ms)
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=5000)).append(seconds)
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+    def solve(self, body):
+        params = _params(body)
+        high_coeffs = _validate(params, body.get('high_coeffs', []))
+        n_t = int(body.get('n_t_intervals', 5000))
+        if n_t < 2:
+            raise ValueError("n_t_intervals debe ser >= 2")
+        eq = self.cache.solve(params, high_coeffs, n_t_intervals=n_t,
+                              method=body.get('method', 'RK45'))
+        sol = eq.solution
+        points = int(body.get('points', 500))
+        out = {'magnitudes': _floats(sol['magnitudes']), 'coeffs': [float(c) for c in eq.coeffs]}
+        # Índices comunes a todas las series: unión de los extremos de cada una
+        budget = max(points // len(SERIES), 4)
+        idx = np.unique(np.concatenate([minmax_indices(sol[key], budget) for key in SERIES]))
+        for key in ('tt',) + SERIES:
+            out[key] = np.asarray(sol[key])[idx].tolist()
+        return out
+
+    def magnitudes(self, body):
+        future = self.batcher.submit(_params(body), body.get('high_coeffs', []))
+        return {'magnitudes': future.result(timeout=60)}
+
+    def fit(self, body):
+        """Free coefficients from target points (the fit of InteractiveRowEquationPlot)."""
+        degree = int(body.get('degree', 4))
+        if degree < 4:
+            raise ValueError("El ajuste necesita grado >= 4 (al menos un coeficiente libre)")
+        pts = np.asarray(body['points'], dtype=float).reshape(-1, 2)
+        T = float(body.get('T', body.get('params', {}).get('T', DEFAULTS['T'])))
+        L = float(body.get('L', body.get('params', {}).get('L', DEFAULTS['L'])))
+        fit = KinematicFit(T, L, degree).add(pts[:, 0], pts[:, 1], int(body.get('order', 2)))
+        high_coeffs = fit.coeffs()
+        out = {'high_coeffs': high_coeffs.tolist(), 'residual': fit.residual}
+        if 'params' in body:
+            params = dict(_params(body), T=T, L=L)
+            out['magnitudes'] = self.batcher.submit(params, high_coeffs).result(timeout=60)
+        return out
+
+    def stats(self):
+        with self._lock:
+            latencies = {k: np.array(v) for k, v in self._latencies.items()}
+        endpoints = {}
+        for name, lat in latencies.items():
+            p50, p90, p99 = np.percentile(lat, [50, 90, 99])*1e3
+            endpoints[name] = {'count': len(lat), 'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99,
+                               'max_ms': float(lat.max()*1e3)}
+        sizes = np.array(self.batcher.batch_sizes) if self.batcher.batch_sizes else np.zeros(1)
+        return {'uptime_s': time.time() - self.started,
+                'queue_depth': self.batcher.depth,
+                'batches': len(self.batcher.batch_sizes),
+                'mean_batch_size': float(sizes.mean()),
+                'max_batch_size': int(sizes.max()),
+                'endpoints': endpoints,
+                'cache': self.cache.stats}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+    POST = {'/solve': 'solve', '/magnitudes': 'magnitudes', '/fit': 'fit'}
+
+    def _reply(self, code, payload):
+        data = json.dumps(_jsonable(payload), allow_nan=False).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._reply(200, self.service.stats())
+        else:
+            self._reply(404, {'error': f"Ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        endpoint = self.POST.get(self.path.rstrip('/'))
+        if endpoint is None:
+            self._reply(404, {'error': f"Ruta desconocida: {self.path}"})
+            return
+        t0 = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            result = getattr(self.service, endpoint)(body)
+        except (ValueError, KeyError, TypeError, FloatingPointError) as exc:
+            self._reply(400, {'error': f"{type(exc).__name__}: {exc}"})
+            return
+        except Exception as exc:
+            self._reply(500, {'error': f"{type(exc).__name__}: {exc}"})
+            return
+        self.service.record(endpoint, time.perf_counter() - t0)
+        self._reply(200, result)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8765, **kwargs):
+    """ThreadingHTTPServer bound to (host, port) around a new RowService (port 0: any free port)."""
+    handler = type('Handler', (_Handler,), {'service': RowService(**kwargs)})
+    server_class = type('Server', (ThreadingHTTPServer,), {'daemon_threads': True, 'request_queue_size': 256})
+    return server_class((host, port), handler)
+
+
+def call(url: str, path: str, payload: dict = None, timeout: float = 60):
+    """Small client: POST payload (GET if None) to url + path and decode the JSON answer."""
+    data = None if payload is None else json.dumps(payload).encode()
+    req = urlrequest.Request(url.rstrip('/') + path, data=data, headers={'Content-Type': 'application/json'})
+    with urlrequest.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--batch-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, max_batch=args.max_batch, batch_wait_ms=args.batch_wait_ms)
+    print(f"Servicio de simulación en http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from rowEnsemble import PARAMS
+from rowEquation import RowEquation
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"No serializable: {type(value)}")
+
+
+def _frozen(solution):
+    """
+    Copy of a solution dict for one caller: the series are read-only views of the cached
+    arrays (no data copied) and everything else (magnitudes, solver stats...) is deep-copied.
+    """
+    frozen = {}
+    for k, v in solution.items():
+        if isinstance(v, np.ndarray):
+            v = v.view()
+            v.flags.writeable = False
+        else:
+            v = copy.deepcopy(v)
+        frozen[k] = v
+    return frozen
+
+
+class SimulationCache():
+    """
+    Content-addressed cache around set_rower_cinematic + solve_edo.
+
+    The key is a hash of the physical parameters and coefficients rounded to `decimals`,
+    the grid size and the solve mode. Solutions live in an in-memory LRU of `maxsize`
+    entries and, if `disk_dir` is given, in one npz file per key so they survive restarts
+    and are shared between sessions. hits/disk_hits/misses count the lookups. Every lookup
+    returns its own copy of the solution with read-only series, so callers can't alter the
+    cached entry.
+    """
+
+    def __init__(self, maxsize: int = 64, disk_dir: str = None, decimals: int = 9):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.decimals = decimals
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def key(self, params: dict, high_coeffs, n_t_intervals: int = 5000, periodic: bool = False,
+            method: str = 'RK45'):
+        values = [round(float(params[p]), self.decimals) for p in PARAMS]
+        coeffs = [round(float(c), self.decimals) for c in high_coeffs]
+        raw = json.dumps([values, coeffs, n_t_intervals, periodic, method])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @property
+    def stats(self):
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'size': len(self._memory)}
+
+    def solve(self, params: dict, high_coeffs, n_t_intervals: int = 5000, periodic: bool = False,
+              method: str = 'RK45'):
+        """
+        Returns a RowEquation with its cinematic set and its solution attached, integrating
+        only on a cache miss. params holds m, M, L, T, rho, S, Cd and y0_dot; method is the
+        solve_edo integrator (the periodic search always uses its own tight shooting).
+        Failed integrations (solution['solver']['status'] < 0) are returned but not cached.
+        """
+        high_coeffs = list(high_coeffs)
+        eq = RowEquation(*(params[p] for p in PARAMS[:-1]))
+        eq.y0_dot = params['y0_dot']
+        eq.set_rower_cinematic(high_coeffs)
+
+        key = self.key(params, high_coeffs, n_t_intervals, periodic, method)
+        solution = self._get(key)
+        if solution is None:
+            with self._lock:
+                self.misses += 1
+            solution = eq.solve_periodic(n_t_intervals=n_t_intervals) if periodic \
+                else eq.solve_edo(n_t_intervals=n_t_intervals, method=method)
+            # Una integración fallida (status < 0) no se guarda: se reintentaría con la misma clave
+            if solution.get('solver', {}).get('status', 0) >= 0:
+                self._put(key, solution)
+                solution = _frozen(solution)
+        if periodic:
+            eq.y0_dot = solution['periodic']['y0_dot']
+        eq.solution = solution
+        return eq
+
+    def store(self, params: dict, high_coeffs, solution, n_t_intervals: int = 5000, periodic: bool = False,
+              method: str = 'RK45'):
+        """
+        Stores a solution computed elsewhere (e.g. by a background job) under the same key
+        solve() would use. Failed integrations are not stored.
+        """
+        if solution.get('solver', {}).get('status', 0) >= 0:
+            self._put(self.key(params, high_coeffs, n_t_intervals, periodic, method), solution)
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return _frozen(self._memory[key])
+        path = self._path(key)
+        if path and os.path.exists(path):
+            solution = self._load(path)
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, solution)
+            return _frozen(solution)
+        return None
+
+    def _put(self, key, solution):
+        solution = _frozen(solution)
+        self._remember(key, solution)
+        path = self._path(key)
+        if path:
+            arrays = {k: v for k, v in solution.items() if isinstance(v, np.ndarray)}
+            meta = {k: v for k, v in solution.items() if not isinstance(v, np.ndarray)}
+            # Nombre temporal único: varios procesos pueden escribir la misma clave a la vez
+            with tempfile.NamedTemporaryFile(dir=self.disk_dir, prefix=f'.{key}.', suffix='.npz',
+                                             delete=False) as tmp:
+                try:
+                    np.savez(tmp, __meta__=json.dumps(meta, default=_to_json), **arrays)
+                except BaseException:
+                    os.unlink(tmp.name)
+                    raise
+            os.replace(tmp.name, path)
+
+    def _remember(self, key, solution):
+        with self._lock:
+            self._memory[key] = solution
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.npz') if self.disk_dir else None
+
+    @staticmethod
+    def _load(path):
+        with np.load(path) as data:
+            solution = {k: data[k] for k in data.files if k != '__meta__'}
+            solution.update(json.loads(str(data['__meta__'])))
+        return solution
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
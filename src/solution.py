@@ -0,0 +1,96 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class RowSolution(MutableMapping):
+    """
+    Lazy solution of RowEquation.solve_edo(dense=True).
+
+    Wraps the dense output of solve_ivp and the rower kinematics. The series
+    'tt', 'xx', 'xx_dot', 'xx_ddot', 'yy', 'yy_dot' and 'yy_ddot' are only computed when a
+    consumer asks for them: x(t) and its derivatives analytically from the polynomial and
+    y(t), y'(t) by interpolating the dense output. Dict-style access uses the default grid
+    of n_t_intervals points and is cached; resample() evaluates any other grid on demand.
+    Any other key ('magnitudes', 'integrals', ...) is stored as in a plain dict.
+    """
+
+    SERIES = ('tt', 'xx', 'xx_dot', 'xx_ddot', 'yy', 'yy_dot', 'yy_ddot')
+
+    def __init__(self, ode_solution, kinematics, A: float, B: float, T: float, n_t_intervals: int = 5000):
+        self.ode = ode_solution
+        self.kinematics = kinematics
+        self.A = A
+        self.B = B
+        self.T = T
+        self.n_t_intervals = n_t_intervals
+        self._cache = {}
+        self._extra = {}
+
+    def resample(self, tt=None, keys=SERIES):
+        """
+        Evaluates the requested series on tt (an array of times, or a number of points on
+        [0, T]; default grid if None). Nothing is cached.
+        """
+        if tt is None:
+            tt = self.n_t_intervals
+        if np.ndim(tt) == 0:
+            tt = np.linspace(0, self.T, int(tt))
+        tt = np.asarray(tt, dtype=float)
+
+        out = {'tt': tt}
+        need_state = any(k.startswith('yy') for k in keys)
+        if need_state:
+            state = self.ode.sol(tt)
+            out['yy_dot'], out['yy'] = state[0], state[1]
+        if 'xx' in keys:
+            out['xx'] = self.kinematics.x(tt)
+        if 'xx_dot' in keys:
+            out['xx_dot'] = self.kinematics.x_dot(tt)
+        if 'xx_ddot' in keys or 'yy_ddot' in keys:
+            out['xx_ddot'] = self.kinematics.x_ddot(tt)
+        if 'yy_ddot' in keys:
+            out['yy_ddot'] = self.A*np.abs(out['yy_dot'])*out['yy_dot'] - self.B*out['xx_ddot']
+        return {k: out[k] for k in keys}
+
+    def endpoints(self, key: str):
+        """Values of a series at t=0 and t=T without building the grid."""
+        if key in self._cache:
+            return self._cache[key][0], self._cache[key][-1]
+        values = self.resample(np.array([0, self.T]), keys=(key,))[key]
+        return values[0], values[-1]
+
+    def to_dict(self):
+        """Plain dict with every series on the default grid (e.g. for export)."""
+        return {k: self[k] for k in self}
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        if key not in self.SERIES:
+            raise KeyError(key)
+        if key not in self._cache:
+            self._cache[key] = self.resample(keys=(key,))[key]
+        return self._cache[key]
+
+    def __setitem__(self, key, value):
+        if key in self.SERIES:
+            self._cache[key] = value
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._extra:
+            del self._extra[key]
+        else:
+            self._cache.pop(key, None)
+
+    def __iter__(self):
+        yield from self.SERIES
+        yield from self._extra
+
+    def __len__(self):
+        return len(self.SERIES) + len(self._extra)
+
+    def __contains__(self, key):
+        return key in self.SERIES or key in self._extra
@@ -0,0 +1,163 @@
+"""
+Columnar storage of RowEquation solutions.
+
+pack() turns the seven time series of a solution into one contiguous (7, n_t) array of the
+chosen dtype (float32 halves the footprint) plus the scalar magnitudes; unpack() gives back
+a solution dict whose series are views of that block. Single solutions are written to npz
+or, with the optional pyarrow dependency, to Arrow IPC / Parquet.
+
+SolutionStore keeps a batch of runs of the same length in a directory:
+
+    series.npy      (n_runs, 7, n_t)  memory-mapped on read
+    magnitudes.npy  (n_runs, n_magnitudes)
+    store.json      names, dtype and the parameters of every run
+
+so a notebook can slice thousands of runs (store.series('yy_dot')[:, ::10]) without
+loading them into memory.
+"""
+import json
+import numbers
+import os
+
+import numpy as np
+
+SERIES = ('tt', 'xx', 'xx_dot', 'xx_ddot', 'yy', 'yy_dot', 'yy_ddot')
+
+
+def _scalar_magnitudes(solution):
+    # Solo escalares numéricos: los eventos (dict anidado) no forman parte del bloque
+    mag = solution.get('magnitudes') or {}
+    return {k: float(v) for k, v in mag.items() if isinstance(v, numbers.Real)}
+
+
+def pack(solution, dtype=np.float64):
+    """(series block of shape (7, n_t), scalar magnitudes dict) of a solution."""
+    block = np.empty((len(SERIES), len(solution['tt'])), dtype=dtype)
+    for i, key in enumerate(SERIES):
+        block[i] = solution[key]
+    return block, _scalar_magnitudes(solution)
+
+
+def unpack(block, magnitudes=None):
+    """Solution dict whose series are row views of block (no copy)."""
+    solution = {key: block[i] for i, key in enumerate(SERIES)}
+    solution['magnitudes'] = dict(magnitudes or {})
+    return solution
+
+
+def save_npz(path: str, solution, dtype=np.float64):
+    block, magnitudes = pack(solution, dtype)
+    np.savez(path, series=block, magnitudes=json.dumps(magnitudes))
+
+
+def load_npz(path: str):
+    with np.load(path) as data:
+        return unpack(data['series'], json.loads(str(data['magnitudes'])))
+
+
+def _arrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError("La exportación Arrow/Parquet necesita pyarrow (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def to_arrow(solution, dtype=np.float64):
+    """pyarrow.Table with one column per series; the magnitudes go to the schema metadata."""
+    pa = _arrow()
+    block, magnitudes = pack(solution, dtype)
+    table = pa.table({key: block[i] for i, key in enumerate(SERIES)})
+    return table.replace_schema_metadata({'magnitudes': json.dumps(magnitudes)})
+
+
+def from_arrow(table):
+    block = np.vstack([table.column(key).to_numpy() for key in SERIES])
+    meta = table.schema.metadata or {}
+    return unpack(block, json.loads(meta.get(b'magnitudes', b'{}')))
+
+
+def save_arrow(path: str, solution, dtype=np.float64):
+    """Arrow IPC file (.arrow/.feather) if the extension says so, Parquet otherwise."""
+    table = to_arrow(solution, dtype)
+    if path.endswith(('.arrow', '.feather')):
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression='uncompressed')
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+
+
+def load_arrow(path: str):
+    _arrow()
+    if path.endswith(('.arrow', '.feather')):
+        import pyarrow.feather as feather
+        return from_arrow(feather.read_table(path, memory_map=True))
+    import pyarrow.parquet as pq
+    return from_arrow(pq.read_table(path))
+
+
+class SolutionStore():
+    """
+    Batch of solutions with the same number of time points, stored column-wise in a directory.
+    SolutionStore.create() preallocates it; SolutionStore(directory) opens it memory-mapped
+    (mode='r+' to keep writing runs).
+    """
+
+    def __init__(self, directory: str, mode: str = 'r'):
+        self.directory = directory
+        with open(os.path.join(directory, 'store.json')) as f:
+            self.meta = json.load(f)
+        self.magnitude_names = self.meta['magnitudes']
+        self._series = np.load(os.path.join(directory, 'series.npy'), mmap_mode=mode)
+        self._magnitudes = np.load(os.path.join(directory, 'magnitudes.npy'), mmap_mode=mode)
+
+    @classmethod
+    def create(cls, directory: str, n_runs: int, n_t: int, dtype=np.float32,
+               magnitudes=('Ei', 'Ef', 'dE_sist', 'dE_rower', 'p_f', 'v_f', 'dv')):
+        os.makedirs(directory, exist_ok=True)
+        series = np.lib.format.open_memmap(os.path.join(directory, 'series.npy'), mode='w+',
+                                           dtype=dtype, shape=(n_runs, len(SERIES), n_t))
+        mags = np.lib.format.open_memmap(os.path.join(directory, 'magnitudes.npy'), mode='w+',
+                                         dtype=np.float64, shape=(n_runs, len(magnitudes)))
+        mags[:] = np.nan
+        del series, mags
+        meta = {'series': list(SERIES), 'magnitudes': list(magnitudes), 'dtype': np.dtype(dtype).str,
+                'params': [None]*n_runs}
+        with open(os.path.join(directory, 'store.json'), 'w') as f:
+            json.dump(meta, f)
+        return cls(directory, mode='r+')
+
+    def __len__(self):
+        return self._series.shape[0]
+
+    @property
+    def n_t(self):
+        return self._series.shape[2]
+
+    def write(self, i: int, solution, params: dict = None):
+        """Stores run i (the store must be open with mode='r+'); call flush() when done."""
+        block, magnitudes = pack(solution, self._series.dtype)
+        self._series[i] = block
+        self._magnitudes[i] = [magnitudes.get(k, np.nan) for k in self.magnitude_names]
+        self.meta['params'][i] = params
+
+    def flush(self):
+        self._series.flush()
+        self._magnitudes.flush()
+        with open(os.path.join(self.directory, 'store.json'), 'w') as f:
+            json.dump(self.meta, f)
+
+    def series(self, key: str):
+        """Memory-mapped (n_runs, n_t) view of one series; slicing reads only what is used."""
+        return self._series[:, SERIES.index(key)]
+
+    def magnitude(self, key: str):
+        return self._magnitudes[:, self.magnitude_names.index(key)]
+
+    def params(self, key: str):
+        return np.array([np.nan if p is None else p.get(key, np.nan) for p in self.meta['params']])
+
+    def solution(self, i: int):
+        """Run i as a solution dict (views of the memory map)."""
+        return unpack(self._series[i], dict(zip(self.magnitude_names, self._magnitudes[i].tolist())))
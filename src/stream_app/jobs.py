@@ -0,0 +1,307 @@
+"""
+Background jobs of the Streamlit app.
+
+JobManager runs long tasks (high resolution solves, y0_dot sweeps, stroke optimization) in
+a pool of worker processes so the script thread returns at once and the solves of
+different users really run in parallel (a thread pool would serialize them on the GIL).
+It is shared by every session through st.cache_resource; each session keeps the ids of its
+own jobs in st.session_state, so finished results survive reruns. A task is a module-level
+function task(job, *args) that runs in a worker and calls job.update(fraction, message)
+between chunks of work: that call publishes the progress through a multiprocessing
+manager and raises JobCancelled once the user has pressed cancel. mostrar_trabajos() polls
+the jobs from an st.fragment that only refreshes while some job of the session is active.
+"""
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+import numpy as np
+import streamlit as st
+
+from rowEnsemble import PARAMS, RowEnsemble
+from rowEquation import RowEquation
+from solution import RowSolution
+from strokeOptimizer import StrokeOptimizer, maximize
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobHandle():
+    """
+    What a task sees of its job inside the worker process: update() writes the progress to
+    the shared state and checks the shared cancel flag (both manager proxies, picklable).
+    """
+
+    def __init__(self, state, cancel):
+        self._state = state
+        self._cancel = cancel
+
+    def update(self, fraction: float, message: str = ''):
+        """Publishes the progress; raises JobCancelled if cancellation was requested."""
+        changes = {'progress': float(min(max(fraction, 0.0), 1.0))}
+        if message:
+            changes['message'] = message
+        self._state.update(changes)
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+
+def _ejecutar(task, job, args, kwargs):
+    # Corre en el proceso de trabajo
+    job._state.update({'status': 'running', 'started': time.time()})
+    job.update(0.0)
+    return task(job, *args, **kwargs)
+
+
+class Job():
+    """State of one background task: progress, message, status, result or error."""
+
+    def __init__(self, job_id: int, name: str, state, cancel):
+        self.id = job_id
+        self.name = name
+        self.result = None
+        self.error = None
+        self.finished = None
+        self.handle = JobHandle(state, cancel)
+        self._status = 'pending'     # pending, running, done, cancelled, failed
+        self._future = None
+
+    @property
+    def status(self):
+        if self._status == 'pending' and self.handle._state.get('status') == 'running':
+            return 'running'
+        return self._status
+
+    @property
+    def progress(self):
+        return 1.0 if self._status == 'done' else self.handle._state.get('progress', 0.0)
+
+    @property
+    def message(self):
+        return self.handle._state.get('message', '')
+
+    @property
+    def started(self):
+        return self.handle._state.get('started')
+
+    def cancel(self):
+        self.handle._cancel.set()
+        if self._future is not None:
+            self._future.cancel()    # si aún no ha empezado, no llega a ejecutarse
+
+    @property
+    def active(self):
+        return self._status == 'pending'
+
+    @property
+    def elapsed(self):
+        started = self.started
+        if started is None:
+            return 0.0
+        return (self.finished or time.time()) - started
+
+
+class JobManager():
+    """
+    Process pool of background jobs indexed by id. Progress and cancel flags live in a
+    multiprocessing manager; results come back through the futures.
+    """
+
+    def __init__(self, max_workers: int = 4, keep: int = 200):
+        context = multiprocessing.get_context('spawn')   # sin fork de un servidor con hilos
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        self._shared = context.Manager()
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.keep = keep
+
+    def submit(self, name: str, task, *args, on_done=None, **kwargs):
+        """
+        Runs task(job, *args, **kwargs) in a worker process. on_done(result), if given, is
+        called in this process when the task finishes; a non-None return value replaces the
+        stored result (e.g. to keep only the magnitudes of a large solution).
+        """
+        with self._lock:
+            job = Job(next(self._ids), name, self._shared.dict(), self._shared.Event())
+            self._jobs[job.id] = job
+            self._prune()
+        job._future = self._executor.submit(_ejecutar, task, job.handle, args, kwargs)
+        job._future.add_done_callback(lambda future: self._finish(job, future, on_done))
+        return job.id
+
+    @staticmethod
+    def _finish(job, future, on_done):
+        try:
+            result = future.result()
+            if on_done is not None:
+                replaced = on_done(result)
+                result = result if replaced is None else replaced
+            job.result = result
+            job._status = 'done'
+        except (JobCancelled, CancelledError):
+            job._status = 'cancelled'
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            job._status = 'failed'
+        finally:
+            job.finished = time.time()
+
+    def _prune(self):
+        # Olvida los trabajos terminados más antiguos
+        finished = [j for j in self._jobs.values() if not j.active]
+        for job in finished[:max(len(self._jobs) - self.keep, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: int):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: int):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    @property
+    def n_active(self):
+        return sum(job.active for job in list(self._jobs.values()))
+
+
+# --------------------------------------------------
+# Tareas
+# --------------------------------------------------
+def _ecuacion(params, high_coeffs):
+    eq = RowEquation(*(params[p] for p in PARAMS[:-1]))
+    eq.y0_dot = params['y0_dot']
+    eq.set_rower_cinematic(list(high_coeffs))
+    return eq
+
+
+def tarea_solucion(job, params, high_coeffs, n_t_intervals, method, n_bloques: int = 20):
+    """
+    Single solve with a large n_t_intervals: the integration keeps the dense output and the
+    series are evaluated on the grid in n_bloques blocks, checking for cancellation between
+    them. Returns a plain solution dict (series, magnitudes, integrals, solver stats).
+    """
+    job.update(0.0, f"Integrando ({method})")
+    eq = _ecuacion(params, high_coeffs)
+    dense = eq.solve_edo(n_t_intervals=n_t_intervals, method=method, dense=True)
+    if dense['solver']['status'] < 0:
+        raise RuntimeError(dense['solver']['message'])
+    tt = np.linspace(0, eq.T, n_t_intervals)
+    solution = {key: np.empty(n_t_intervals) for key in RowSolution.SERIES}
+    bloques = np.array_split(np.arange(n_t_intervals), min(n_bloques, n_t_intervals))
+    for k, idx in enumerate(bloques):
+        job.update(0.1 + 0.9*k/len(bloques), f"Evaluando {n_t_intervals} puntos: bloque {k + 1}/{len(bloques)}")
+        for key, values in dense.resample(tt[idx]).items():
+            solution[key][idx] = values
+    for key in ('magnitudes', 'integrals', 'solver'):
+        solution[key] = dense[key]
+    return solution
+
+
+def guardar_solucion(cache, params, high_coeffs, n_t_intervals, method):
+    """
+    on_done hook for tarea_solucion: stores the solution in the shared simulation cache
+    (under the same key as cache.solve) and keeps only its magnitudes in the job.
+    """
+    def on_done(solution):
+        cache.store(params, high_coeffs, solution, n_t_intervals=n_t_intervals, method=method)
+        return {'magnitudes': solution['magnitudes'], 'n_t_intervals': n_t_intervals}
+    return on_done
+
+
+def tarea_barrido(job, params, high_coeffs, v_min, v_max, n_casos, n_bloques: int = 20):
+    """Sweep of y0_dot solved by RowEnsemble in blocks so progress and cancel are checked between them."""
+    y0_dots = np.linspace(v_min, v_max, int(n_casos))
+    salida = {q: np.empty(len(y0_dots)) for q in ('v_f', 'p_f', 'dE_rower')}
+    bloques = np.array_split(np.arange(len(y0_dots)), min(n_bloques, len(y0_dots)))
+    for k, idx in enumerate(bloques):
+        job.update(k/len(bloques), f"Bloque {k + 1}/{len(bloques)}")
+        casos = {p: np.full(len(idx), float(params[p])) for p in PARAMS}
+        casos['y0_dot'] = y0_dots[idx]
+        high = np.tile(np.asarray(high_coeffs, dtype=float), (len(idx), 1))
+        sol = RowEnsemble(high_coeffs=high, **casos).solve(n_t_intervals=2000, store_trajectories=False)
+        for q in salida:
+            salida[q][idx] = sol['magnitudes'][q]
+    salida['y0_dot'] = y0_dots
+    return salida
+
+
+def tarea_optimizacion(job, params, high_coeffs, magnitud, max_iter: int = 50):
+    """Maximizes a final magnitude over the free coefficients; progress is iterations/max_iter."""
+    eq = _ecuacion(params, high_coeffs)
+    optimizer = StrokeOptimizer(eq, maximize(magnitud))
+    iteracion = [0]
+
+    def callback(xk):
+        iteracion[0] += 1
+        job.update(iteracion[0]/max_iter, f"Iteración {iteracion[0]} ({optimizer.n_evaluations} integraciones)")
+
+    res = optimizer.run(x0=high_coeffs, callback=callback, maxiter=max_iter)
+    return {'high_coeffs': np.asarray(res['high_coeffs']).tolist(),
+            'objective': -float(res['objective']),
+            'magnitud': magnitud,
+            'magnitudes': res['solution']['magnitudes'],
+            'n_evaluations': res['n_evaluations']}
+
+
+# --------------------------------------------------
+# Interfaz
+# --------------------------------------------------
+def trabajos_de_sesion():
+    """Ids of the jobs launched by this session (kept across reruns)."""
+    return st.session_state.setdefault('trabajos', [])
+
+
+def _mostrar_resultado(job):
+    res = job.result
+    if 'y0_dot' in res:
+        st.line_chart({'y0_dot': res['y0_dot'], 'v_f': res['v_f'], 'p_f': res['p_f']}, x='y0_dot')
+    elif 'high_coeffs' in res:
+        st.write(f"{res['magnitud']} máximo = {res['objective']:.4f} con a4..an = "
+                 f"{np.round(res['high_coeffs'], 4).tolist()} ({res['n_evaluations']} integraciones)")
+    else:
+        mag = res['magnitudes']
+        st.write({k: round(float(mag[k]), 6) for k in ('v_f', 'p_f', 'dE_rower', 'dv')})
+
+
+def mostrar_trabajos(manager: JobManager, cada: float = 1.0):
+    """
+    Progress, cancel buttons and results of the session's jobs. The panel refreshes every
+    `cada` s only while some of them is active; when the last one ends it triggers one full
+    rerun so the fragment is registered again without the timer.
+    """
+    def activos():
+        return any(job is not None and job.active for job in map(manager.get, trabajos_de_sesion()))
+
+    refrescar = activos()
+
+    @st.fragment(run_every=cada if refrescar else None)
+    def panel():
+        ids = trabajos_de_sesion()
+        if not ids:
+            st.caption("No hay trabajos en segundo plano.")
+            return
+        if refrescar and not activos():
+            st.rerun()
+        st.caption(f"{manager.n_active} trabajos activos en el servidor")
+        for job_id in reversed(ids):
+            job = manager.get(job_id)
+            if job is None:
+                continue
+            with st.container(border=True):
+                st.write(f"**#{job.id} {job.name}** — {job.status} ({job.elapsed:.1f} s)")
+                if job.active:
+                    st.progress(job.progress, text=job.message or None)
+                    if st.button("Cancelar", key=f"cancelar_{job.id}"):
+                        manager.cancel(job.id)
+                elif job.status == 'done':
+                    _mostrar_resultado(job)
+                elif job.status == 'failed':
+                    st.error(job.error)
+
+    panel()
@@ -1,29 +1,91 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-import time
 
-def animar_bola_1d(x_positions, L, T):
-    x_positions = x_positions[::20]  # reducir cantidad de frames para mejor rendimiento
-    N = len(x_positions)
-    dt = T / N   # tiempo entre frames en segundos
 
-    # Figura base
+def figura_animacion_1d(x_positions, L, T, y_positions=None, max_frames: int = 150):
+    """
+    Builds a Plotly figure with one frame per sample so the animation runs in the browser.
+    Top row: rower position x(t) relative to the boat (with the 0 and L references).
+    Bottom row (if y_positions is given): boat position y(t) relative to the water.
+    """
+    x_positions = np.asarray(x_positions)
+    idx = np.linspace(0, len(x_positions) - 1, min(max_frames, len(x_positions))).round().astype(int)
+    xs = x_positions[idx]
+    ys = None if y_positions is None else np.asarray(y_positions)[idx]
+    tt = np.linspace(0, T, len(x_positions))[idx]
+    frame_ms = 1000*T/len(idx)   # duración de cada frame para reproducir en tiempo real
+
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=[x_positions[0]], y=[0], mode="markers", marker=dict(size=20), name="Remero"))
-    fig.add_trace(go.Scatter(x=[0, L], y=[0, 0], mode="markers", marker=dict(size=12, color="green"), name="Ref"))
+    fig.add_trace(go.Scatter(x=[xs[0]], y=[0.5], mode="markers", marker=dict(size=20), name="Remero"))
+    fig.add_trace(go.Scatter(x=[0, L], y=[0.5, 0.5], mode="markers", marker=dict(size=12, color="green"), name="Ref"))
+    animated = [0]
+    if ys is not None:
+        fig.add_trace(go.Scatter(x=[ys[0]], y=[-0.5], mode="markers", marker=dict(size=20, symbol="square", color="black"),
+                                 name="Barco", xaxis="x2", yaxis="y"))
+        animated.append(2)
+
+    frames = []
+    for k in range(len(idx)):
+        data = [go.Scatter(x=[xs[k]])]
+        if ys is not None:
+            data.append(go.Scatter(x=[ys[k]]))
+        frames.append(go.Frame(data=data, traces=animated, name=f"{tt[k]:.3f}"))
+    fig.frames = frames
 
-    fig.update_layout(
-        xaxis=dict(range=[np.min(x_positions), np.max(x_positions)]),
-        yaxis=dict(range=[-1, 1]),
+    x_range = [min(np.min(xs), 0, L), max(np.max(xs), 0, L)]
+    layout = dict(
+        xaxis=dict(range=x_range, title="x(t) [m]", domain=[0, 1], anchor="y"),
+        yaxis=dict(range=[-1, 1], showticklabels=False),
+        showlegend=False,
+        margin=dict(l=10, r=10, t=10, b=10),
+        updatemenus=[dict(
+            type="buttons", direction="left", x=0, y=-0.25, xanchor="left",
+            buttons=[
+                dict(label="▶", method="animate",
+                     args=[None, dict(frame=dict(duration=frame_ms, redraw=False), fromcurrent=True,
+                                      transition=dict(duration=0), mode="immediate")]),
+                dict(label="⏸", method="animate",
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate",
+                                        transition=dict(duration=0))]),
+            ])],
+        sliders=[dict(
+            x=0.15, y=-0.2, len=0.85, currentvalue=dict(prefix="t = ", suffix=" s"),
+            steps=[dict(method="animate", label=f.name,
+                        args=[[f.name], dict(frame=dict(duration=0, redraw=False), mode="immediate",
+                                             transition=dict(duration=0))])
+                   for f in frames])],
     )
+    if ys is not None:
+        layout['xaxis2'] = dict(range=[min(np.min(ys), 0), max(np.max(ys), 0)], title="y(t) [m]",
+                                overlaying="x", side="top")
+    fig.update_layout(**layout)
+    return fig
+
+
+def animar_bola_1d(x_positions, L, T, y_positions=None, max_frames: int = 150):
+    """Shows the rower (and boat) animation: a single chart sent once to the browser."""
+    fig = figura_animacion_1d(x_positions, L, T, y_positions=y_positions, max_frames=max_frames)
+    st.plotly_chart(fig, use_container_width=True, key="anim_bola")
+    return fig
+
 
-    # Contenedor único con key
-    container = st.empty()
-    container.plotly_chart(fig, use_container_width=True, key="anim_bola")  # key solo aquí
+def figura_tornado(sensibilidades, salida: str = 'v_f'):
+    """
+    Tornado chart of the elasticities (p/Q)·dQ/dp of one output (p_f, v_f or dE_rower) with
+    respect to each parameter, sorted by magnitude.
+    """
+    i = sensibilidades['outputs'].index(salida)
+    q = sensibilidades['outputs_values'][salida]
+    params = sensibilidades['params']
+    dq = sensibilidades['matrix'][i]
+    elasticidad = np.array([sensibilidades['values'][p]*d/q if q != 0 else 0.0 for p, d in zip(params, dq)])
+    orden = np.argsort(np.abs(elasticidad))
 
-    # Animación en tiempo real
-    for x in x_positions:
-        fig.data[0].x = [x]   # actualizar la posición
-        container.plotly_chart(fig, use_container_width=True)  # actualizar contenido del mismo contenedor
-        time.sleep(dt)
+    fig = go.Figure(go.Bar(
+        x=elasticidad[orden], y=[params[k] for k in orden], orientation="h",
+        marker_color=["firebrick" if e < 0 else "seagreen" for e in elasticidad[orden]],
+        customdata=dq[orden], hovertemplate="%{y}: elasticidad %{x:.3f}<br>d" + salida + "/dp = %{customdata:.4g}<extra></extra>"))
+    fig.update_layout(title=f"Elasticidad de {salida}: % de cambio por cada 1% del parámetro",
+                      xaxis_title="(p/Q)·dQ/dp", height=400, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
@@ -0,0 +1,183 @@
+import numpy as np
+
+from rowEquation import RowEquation
+
+
+def half_sine(tau):
+    """Blade force shape over the drive, tau in [0, 1]."""
+    return np.sin(np.pi*tau)
+
+
+def skewed(tau, peak: float = 0.4):
+    """Force shape that peaks early in the drive (at tau = peak), zero at catch and finish."""
+    tau = np.asarray(tau, dtype=float)
+    return np.where(tau < peak, np.sin(0.5*np.pi*tau/peak), np.cos(0.5*np.pi*(tau - peak)/(1 - peak)))**2
+
+
+FORCE_PROFILES = {'half_sine': half_sine, 'skewed': skewed}
+
+
+class StrokeCycle():
+    """
+    Full stroke engine: drive and recovery phases alternated over many strokes.
+
+    The recovery is the air phase of RowEquation, v' = A|v|v - B x''(t). During the drive
+    the blade pushes the system with F(t) = F_peak * shape(t/T_drive) and the rower goes back
+    from L to 0 following the recovery polynomial reversed in time and scaled to T_drive:
+
+        v' = A|v|v - B x_d''(t) + mu F(t)
+
+    Both phases repeat identically, so the forcing -B x'' + mu F is tabulated once per phase
+    on the half-step nodes of a fixed-step RK4, and the strokes are integrated segment by
+    segment with a scalar loop that only carries (v, y) across phases. The outputs are
+    preallocated and decimated while integrating (one sample every `decimate` steps), plus
+    one row per stroke in solution['strokes'].
+    """
+
+    def __init__(self, eq: RowEquation, T_drive: float = 0.8, F_peak: float = 100.0, force='half_sine',
+                 dt: float = 5e-3):
+        if eq.kinematics is None:
+            raise ValueError("Define la cinemática de la recuperación con set_rower_cinematic() antes")
+        self.eq = eq
+        self.T_drive = T_drive
+        self.F_peak = F_peak
+        self.force = FORCE_PROFILES[force] if isinstance(force, str) else force
+        self.dt = dt
+        self.solution = None
+        self._tables = [self._phase_table(0), self._phase_table(1)]
+
+    @property
+    def stroke_rate(self):
+        """Strokes per minute."""
+        return 60/(self.T_drive + self.eq.T)
+
+    def _phase_table(self, phase: int):
+        """
+        Fixed-step table of one phase (0: drive, 1: recovery): step h, forcing at the
+        2n+1 half-step nodes, rower position and blade force at the n+1 nodes.
+        """
+        eq = self.eq
+        T = self.T_drive if phase == 0 else eq.T
+        n = max(int(np.ceil(T/self.dt)), 1)
+        h = T/n
+        t_half = np.linspace(0, T, 2*n + 1)
+        if phase == 0:
+            # Recuperación invertida en el tiempo y escalada a T_drive: de L a 0
+            scale = eq.T/T
+            s = eq.T - scale*t_half
+            x = eq.kinematics.x(s)
+            xdd = scale**2*eq.kinematics.x_ddot(s)
+            F = self.F_peak*self.force(t_half/T)
+        else:
+            x = eq.kinematics.x(t_half)
+            xdd = eq.kinematics.x_ddot(t_half)
+            F = np.zeros_like(t_half)
+        g = -eq.B*xdd + eq.mu*F
+        return {'n': n, 'h': h, 'T': T, 'g': g.tolist(), 'F': F.tolist(), 'x': x[::2]}
+
+    def run(self, n_strokes: int = None, distance: float = None, y0_dot: float = None,
+            decimate: int = 10, max_strokes: int = 5000):
+        """
+        Integrates n_strokes strokes (drive + recovery), or until the boat covers `distance`
+        metres. Returns the decimated series ('tt', 'yy', 'yy_dot', 'xx', 'phase'), the
+        per-stroke table 'strokes' and the totals in 'magnitudes'.
+        """
+        if n_strokes is None and distance is None:
+            raise ValueError("Indica n_strokes o distance")
+        n_max = max_strokes if n_strokes is None else n_strokes
+        eq = self.eq
+        A = eq.A
+        drive, recovery = self._tables
+        steps_per_stroke = drive['n'] + recovery['n']
+
+        # Salidas preasignadas (decimadas) y tabla por palada
+        n_out = n_max*steps_per_stroke//decimate + 2
+        out_t = np.empty(n_out)
+        out_y = np.empty(n_out)
+        out_v = np.empty(n_out)
+        out_x = np.empty(n_out)
+        out_phase = np.empty(n_out, dtype=np.int8)
+        strokes = {k: np.empty(n_max) for k in ('t_catch', 'v_catch', 'v_finish', 'v_min', 'v_max',
+                                                  'distance', 'v_mean', 'W_blade', 'impulse')}
+
+        v = eq.y0_dot if y0_dot is None else float(y0_dot)
+        y = 0.0
+        t = 0.0
+        counter = 0
+        out_t[0], out_y[0], out_v[0], out_x[0], out_phase[0] = t, y, v, drive['x'][0], 0
+        j = 1
+        done = 0
+        for stroke in range(n_max):
+            y_catch = y
+            strokes['t_catch'][stroke] = t
+            strokes['v_catch'][stroke] = v
+            v_min = v_max = v
+            W_blade = impulse = 0.0
+            for phase, table in enumerate(self._tables):
+                g, F, n, h = table['g'], table['F'], table['n'], table['h']
+                hh = 0.5*h
+                h6 = h/6
+                xs = table['x']
+                for k in range(n):
+                    a, b, c = g[2*k], g[2*k + 1], g[2*k + 2]
+                    k1 = A*abs(v)*v + a
+                    v2 = v + hh*k1
+                    k2 = A*abs(v2)*v2 + b
+                    v3 = v + hh*k2
+                    k3 = A*abs(v3)*v3 + b
+                    v4 = v + h*k3
+                    k4 = A*abs(v4)*v4 + c
+                    if phase == 0:
+                        Fb = F[2*k + 1]
+                        W_blade += h6*(F[2*k]*v + 2*Fb*(v2 + v3) + F[2*k + 2]*v4)
+                        impulse += h6*(F[2*k] + 4*Fb + F[2*k + 2])
+                    y += h6*(v + 2*v2 + 2*v3 + v4)
+                    v += h6*(k1 + 2*k2 + 2*k3 + k4)
+                    if v < v_min:
+                        v_min = v
+                    elif v > v_max:
+                        v_max = v
+                    counter += 1
+                    if counter == decimate:
+                        counter = 0
+                        out_t[j] = t + (k + 1)*h
+                        out_y[j] = y
+                        out_v[j] = v
+                        out_x[j] = xs[k + 1]
+                        out_phase[j] = phase
+                        j += 1
+                t += table['T']
+                if phase == 0:
+                    strokes['v_finish'][stroke] = v
+            strokes['v_min'][stroke] = v_min
+            strokes['v_max'][stroke] = v_max
+            strokes['distance'][stroke] = y - y_catch
+            strokes['v_mean'][stroke] = (y - y_catch)/(self.T_drive + eq.T)
+            strokes['W_blade'][stroke] = W_blade
+            strokes['impulse'][stroke] = impulse
+            done = stroke + 1
+            if not np.isfinite(v):
+                raise FloatingPointError("La integración diverge: reduce dt")
+            if distance is not None and y >= distance:
+                break
+
+        if counter:
+            out_t[j], out_y[j], out_v[j], out_x[j], out_phase[j] = t, y, v, recovery['x'][-1], 1
+            j += 1
+        solution = {'tt': out_t[:j],
+                    'yy': out_y[:j],
+                    'yy_dot': out_v[:j],
+                    'xx': out_x[:j],
+                    'phase': out_phase[:j],
+                    'strokes': {k: a[:done] for k, a in strokes.items()}}
+        W_blade = float(strokes['W_blade'][:done].sum())
+        solution['magnitudes'] = {'n_strokes': done,
+                                  'time': t,
+                                  'distance': y,
+                                  'v_mean': y/t,
+                                  'v_f': v,
+                                  'stroke_rate': self.stroke_rate,
+                                  'W_blade': W_blade,
+                                  'power': W_blade/t}
+        self.solution = solution
+        return solution
@@ -0,0 +1,119 @@
+import numpy as np
+from scipy.optimize import minimize
+
+from sensitivity import coefficient_sensitivities
+
+QUANTITIES = ('p_f', 'v_f', 'dE_rower')
+
+
+class Objective():
+    """
+    Weighted sum of final quantities to minimize: sum(weights[q] * q) for q in
+    p_f, v_f, dE_rower. Use maximize()/minimize_quantity() for the usual single goals or
+    subclass and override __call__(result) -> (value, gradient) for anything else.
+    """
+
+    def __init__(self, **weights):
+        unknown = set(weights) - set(QUANTITIES)
+        if unknown:
+            raise ValueError(f"Magnitudes desconocidas: {unknown}. Opciones: {QUANTITIES}")
+        self.weights = weights
+
+    def __call__(self, result):
+        value = sum(w*result[q] for q, w in self.weights.items())
+        grad = sum(w*result['d' + q] for q, w in self.weights.items())
+        return value, grad
+
+
+def maximize(quantity: str):
+    return Objective(**{quantity: -1.0})
+
+
+def minimize_quantity(quantity: str):
+    return Objective(**{quantity: 1.0})
+
+
+class Constraint():
+    """lower <= quantity <= upper on p_f, v_f or dE_rower (either bound may be None)."""
+
+    def __init__(self, quantity: str, lower: float = None, upper: float = None):
+        if quantity not in QUANTITIES:
+            raise ValueError(f"Magnitud desconocida: {quantity}. Opciones: {QUANTITIES}")
+        self.quantity = quantity
+        self.lower = lower
+        self.upper = upper
+
+    def to_scipy(self, evaluate):
+        """Inequality constraints (fun(x) >= 0) in scipy's dict format."""
+        q = self.quantity
+        out = []
+        if self.lower is not None:
+            out.append({'type': 'ineq',
+                        'fun': lambda x: evaluate(x)[q] - self.lower,
+                        'jac': lambda x: evaluate(x)['d' + q]})
+        if self.upper is not None:
+            out.append({'type': 'ineq',
+                        'fun': lambda x: self.upper - evaluate(x)[q],
+                        'jac': lambda x: -evaluate(x)['d' + q]})
+        return out
+
+
+class StrokeOptimizer():
+    """
+    Optimizes the free coefficients a4..an of the rower cinematic of a RowEquation.
+
+    Every evaluation integrates the EDO once together with its forward sensitivities with
+    respect to the coefficients, so scipy.optimize gets exact gradients at the cost of a
+    single (augmented) solve instead of one finite-difference solve per coefficient. The
+    boundary conditions are built into the parametrization, so they always hold.
+    """
+
+    def __init__(self, eq, objective: Objective = None, constraints: list = (), bound: float = 10.0,
+                 rtol: float = 1e-8, atol: float = 1e-10):
+        self.eq = eq
+        self.objective = maximize('p_f') if objective is None else objective
+        self.constraints = list(constraints)
+        self.bound = bound
+        self.rtol = rtol
+        self.atol = atol
+        self.n_evaluations = 0
+        self._last = (None, None)
+
+    def evaluate(self, high_coeffs):
+        """Final quantities and their gradients for the given free coefficients (memoized)."""
+        x = np.asarray(high_coeffs, dtype=float)
+        if self._last[0] is not None and np.array_equal(self._last[0], x):
+            return self._last[1]
+        self.eq.set_rower_cinematic(x)
+        result = coefficient_sensitivities(self.eq, rtol=self.rtol, atol=self.atol)
+        self.n_evaluations += 1
+        self._last = (x.copy(), result)
+        return result
+
+    def run(self, x0=None, method: str = 'SLSQP', n_t_intervals: int = 5000, callback=None, **options):
+        """
+        Runs the optimization from x0 (default: current coefficients of eq) and leaves eq with
+        the optimal cinematic and its solution. callback(xk) is called after every iteration
+        (an exception raised there aborts the run). Returns a dict with the optimal coefficients,
+        the objective value, the solution, the scipy result and the number of integrations.
+        """
+        if x0 is None:
+            x0 = self.eq.coeffs[4:] if len(self.eq.coeffs) > 4 else np.zeros(1)
+        x0 = np.asarray(x0, dtype=float)
+
+        def fun(x):
+            return self.objective(self.evaluate(x))
+
+        constraints = [c for con in self.constraints for c in con.to_scipy(self.evaluate)]
+        kwargs = {'constraints': constraints} if constraints else {}
+        res = minimize(fun, x0, jac=True, method=method,
+                       bounds=[(-self.bound, self.bound)]*len(x0), options=options or None,
+                       callback=callback, **kwargs)
+
+        self.eq.set_rower_cinematic(res.x)
+        solution = self.eq.solve_edo(n_t_intervals=n_t_intervals)
+        return {'high_coeffs': res.x,
+                'objective': res.fun,
+                'solution': solution,
+                'result': res,
+                'n_evaluations': self.n_evaluations}
@@ -0,0 +1,175 @@
+"""
+Surrogate lookup table of the RowEquation magnitudes.
+
+Offline, build_surrogate() samples a regular grid over a bounded box of parameters (any
+of m, M, L, T, rho, S, Cd, y0_dot and the free coefficients a4..an) with RowEnsemble and
+stores it in a single npz file. Besides the grid, the exact magnitudes at the centre of
+every cell are compared with the interpolated ones, which gives a local error estimate.
+
+    python src/surrogate.py surrogate.npz --axis M 14 30 9 --axis y0_dot 2 6 9 --degree 4
+
+Surrogate.query() interpolates multilinearly and returns the values with the error of the
+enclosing cell; covers() tells whether a configuration is inside the table (otherwise the
+front ends fall back to solve_edo).
+"""
+import argparse
+import json
+from itertools import product
+
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+from rowEnsemble import DEFAULTS, RowEnsemble
+
+OUTPUTS = ('v_f', 'p_f', 'dE_rower')
+
+
+def _solve_points(points, names, fixed, degree, n_t_intervals, substeps):
+    """Magnitudes of a list of points (n_points, n_axes) with RowEnsemble."""
+    n_points = len(points)
+    cases = {p: np.full(n_points, float(fixed.get(p, DEFAULTS[p]))) for p in DEFAULTS}
+    high = np.zeros((n_points, max(degree - 3, 1)))
+    for k in range(4, degree + 1):
+        high[:, k - 4] = fixed.get(f'a{k}', 0.0)
+    for j, name in enumerate(names):
+        if name in cases:
+            cases[name] = points[:, j]
+        else:
+            high[:, int(name[1:]) - 4] = points[:, j]
+    sol = RowEnsemble(high_coeffs=high, **cases).solve(n_t_intervals=n_t_intervals, substeps=substeps,
+                                                       store_trajectories=False)
+    if sol['diverged'].any():
+        # Un NaN en la tabla contaminaría la interpolación de todas las celdas vecinas
+        raise FloatingPointError(f"{int(sol['diverged'].sum())} puntos de la tabla divergen: "
+                                 f"aumenta substeps o reduce el rango de los ejes")
+    return {q: sol['magnitudes'][q] for q in OUTPUTS}
+
+
+def build_surrogate(path: str, axes: dict, fixed: dict = None, degree: int = 4,
+                    n_t_intervals: int = 2, substeps: int = 400):
+    """
+    axes: {name: (low, high, n_points)}; fixed: values of every other parameter (defaults of
+    RowEquation otherwise). An axis with a single point is stored as a fixed parameter.
+    Writes the table to path and returns the Surrogate.
+    """
+    fixed = dict(fixed or {})
+    axes = dict(axes)
+    for name, (lo, hi, n) in list(axes.items()):
+        if int(n) < 1:
+            raise ValueError(f"El eje {name} necesita al menos un punto")
+        if int(n) == 1:
+            # RegularGridInterpolator necesita dos puntos por eje: un eje de un punto es un fijo
+            fixed[name] = float(lo)
+            del axes[name]
+    if not axes:
+        raise ValueError("La tabla necesita al menos un eje con dos puntos o más")
+    names = list(axes)
+    grids = [np.linspace(lo, hi, int(n)) for lo, hi, n in axes.values()]
+    points = np.array(list(product(*grids)))
+    values = _solve_points(points, names, fixed, degree, n_t_intervals, substeps)
+    shape = tuple(len(g) for g in grids)
+
+    # Error local: valor exacto en el centro de cada celda frente al interpolado
+    centers = [0.5*(g[1:] + g[:-1]) for g in grids]
+    center_points = np.array(list(product(*centers)))
+    exact = _solve_points(center_points, names, fixed, degree, n_t_intervals, substeps)
+    cell_shape = tuple(len(c) for c in centers)
+
+    arrays = {'axis_names': np.array(names)}
+    for i, g in enumerate(grids):
+        arrays[f'axis_{i}'] = g
+    for q in OUTPUTS:
+        table = values[q].reshape(shape)
+        interp = RegularGridInterpolator(grids, table)(center_points)
+        arrays[f'value_{q}'] = table
+        arrays[f'error_{q}'] = np.abs(interp - exact[q]).reshape(cell_shape)
+    meta = {'fixed': fixed, 'degree': degree, 'n_t_intervals': n_t_intervals, 'substeps': substeps}
+    np.savez_compressed(path, meta=json.dumps(meta), **arrays)
+    return Surrogate(path)
+
+
+class Surrogate():
+    """Fast query API over a table written by build_surrogate()."""
+
+    def __init__(self, path: str):
+        with np.load(path) as data:
+            self.names = [str(n) for n in data['axis_names']]
+            self.grids = [data[f'axis_{i}'] for i in range(len(self.names))]
+            meta = json.loads(str(data['meta']))
+            self.fixed = meta['fixed']
+            self.degree = meta['degree']
+            self._interp = {q: RegularGridInterpolator(self.grids, data[f'value_{q}']) for q in OUTPUTS}
+            self._error = {q: data[f'error_{q}'] for q in OUTPUTS}
+
+    @property
+    def bounds(self):
+        return {n: (g[0], g[-1]) for n, g in zip(self.names, self.grids)}
+
+    def covers(self, params: dict, high_coeffs=(), rtol: float = 1e-9):
+        """
+        True if the configuration (RowEquation parameters + free coefficients) lies inside
+        the table: axis values within bounds and every other parameter equal to the fixed one.
+        """
+        full = self._full_params(params, high_coeffs)
+        if full is None:
+            return False
+        for name, value in full.items():
+            if name in self.names:
+                lo, hi = self.bounds[name]
+                if not lo <= value <= hi:
+                    return False
+            else:
+                ref = self.fixed.get(name, DEFAULTS.get(name, 0.0))
+                if not np.isclose(value, ref, rtol=rtol, atol=1e-12):
+                    return False
+        return True
+
+    def _full_params(self, params, high_coeffs):
+        if len(high_coeffs) > max(self.degree - 3, 0):
+            return None
+        full = {p: float(params[p]) for p in DEFAULTS if p in params}
+        for k in range(4, self.degree + 1):
+            full[f'a{k}'] = float(high_coeffs[k - 4]) if k - 4 < len(high_coeffs) else 0.0
+        return full
+
+    def query(self, **values):
+        """
+        Interpolated magnitudes at the given axis values (scalars or arrays). Returns
+        {output: value} plus {output + '_err': error estimate of the enclosing cell}.
+        """
+        pts = np.stack(np.broadcast_arrays(*[np.asarray(values[n], dtype=float) for n in self.names]), axis=-1)
+        out = {}
+        cell = tuple(np.clip(np.searchsorted(g, pts[..., i], side='right') - 1, 0, len(g) - 2)
+                     for i, g in enumerate(self.grids))
+        for q in OUTPUTS:
+            out[q] = self._interp[q](pts)
+            out[q + '_err'] = self._error[q][cell]
+        if pts.ndim == 1:
+            out = {k: float(np.squeeze(v)) for k, v in out.items()}
+        return out
+
+    def magnitudes(self, params: dict, high_coeffs=()):
+        """Magnitudes of a covered configuration, or None if it falls outside the table."""
+        if not self.covers(params, high_coeffs):
+            return None
+        full = self._full_params(params, high_coeffs)
+        return self.query(**{n: full[n] for n in self.names})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help='fichero npz de salida')
+    parser.add_argument('--axis', nargs=4, action='append', metavar=('NAME', 'LOW', 'HIGH', 'N'), required=True)
+    parser.add_argument('--fixed', default='{}', help='JSON con los parámetros fijos')
+    parser.add_argument('--degree', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    axes = {name: (float(lo), float(hi), int(n)) for name, lo, hi, n in args.axis}
+    sur = build_surrogate(args.path, axes, json.loads(args.fixed), args.degree)
+    for q in OUTPUTS:
+        err = sur._error[q]
+        print(f"{q:9s} error máximo {err.max():.3e}   medio {err.mean():.3e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Headless parameter sweep over RowEquation configurations.
+
+The sweep spec is a JSON file:
+
+    {
+        "sampling": "lhs",              # "grid" o "lhs" (Latin hypercube)
+        "n_samples": 20000,             # solo para "lhs"
+        "seed": 0,
+        "degree": 6,                    # grado del polinomio: coeficientes libres a4..a6
+        "params": {"M": [14, 30], "Cd": [0.002, 0.006], "a4": [-3, 3]},
+        "fixed": {"rho": 1000, "y0_dot": 4.5},
+        "n_t_intervals": 200,
+        "substeps": 5
+    }
+
+For "lhs" every entry of "params" is a [low, high] range; for "grid" it is the list of
+values of that axis. Any of m, M, L, T, rho, S, Cd, y0_dot and a4..an may be swept.
+
+    python src/sweep.py spec.json --out results/ --workers 8 --chunk-size 1000
+
+Cases are split into chunks that a ProcessPoolExecutor solves with RowEnsemble. Each
+finished chunk is written to out/chunk_XXXXXX.npz, so a killed run is resumed by running
+the same command again: chunks already on disk are skipped. Cases whose integration
+diverges are flagged in the 'diverged' column and their magnitudes are NaN.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+
+from rowEnsemble import DEFAULTS, RowEnsemble
+
+MAGNITUDES = ('Ei', 'Ef', 'dE_sist', 'dE_rower', 'p_f', 'v_f', 'dv', 'W_drag', 'impulse', 'v_mean')
+
+
+def _coeff_index(name: str, n_free: int):
+    """Column of a free coefficient name 'a4'..'a{n_free+3}' in high_coeffs, else None."""
+    if name.startswith('a') and name[1:].isdigit() and 4 <= int(name[1:]) <= n_free + 3:
+        return int(name[1:]) - 4
+    return None
+
+
+def build_cases(spec):
+    """Deterministic table of cases {name: array(n_cases)} described by the spec."""
+    params = spec['params']
+    names = list(params)
+    sampling = spec.get('sampling', 'grid')
+    if sampling == 'grid':
+        grid = np.array(list(product(*[np.asarray(params[n], dtype=float) for n in names])))
+        columns = grid.T
+    elif sampling == 'lhs':
+        from scipy.stats import qmc
+        sampler = qmc.LatinHypercube(d=len(names), seed=spec.get('seed', 0))
+        lows, highs = zip(*[params[n] for n in names])
+        columns = qmc.scale(sampler.random(spec['n_samples']), lows, highs).T
+    else:
+        raise ValueError(f"Muestreo desconocido: {sampling}")
+
+    fixed = spec.get('fixed', {})
+    n_free = max(spec.get('degree', 3) - 3, 1)
+    unknown = [k for k in fixed if k not in DEFAULTS and _coeff_index(k, n_free) is None]
+    if unknown:
+        raise ValueError(f"Parámetros fijos desconocidos en el barrido: {unknown}")
+
+    n_cases = columns.shape[1]
+    cases = {name: np.full(n_cases, float(fixed.get(name, DEFAULTS[name]))) for name in DEFAULTS}
+    high = np.zeros((n_cases, n_free))
+    for k, v in fixed.items():
+        if k not in DEFAULTS:
+            high[:, _coeff_index(k, n_free)] = v
+    for name, col in zip(names, columns):
+        if name in cases:
+            cases[name] = col
+        elif _coeff_index(name, n_free) is not None:
+            high[:, _coeff_index(name, n_free)] = col
+        else:
+            raise ValueError(f"Parámetro desconocido en el barrido: {name}")
+    cases['high_coeffs'] = high
+    return cases
+
+
+def solve_chunk(cases, n_t_intervals=200, substeps=1, trajectory_points=0):
+    """Solves one chunk of cases with RowEnsemble and returns the arrays to store."""
+    ens = RowEnsemble(**cases)
+    sol = ens.solve(n_t_intervals=n_t_intervals, substeps=substeps,
+                    store_trajectories=trajectory_points > 0)
+    out = {f'in_{k}': v for k, v in cases.items()}
+    out.update({k: sol['magnitudes'][k] for k in MAGNITUDES})
+    out['diverged'] = sol['diverged']
+    if trajectory_points > 0:
+        idx = np.linspace(0, n_t_intervals - 1, min(trajectory_points, n_t_intervals)).round().astype(int)
+        for key in ('tt', 'xx', 'yy', 'yy_dot'):
+            out[key] = sol[key][:, idx].astype(np.float32)
+    return out
+
+
+def _run_chunk(path, cases, n_t_intervals, substeps, trajectory_points):
+    out = solve_chunk(cases, n_t_intervals, substeps, trajectory_points)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, **out)
+    os.replace(tmp, path)  # escritura atómica: un chunk en disco siempre está completo
+    return path, len(cases['m']), int(out['diverged'].sum())
+
+
+def chunk_path(out_dir, i):
+    return os.path.join(out_dir, f'chunk_{i:06d}.npz')
+
+
+def run_sweep(spec, out_dir, workers=None, chunk_size=1000, trajectory_points=0, verbose=True):
+    """Runs (or resumes) a sweep, writing one npz file per chunk into out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    # El troceado y las salidas deben coincidir al reanudar, así que se guardan con la spec
+    meta = {'spec': spec, 'chunk_size': chunk_size, 'trajectory_points': trajectory_points}
+    meta_path = os.path.join(out_dir, 'sweep.json')
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) != meta:
+                raise ValueError(f"{out_dir} contiene un barrido con otra especificación u opciones")
+    else:
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    cases = build_cases(spec)
+    n_cases = len(cases['m'])
+    n_chunks = -(-n_cases // chunk_size)
+    pending = [i for i in range(n_chunks) if not os.path.exists(chunk_path(out_dir, i))]
+    if verbose:
+        print(f"{n_cases} casos en {n_chunks} chunks, {n_chunks - len(pending)} ya completos")
+
+    t0 = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for i in pending:
+            sl = slice(i*chunk_size, (i + 1)*chunk_size)
+            futures.append(pool.submit(_run_chunk, chunk_path(out_dir, i),
+                                       {k: v[sl] for k, v in cases.items()},
+                                       spec.get('n_t_intervals', 200), spec.get('substeps', 1),
+                                       trajectory_points))
+        for fut in as_completed(futures):
+            path, n, n_diverged = fut.result()
+            done += n
+            if verbose:
+                rate = done/(time.perf_counter() - t0)
+                warning = f"  {n_diverged} divergen" if n_diverged else ""
+                print(f"  {os.path.basename(path)}  {done} casos  ({rate:.0f} casos/s){warning}")
+    return out_dir
+
+
+def load_results(out_dir):
+    """Concatenates every chunk of a sweep directory into one dict of arrays."""
+    paths = sorted(p for p in os.listdir(out_dir) if p.startswith('chunk_') and p.endswith('.npz')
+                   and '.tmp' not in p)
+    parts = []
+    for p in paths:
+        # Se copian los arreglos y se cierra el fichero: NpzFile mantiene abierto el zip
+        with np.load(os.path.join(out_dir, p)) as f:
+            parts.append({k: f[k] for k in f.files})
+    if not parts:
+        return {}
+    return {k: np.concatenate([part[k] for part in parts]) for k in parts[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('spec', help='fichero JSON con la especificación del barrido')
+    parser.add_argument('--out', required=True, help='directorio de resultados (se reanuda si existe)')
+    parser.add_argument('--workers', type=int, default=None, help='procesos (por defecto, todos los núcleos)')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--trajectories', type=int, default=0,
+                        help='guarda tt/xx/yy/yy_dot submuestreadas a este número de puntos (0 = no)')
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    run_sweep(spec, args.out, workers=args.workers, chunk_size=args.chunk_size,
+              trajectory_points=args.trajectories)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,19 @@
+import subprocess
+
+import numpy as np
+
+import cortar_lote
+
+
+def test_keyframes_are_relative_to_file_start(monkeypatch):
+    # Entrada con start_time=1.4 (habitual en MP4/TS): los pts son absolutos
+    def fake_run(cmd, **kwargs):
+        if 'format=start_time' in cmd:
+            out = '1.400000\n'
+        else:
+            out = '1.400000,K__\n1.433333,___\n3.400000,K__\n5.400000,K_\n'
+        return subprocess.CompletedProcess(cmd, 0, stdout=out)
+
+    monkeypatch.setattr(cortar_lote.subprocess, 'run', fake_run)
+    monkeypatch.setattr(cortar_lote, '_keyframes', {})
+    np.testing.assert_allclose(cortar_lote.keyframes('in.mp4'), [0.0, 2.0, 4.0])
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from crewEquation import CrewEquation
+from rowEquation import RowEquation
+
+
+def test_synchronized_pair_matches_single_rower():
+    # Dos asientos iguales y sin desfase mueven el casco como un remero de masa doble
+    crew = CrewEquation([40, 40], M=20, S=0.5, Cd=0.5)
+    crew.set_rower_cinematic([0.5, -0.2])
+    sol = crew.solve_edo(y0_dot=5, n_t_intervals=101, rtol=1e-10, atol=1e-12)
+    single = RowEquation(m=80, M=20, S=0.5, Cd=0.5)
+    single.set_rower_cinematic([0.5, -0.2])
+    ref = single.solve_edo(y0_dot=5, n_t_intervals=101, rtol=1e-10, atol=1e-12)
+
+    np.testing.assert_allclose(sol['yy_dot'], ref['yy_dot'], rtol=1e-7)
+    np.testing.assert_allclose(sol['xx'], [ref['xx'], ref['xx']], atol=1e-12)
+    mags = sol['magnitudes']
+    for key in ('v_f', 'p_f', 'dE_rower', 'W_drag', 'impulse'):
+        assert mags[key] == pytest.approx(ref['magnitudes'][key], rel=1e-7)
+    np.testing.assert_allclose(mags['dE_seats'], 0.5*ref['magnitudes']['dE_rower'], rtol=1e-7)
+
+
+def test_offset_seat_waits_for_its_recovery():
+    crew = CrewEquation([80, 70], offsets=[0, 0.1])
+    crew.set_rower_cinematic([[0.5, -0.2], [0.3]])
+    sol = crew.solve_edo(n_t_intervals=111)
+    assert (crew.t0, crew.T) == (0, pytest.approx(1.1))
+    early, late = sol['tt'] < 0.1, sol['tt'] > 1.0
+    assert np.all(sol['xx'][1, early] == 0) and np.all(sol['xx_dot'][1, early] == 0)
+    assert np.all(sol['xx_dot'][0, late] == 0)
+    np.testing.assert_allclose(sol['xx'][:, -1], crew.L)
+    assert sol['magnitudes']['dE_rower'] == pytest.approx(sol['magnitudes']['dE_seats'].sum())
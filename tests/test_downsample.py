@@ -0,0 +1,21 @@
+import numpy as np
+
+from downsample import downsample, minmax_indices
+
+
+def test_minmax_keeps_peak_in_remainder_bucket():
+    y = np.zeros(1003)
+    y[1001] = 5.0
+    idx = minmax_indices(y, 100)
+    assert 1001 in idx
+    assert idx[-1] == 1002
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_minmax_keeps_extremes_of_every_bucket():
+    t = np.linspace(0, 1, 5003)
+    y = np.sin(40*t) + 0.1*np.cos(900*t)
+    x_plot, y_plot = downsample(t, y, 400)
+    assert len(x_plot) <= 400 + 3
+    assert y_plot.max() == y.max() and y_plot.min() == y.min()
+    assert x_plot[0] == t[0] and x_plot[-1] == t[-1]
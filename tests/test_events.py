@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from rowEquation import RowEquation
+
+
+def equation(coeffs):
+    eq = RowEquation(m=80, M=20, L=-1, T=1, rho=1000, S=0.5, Cd=0.5)
+    eq.y0_dot = 5
+    eq.set_rower_cinematic(coeffs)
+    return eq
+
+
+def test_endpoint_extrema_are_reported():
+    # El barco solo decelera: la velocidad máxima está en la entrada (t=0) y la mínima en t=T,
+    # sin ningún cruce interior que solve_ivp pueda localizar
+    sol = equation([0, 1, 3, -2]).solve_edo(n_t_intervals=2001, events=['boat_speed_min', 'boat_speed_max'])
+    assert np.all(np.diff(sol['yy_dot']) < 0)
+    events = sol['events']
+    np.testing.assert_allclose(events['boat_speed_max']['t'], [0.0])
+    np.testing.assert_allclose(events['boat_speed_min']['t'], [1.0])
+    assert events['boat_speed_max']['yy_dot'][0] == pytest.approx(5)
+    assert events['boat_speed_min']['yy_dot'][0] == pytest.approx(sol['yy_dot'][-1], rel=1e-6)
+
+
+def test_interior_and_endpoint_extrema_cover_the_grid():
+    sol = equation([1, 2]).solve_edo(n_t_intervals=2001, events=['boat_speed_min', 'boat_speed_max'])
+    events = sol['events']
+    for name, best in (('boat_speed_min', np.min), ('boat_speed_max', np.max)):
+        t = events[name]['t']
+        assert np.all(np.diff(t) > 0)
+        assert best(events[name]['yy_dot']) == pytest.approx(best(sol['yy_dot']), rel=1e-6)
+    # Cruces sin extremo asociado: los extremos del intervalo no se añaden
+    zero = equation([1, 2]).solve_edo(events=['boat_speed_zero'])['events']['boat_speed_zero']
+    assert 0 < zero['t'][0] < 1 and len(zero['t']) == 1
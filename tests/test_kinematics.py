@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from kinematics import PolynomialKinematics
+from rowEquation import RowEquation
+
+
+def test_derivatives_and_integral_match_numpy():
+    coeffs = [0, 0, 3.0, -2.0, 0.5, -0.1]
+    kin = PolynomialKinematics(coeffs, T=1.0)
+    p = np.polynomial.Polynomial(coeffs)
+    t = np.linspace(0, 1, 11)
+    np.testing.assert_allclose(kin.x(t), p(t))
+    np.testing.assert_allclose(kin.x_dot(t), p.deriv(1)(t))
+    np.testing.assert_allclose(kin.x_ddot(t), p.deriv(2)(t))
+    np.testing.assert_allclose(kin.x_dddot(t), p.deriv(3)(t))
+    np.testing.assert_allclose(kin.integral(t), p.integ(lbnd=0)(t))
+    assert isinstance(kin.x(0.5), float)
+
+
+def test_boundary_conditions():
+    eq = RowEquation(L=-1, T=1.3)
+    eq.set_rower_cinematic([0.5, -0.2, 0.1])
+    np.testing.assert_allclose([eq.x(0), eq.x_dot(0), eq.x(eq.T), eq.x_dot(eq.T)], [0, 0, -1, 0], atol=1e-12)
+
+
+def test_unset_kinematics_raise():
+    eq = RowEquation()
+    for f in (eq.x, eq.x_dot, eq.x_ddot):
+        with pytest.raises(ValueError, match="set_rower_cinematic"):
+            f(0.5)
+
+
+def test_chebyshev_basis_matches_power_basis():
+    rng = np.random.default_rng(0)
+    T = 1.7
+    coeffs = rng.normal(size=11)/T**np.arange(11)   # grado 10, términos de tamaño similar en [0, T]
+    power = PolynomialKinematics(coeffs, T)
+    cheb = PolynomialKinematics(coeffs, T, basis='chebyshev')
+    t = np.linspace(0, T, 101)
+    for name in ('x', 'x_dot', 'x_ddot', 'x_dddot', 'integral'):
+        ref = getattr(power, name)(t)
+        np.testing.assert_allclose(getattr(cheb, name)(t), ref, atol=1e-10*np.abs(ref).max())
+    assert isinstance(cheb.x(0.5), float)
+    with pytest.raises(ValueError, match="Base"):
+        PolynomialKinematics(coeffs, T, basis='legendre')
+
+
+def test_basis_applies_to_one_call_only():
+    eq = RowEquation(L=-1, T=1.3)
+    eq.set_rower_cinematic([0.5, -0.2, 0.1], basis='chebyshev')
+    assert eq.kinematics.basis == 'chebyshev'
+    cheb = eq.solve_edo(n_t_intervals=50, rtol=1e-10, atol=1e-12)['magnitudes']
+    eq.set_rower_cinematic([0.5, -0.2, 0.1])
+    assert eq.kinematics.basis == 'power'
+    power = eq.solve_edo(n_t_intervals=50, rtol=1e-10, atol=1e-12)['magnitudes']
+    for key in ('v_f', 'p_f', 'dE_rower'):
+        assert cheb[key] == pytest.approx(power[key], rel=1e-9)
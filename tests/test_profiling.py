@@ -0,0 +1,30 @@
+import tracemalloc
+
+import pytest
+
+from rowEquation import RowEquation
+
+
+def equation():
+    eq = RowEquation()
+    eq.set_rower_cinematic([1, 2])
+    return eq
+
+
+@pytest.mark.parametrize('method', ['RK45', 'RK4'])
+def test_profiled_solve_counts_rhs_calls_and_stages(method):
+    sol = equation().solve_edo(n_t_intervals=100, method=method, profile='alloc', sensitivities=True)
+    stats = sol['stats']
+    assert stats['rhs_calls'] == sol['solver']['nfev']
+    stages = {'integration', 'post_processing', 'sensitivities', 'magnitudes'}
+    assert set(stats['time']) == stages | {'total'}
+    assert stats['time']['total'] == pytest.approx(sum(stats['time'][s] for s in stages))
+    assert set(stats['alloc_peak']) == stages
+    assert not tracemalloc.is_tracing()   # el perfilador deja tracemalloc como estaba
+
+
+def test_profiling_is_opt_in():
+    sol = equation().solve_edo(n_t_intervals=100)
+    assert 'stats' not in sol
+    stats = equation().solve_edo(n_t_intervals=100, profile=True)['stats']
+    assert 'alloc_peak' not in stats and stats['rhs_calls'] > 0
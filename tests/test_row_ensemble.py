@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from rowEnsemble import RowEnsemble
+from rowEquation import RowEquation
+
+CASES = [dict(m=80, M=20, L=-1, T=1, Cd=0.004, y0_dot=5, high=[1.0, 2.0]),
+         dict(m=70, M=14, L=-0.9, T=1.2, Cd=0.5, y0_dot=4, high=[0.5, 0.0]),
+         dict(m=90, M=30, L=-1.1, T=0.9, Cd=20, y0_dot=3, high=[-1.0, 0.3])]
+
+
+def test_members_match_solve_edo():
+    cols = {p: [c[p] for c in CASES] for p in ('m', 'M', 'L', 'T', 'Cd', 'y0_dot')}
+    ens = RowEnsemble(high_coeffs=[c['high'] for c in CASES], rho=1000, S=0.5, **cols)
+    sol = ens.solve(n_t_intervals=400, substeps=4)
+    assert not sol['diverged'].any()
+    for i, c in enumerate(CASES):
+        eq = RowEquation(m=c['m'], M=c['M'], L=c['L'], T=c['T'], rho=1000, S=0.5, Cd=c['Cd'])
+        eq.y0_dot = c['y0_dot']
+        eq.set_rower_cinematic(c['high'])
+        ref = eq.solve_edo(n_t_intervals=400, rtol=1e-10, atol=1e-12)
+        case = ens.case_solution(i)
+        np.testing.assert_allclose(case['yy_dot'], ref['yy_dot'], atol=1e-6)
+        for key in ('v_f', 'p_f', 'dE_rower', 'W_drag', 'impulse'):
+            assert case['magnitudes'][key] == pytest.approx(ref['magnitudes'][key], rel=1e-5, abs=1e-9)
+
+
+def test_diverging_member_is_masked():
+    ens = RowEnsemble(Cd=[0.004, 1e3], y0_dot=[5, 1e6], high_coeffs=[[1.0]])
+    sol = ens.solve(n_t_intervals=50)
+    np.testing.assert_array_equal(sol['diverged'], [False, True])
+    assert np.isfinite(sol['magnitudes']['v_f'][0])
+    assert np.isnan(sol['magnitudes']['v_f'][1]) and np.isnan(sol['yy_dot'][1]).all()
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from scipy.integrate import trapezoid
+
+from rowEquation import RowEquation
+
+
+def equation(Cd=0.5):
+    eq = RowEquation(m=80, M=20, L=-1, T=1, rho=1000, S=0.5, Cd=Cd)
+    eq.y0_dot = 5
+    eq.set_rower_cinematic([1, 2])
+    return eq
+
+
+def test_rk4_matches_adaptive_solver():
+    eq = equation()
+    ref = eq.solve_edo(n_t_intervals=500, method='Radau', rtol=1e-10, atol=1e-12)
+    sol = eq.solve_edo(n_t_intervals=500, method='RK4', rk4_substeps=4)
+    assert sol['solver']['nsteps'] == 499*4
+    np.testing.assert_allclose(sol['yy_dot'], ref['yy_dot'], atol=1e-8)
+    np.testing.assert_allclose(sol['yy'], ref['yy'], atol=1e-8)
+    for key in ('v_f', 'p_f', 'dE_rower', 'W_drag', 'impulse'):
+        assert sol['magnitudes'][key] == pytest.approx(ref['magnitudes'][key], rel=1e-6)
+
+
+def test_rk4_dense_solution():
+    sol = equation().solve_edo(n_t_intervals=200, method='RK4', dense=True)
+    assert len(sol['yy_dot']) == 200
+    assert np.all(np.isfinite(sol['yy']))
+
+
+def test_rk4_divergence_raises():
+    with pytest.raises(FloatingPointError):
+        equation(Cd=500).solve_edo(n_t_intervals=50, method='RK4')
+
+
+@pytest.mark.parametrize('method', ['RK45', 'Radau'])
+def test_sampled_solution_without_dense_output(method):
+    eq = equation()
+    sol = eq.solve_edo(n_t_intervals=300, method=method)
+    dense = eq.solve_edo(n_t_intervals=300, method=method, dense=True)
+    np.testing.assert_allclose(sol['tt'], np.linspace(0, 1, 300))
+    np.testing.assert_allclose(sol['yy_dot'], dense['yy_dot'], atol=1e-12)
+    assert sol['solver']['nsteps'] == dense['solver']['nsteps'] > 0
+
+
+def test_profiled_dense_solve_materializes_series():
+    eq = equation()
+    sol = eq.solve_edo(n_t_intervals=500, dense=True, profile=True)
+    assert set(sol._cache) == set(sol.SERIES)
+    assert sol['stats']['time']['post_processing'] > 0
+    np.testing.assert_allclose(sol['yy_dot'], eq.solve_edo(n_t_intervals=500)['yy_dot'], rtol=1e-3)
+
+
+@pytest.mark.parametrize('method', ['RK45', 'RK4'])
+def test_grid_needs_two_points(method):
+    with pytest.raises(ValueError, match='n_t_intervals'):
+        equation().solve_edo(n_t_intervals=1, method=method)
+
+
+def test_nsteps_counts_accepted_steps():
+    eq = equation()
+    steps = eq.solve_edo(n_t_intervals=None)
+    sampled = eq.solve_edo(n_t_intervals=500)
+    assert sampled['solver']['nsteps'] == len(steps['tt']) - 1
+    assert sampled['yy_dot'][-1] == pytest.approx(steps['yy_dot'][-1], rel=1e-12)
+
+
+def test_periodic_recovery_matches_repeated_strokes():
+    eq = equation()
+    sol = eq.solve_periodic(y0_dot=5, n_t_intervals=200)
+    stats = sol['periodic']
+    assert stats['converged'] and stats['iterations'] <= 8
+    assert sol['magnitudes']['v_f'] == pytest.approx(sol['yy_dot'][0], abs=1e-8)
+
+    # Referencia: encadenar recuperaciones hasta que la velocidad se repite
+    v = 5.0
+    for _ in range(200):
+        v = eq._shoot(v)[0]
+    assert stats['y0_dot'] == pytest.approx(v, abs=1e-8)
+
+
+def test_boat_acceleration_and_integrated_rower_work():
+    eq = equation()
+    sol = eq.solve_edo(y0_dot=3, n_t_intervals=20001, rtol=1e-10, atol=1e-12)
+    v, tt = sol['yy_dot'], sol['tt']
+    assert v.min() < 0 < v.max()   # con el barco hacia atrás A*v**2 tendría el signo cambiado
+    np.testing.assert_allclose(sol['yy_ddot'], eq.A*np.abs(v)*v - eq.B*sol['xx_ddot'])
+    np.testing.assert_allclose(sol['yy_ddot'][1:-1], np.gradient(v, tt)[1:-1], atol=1e-4)
+
+    # Trabajo del remero: integral de m (x'' + y'') x' dt, aquí por trapecios en la malla fina
+    F = eq.m*(sol['xx_ddot'] + sol['yy_ddot'])
+    mags = sol['magnitudes']
+    assert mags['dE_rower'] == pytest.approx(trapezoid(F*sol['xx_dot'], tt), rel=1e-6)
+    # V_i es la velocidad inicial de la solución, no el atributo y0_dot
+    assert mags['Ei'] == pytest.approx(0.5*(eq.M + eq.m)*3**2)
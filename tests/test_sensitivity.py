@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from rowEquation import RowEquation
+from sensitivity import OUTPUTS, PARAMETERS
+
+BASE = dict(M=20.0, m=80.0, Cd=0.5, S=0.5, rho=1000.0, T=1.0, L=-1.0, y0_dot=5.0)
+HIGH = [1.0, 2.0]
+
+
+def outputs(values, **kwargs):
+    eq = RowEquation(m=values['m'], M=values['M'], L=values['L'], T=values['T'],
+                     rho=values['rho'], S=values['S'], Cd=values['Cd'])
+    eq.y0_dot = values['y0_dot']
+    eq.set_rower_cinematic(HIGH)
+    sol = eq.solve_edo(**dict({'n_t_intervals': None}, **kwargs))
+    return np.array([sol['magnitudes'][q] for q in OUTPUTS]), sol
+
+
+def test_sensitivities_match_central_differences():
+    tight = dict(rtol=1e-11, atol=1e-12)
+    _, sol = outputs(BASE, sensitivities=True, **tight)
+    matrix = sol['sensitivities']['matrix']
+    for j, p in enumerate(PARAMETERS):
+        h = 1e-5*abs(BASE[p])
+        up, _ = outputs(dict(BASE, **{p: BASE[p] + h}), **tight)
+        down, _ = outputs(dict(BASE, **{p: BASE[p] - h}), **tight)
+        np.testing.assert_allclose(matrix[:, j], (up - down)/(2*h), rtol=1e-5, atol=1e-7, err_msg=p)
+
+
+@pytest.mark.parametrize('settings, rtol', [(dict(method='RK4', n_t_intervals=21), 1e-9),
+                                            (dict(method='Radau', rtol=1e-3), 1e-3)])
+def test_sensitivities_follow_the_solver_settings(settings, rtol):
+    # Mismo integrador que la trayectoria: RK4 da los mismos pasos; uno adaptativo, su tolerancia
+    values, sol = outputs(BASE, sensitivities=True, **settings)
+    same = sol['sensitivities']['outputs_values']
+    np.testing.assert_allclose([same[q] for q in OUTPUTS], values, rtol=rtol)
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+import pytest
+
+from rowEnsemble import DEFAULTS, PARAMS
+from service import MicroBatcher, _floats, _jsonable
+
+
+def params(**kwargs):
+    return dict({p: float(DEFAULTS[p]) for p in PARAMS}, **kwargs)
+
+
+def test_floats_keeps_numeric_scalars_only():
+    out = _floats({'a': np.float64(1.5), 'b': 2, 'c': float('nan'), 'events': {'x': 1}, 's': 'txt'})
+    assert out == {'a': 1.5, 'b': 2.0, 'c': None}
+
+
+def test_jsonable_is_strict_json():
+    payload = {'x': np.array([1.0, np.inf]), 'n': np.int64(3), 'ok': np.bool_(True)}
+    assert json.loads(json.dumps(_jsonable(payload), allow_nan=False)) == {'x': [1.0, None], 'n': 3, 'ok': True}
+
+
+def test_batch_failures_stay_per_request():
+    batcher = MicroBatcher(batch_wait_ms=50)
+    with pytest.raises(ValueError):
+        batcher.submit(params(m=-1.0), [1.0])
+    with pytest.raises(ValueError):
+        batcher.submit(params(), [float('nan')])
+    good = batcher.submit(params(y0_dot=5.0), [1.0])
+    bad = batcher.submit(params(y0_dot=1e200, Cd=1e3), [1.0])
+    assert good.result(timeout=30)['v_f'] > 0
+    with pytest.raises(FloatingPointError):
+        bad.result(timeout=30)
+
+
+@pytest.mark.parametrize('body', [{'params': {'T': 0.0}},
+                                  {'params': {'m': -1.0}},
+                                  {'params': {}, 'high_coeffs': [float('nan')]}])
+def test_solve_validates_like_magnitudes(body):
+    from service import RowService
+    with pytest.raises(ValueError):
+        RowService().solve(body)
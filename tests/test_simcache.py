@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+import pytest
+
+from simcache import SimulationCache
+
+PARAMS = dict(m=80, M=20, L=-1, T=1, rho=1000, S=0.5, Cd=0.004, y0_dot=5)
+
+
+def test_hits_are_isolated_copies():
+    cache = SimulationCache()
+    first = cache.solve(PARAMS, [0.5, -0.2], n_t_intervals=500).solution
+    with pytest.raises(ValueError):
+        first['yy_dot'][0] = 0.0
+    first['magnitudes']['v_f'] = -1.0
+    first['extra'] = 1
+    second = cache.solve(PARAMS, [0.5, -0.2], n_t_intervals=500).solution
+    assert cache.stats['hits'] == 1
+    assert second['magnitudes']['v_f'] > 0
+    assert 'extra' not in second
+    assert np.shares_memory(first['tt'], second['tt'])
+
+
+def test_disk_tier_leaves_no_temporaries(tmp_path):
+    cache = SimulationCache(disk_dir=str(tmp_path))
+    sol = cache.solve(PARAMS, [0.5, -0.2], n_t_intervals=500).solution
+    assert os.listdir(tmp_path) == [cache.key(PARAMS, [0.5, -0.2], 500) + '.npz']
+    cache.clear()
+    loaded = cache.solve(PARAMS, [0.5, -0.2], n_t_intervals=500).solution
+    assert cache.stats['disk_hits'] == 1
+    assert not loaded['yy'].flags.writeable
+    np.testing.assert_array_equal(loaded['yy'], sol['yy'])
@@ -0,0 +1,23 @@
+import numpy as np
+
+from rowEquation import RowEquation
+from solution import RowSolution
+
+
+def test_series_are_computed_on_demand():
+    eq = RowEquation(Cd=0.5)
+    eq.y0_dot = 5
+    eq.set_rower_cinematic([1, 2])
+    sol = eq.solve_edo(dense=True, n_t_intervals=400)
+    assert isinstance(sol, RowSolution)
+    # Las magnitudes salen de los extremos: ninguna serie se ha evaluado todavía
+    assert sol._cache == {} and 'v_f' in sol['magnitudes']
+
+    yy = sol['yy']
+    assert list(sol._cache) == ['yy'] and sol['yy'] is yy
+    thumb = sol.resample(30, keys=('tt', 'yy_dot'))
+    assert len(thumb['yy_dot']) == 30 and list(sol._cache) == ['yy']
+
+    grid = eq.solve_edo(n_t_intervals=400)
+    for key in RowSolution.SERIES:
+        np.testing.assert_allclose(sol[key], grid[key], rtol=1e-9, atol=1e-12)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from rowEquation import RowEquation
+from storage import SERIES, load_npz, pack, save_npz
+
+
+def solved(**kwargs):
+    eq = RowEquation(m=80, M=20, L=-1, T=1, rho=1000, S=0.5, Cd=0.004)
+    eq.y0_dot = 5
+    eq.set_rower_cinematic([0.5, -0.2])
+    eq.solve_edo(n_t_intervals=500, **kwargs)
+    eq.calculate_magnitudes()
+    return eq.solution
+
+
+def test_pack_skips_events():
+    sol = solved(events=['boat_speed_min', 'boat_speed_max'])
+    assert isinstance(sol['magnitudes']['events'], dict)
+    block, mags = pack(sol)
+    assert block.shape == (len(SERIES), len(sol['tt']))
+    assert 'events' not in mags
+    assert all(isinstance(v, float) for v in mags.values())
+
+
+def test_npz_round_trip_with_events(tmp_path):
+    sol = solved(events=['boat_speed_min', 'boat_speed_max'])
+    path = str(tmp_path / 'sol.npz')
+    save_npz(path, sol)
+    loaded = load_npz(path)
+    for key in SERIES:
+        np.testing.assert_array_equal(loaded[key], sol[key])
+    for key, value in sol['magnitudes'].items():
+        if key != 'events':
+            assert loaded['magnitudes'][key] == float(value)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from rowEquation import RowEquation
+from strokeCycle import StrokeCycle
+
+
+def cycle(**kwargs):
+    eq = RowEquation(m=80, M=20, T=1.2, S=0.5, Cd=0.004)
+    eq.set_rower_cinematic([0.5, -0.2])
+    return StrokeCycle(eq, T_drive=0.8, F_peak=400.0, **kwargs)
+
+
+def test_recovery_segment_matches_solve_edo():
+    engine = cycle()
+    strokes = engine.run(n_strokes=3, y0_dot=4)['strokes']
+    # La recuperación de la palada 1 empieza en v_finish y termina en el v_catch de la palada 2
+    ref = engine.eq.solve_edo(y0_dot=strokes['v_finish'][0], n_t_intervals=2, rtol=1e-11, atol=1e-12)
+    assert strokes['v_catch'][1] == pytest.approx(ref['magnitudes']['v_f'], abs=1e-9)
+    np.testing.assert_allclose(strokes['impulse'], 400*0.8*2/np.pi, rtol=1e-9)   # media seno
+    np.testing.assert_allclose(np.diff(strokes['t_catch']), 2.0)
+
+
+def test_piece_stops_at_distance_with_decimated_series():
+    sol = cycle().run(distance=200, y0_dot=4, decimate=7)
+    mags, strokes = sol['magnitudes'], sol['strokes']
+    assert mags['distance'] >= 200 > mags['distance'] - strokes['distance'][-1]
+    assert len(strokes['distance']) == mags['n_strokes']
+    assert mags['distance'] == pytest.approx(strokes['distance'].sum())
+    assert sol['tt'][-1] == pytest.approx(mags['time']) and np.all(np.diff(sol['tt']) > 0)
+    assert len(sol['tt']) == pytest.approx(mags['time']/(7*5e-3), abs=2)
+    assert set(np.unique(sol['phase'])) == {0, 1}
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from rowEquation import RowEquation
+from sensitivity import coefficient_sensitivities
+from strokeOptimizer import Constraint, StrokeOptimizer, maximize
+
+
+def equation(high_coeffs=(0.5, -0.2, 0.1)):
+    eq = RowEquation(Cd=0.5)
+    eq.y0_dot = 5
+    eq.set_rower_cinematic(list(high_coeffs))
+    return eq
+
+
+def test_coefficient_sensitivities_match_finite_differences():
+    x0 = np.array([0.5, -0.2, 0.1])
+    grad = coefficient_sensitivities(equation(x0), rtol=1e-10, atol=1e-12)
+    h = 1e-5
+    for j in range(len(x0)):
+        dx = h*np.eye(len(x0))[j]
+        plus = coefficient_sensitivities(equation(x0 + dx), rtol=1e-10, atol=1e-12)
+        minus = coefficient_sensitivities(equation(x0 - dx), rtol=1e-10, atol=1e-12)
+        for q in ('p_f', 'v_f', 'dE_rower'):
+            assert grad['d' + q][j] == pytest.approx((plus[q] - minus[q])/(2*h), rel=1e-5, abs=1e-7)
+
+
+def test_slsqp_with_active_constraint():
+    x0 = [0.5, -0.2]
+    eq = equation(x0)
+    start = coefficient_sensitivities(eq, rtol=1e-8, atol=1e-10)
+    budget = 0.9*start['dE_rower']
+    opt = StrokeOptimizer(eq, maximize('p_f'), [Constraint('dE_rower', upper=budget)], bound=5)
+    res = opt.run(x0=x0, method='SLSQP', n_t_intervals=50)
+
+    assert res['result'].success
+    end = opt.evaluate(res['high_coeffs'])
+    assert end['p_f'] > start['p_f']
+    assert end['dE_rower'] == pytest.approx(budget, rel=1e-6)   # la restricción queda activa
+    # KKT: en el óptimo el gradiente de p_f es paralelo al de la energía
+    cos = end['dp_f'] @ end['ddE_rower']/np.linalg.norm(end['dp_f'])/np.linalg.norm(end['ddE_rower'])
+    assert cos == pytest.approx(1, abs=1e-4)
+    np.testing.assert_allclose(eq.coeffs[4:], res['high_coeffs'])
@@ -0,0 +1,19 @@
+import pytest
+
+from surrogate import build_surrogate
+
+
+def test_single_point_axis_is_fixed(tmp_path):
+    sur = build_surrogate(str(tmp_path/'table.npz'), {'y0_dot': (2, 6, 3), 'Cd': (0.01, 0.01, 1)},
+                          n_t_intervals=2, substeps=100)
+    assert sur.names == ['y0_dot']
+    assert sur.fixed['Cd'] == 0.01
+    params = dict(m=80, M=20, L=-1, T=1, rho=1000, S=0.5, y0_dot=3.0)
+    assert sur.covers(dict(params, Cd=0.01))
+    assert not sur.covers(dict(params, Cd=0.02))
+    assert sur.magnitudes(dict(params, Cd=0.01))['v_f'] > 0
+
+
+def test_needs_an_axis_with_two_points(tmp_path):
+    with pytest.raises(ValueError):
+        build_surrogate(str(tmp_path/'table.npz'), {'Cd': (0.01, 0.01, 1)})
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import sweep
+from sweep import build_cases, load_results
+
+
+def test_fixed_values_and_coefficients():
+    cases = build_cases({'params': {'y0_dot': [1, 2, 3]}, 'fixed': {'Cd': 0.01, 'a4': 0.5}, 'degree': 5})
+    np.testing.assert_array_equal(cases['Cd'], 0.01)
+    np.testing.assert_array_equal(cases['high_coeffs'], [[0.5, 0.0]]*3)
+
+
+@pytest.mark.parametrize('key', ['Cdd', 'a9', 'abc'])
+def test_unknown_fixed_keys_are_rejected(key):
+    with pytest.raises(ValueError, match=key):
+        build_cases({'params': {'y0_dot': [1, 2]}, 'fixed': {key: 1.0}, 'degree': 5})
+
+
+def test_load_results_closes_chunks(tmp_path, monkeypatch):
+    np.savez(tmp_path/'chunk_000000.npz', Cd=[0.1, 0.2], v_f=[1.0, 2.0])
+    np.savez(tmp_path/'chunk_000002.npz', Cd=[0.3], v_f=[3.0])
+    opened, real_load = [], np.load
+
+    def load(*args, **kwargs):
+        opened.append(real_load(*args, **kwargs))
+        return opened[-1]
+    monkeypatch.setattr(sweep.np, 'load', load)
+
+    out = load_results(tmp_path)
+    np.testing.assert_array_equal(out['Cd'], [0.1, 0.2, 0.3])
+    np.testing.assert_array_equal(out['v_f'], [1.0, 2.0, 3.0])
+    assert len(opened) == 2 and all(f.zip is None for f in opened)
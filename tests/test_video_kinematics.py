@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from fitting import constrained_basis
+from video_kinematics import synthetic_frames, video_kinematics
+
+ROWER_BOX, HULL_BOX, SCALE = (302, 32, 16, 16), (50, 85, 20, 10), 0.004
+
+
+@pytest.mark.parametrize('fps, T', [(30, 1.2), (25, 1.1)])
+def test_synthetic_video_recoveries(fps, T):
+    L = -0.8
+    frames = synthetic_frames(n_strokes=5, fps=fps, T=T, L=L, scale=SCALE)
+    recoveries = list(video_kinematics(frames, ROWER_BOX, HULL_BOX, SCALE, degree=6))
+
+    assert len(recoveries) >= 3
+    for rec in recoveries:
+        assert rec['T'] == pytest.approx(T, abs=0.025)
+        assert rec['L'] == pytest.approx(L, abs=0.01)
+        # La recuperación sintética es la cúbica: a4..a6 deben quedar en 0
+        a = np.array(rec['high_coeffs'])
+        assert np.all(np.abs(a) < 0.5)
+        t = np.linspace(0, rec['T'], 200)
+        _, Phi = constrained_basis(t, rec['T'], rec['L'], 6, 0)
+        assert np.max(np.abs(Phi @ a)) < 0.01
+        assert rec['rms'] < 5e-3
+
+
+def test_iter_frames_scales_width(tmp_path):
+    from video_kinematics import iter_frames
+    clips = pytest.importorskip('moviepy')
+    path = str(tmp_path / 'clip.mp4')
+    frames = [np.full((120, 320, 3), 10*k, dtype=np.uint8) for k in range(10)]
+    clips.ImageSequenceClip(frames, fps=10).write_videofile(path, codec='libx264', logger=None)
+
+    factor, decoded = iter_frames(path, width=160)
+    t, frame = next(decoded)
+    assert frame.shape == (60, 160)
+    assert factor == pytest.approx(0.5)
+    decoded.close()
+
+
+def test_segmenter_buffer_is_bounded():
+    from video_kinematics import RecoverySegmenter
+    segmenter = RecoverySegmenter(min_amplitude=0.1, max_stroke=5.0)
+    rng = np.random.default_rng(0)
+    for k in range(3000):
+        assert segmenter.push(k/30, 0.01*rng.standard_normal()) is None
+        assert len(segmenter._buffer) <= 5*30 + 2